@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+阅读统计扫描的基准测试
+
+对不同长度（默认 10 KB ~ 1 MB）和类型（中文为主 / 代码为主 / 混排）的合成文章，
+分别用当前的 reading_time.py 和 --baseline 指定的另一版本计算阅读统计（不使用缓存），
+报告每次调用的耗时和加速比。
+
+    git show <提交>:docs/overrides/hooks/reading_time.py > /tmp/reading_time_baseline.py
+    python benchmarks/reading_time_scan.py --baseline /tmp/reading_time_baseline.py
+
+用法: python benchmarks/reading_time_scan.py [--baseline 文件] [--sizes 10000 100000 1000000] [--repeat 5]
+"""
+
+import argparse
+import importlib.util
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from synthetic_corpus import generate_markdown
+
+CURRENT = Path(__file__).resolve().parent.parent / 'docs' / 'overrides' / 'hooks' / 'reading_time.py'
+
+
+def load_module(path, name):
+    """按文件路径加载一个版本的 reading_time.py"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if hasattr(module, 'READING_CACHE_CONFIG'):
+        module.READING_CACHE_CONFIG['persist'] = False
+    return module
+
+
+def time_page(module, markdown, repeat):
+    """on_page_markdown 每次调用的最短耗时（秒），每次调用前清空统计缓存"""
+    page = SimpleNamespace(meta={}, file=SimpleNamespace(src_path='blog/benchmark.md'))
+    best = float('inf')
+    for _ in range(repeat):
+        if hasattr(module, 'reading_stats_cache'):
+            module.reading_stats_cache = {}
+        elif hasattr(module, 'clean_markdown_content_for_chinese') and hasattr(module.clean_markdown_content_for_chinese, 'cache_clear'):
+            module.clean_markdown_content_for_chinese.cache_clear()
+        start = time.perf_counter()
+        module.on_page_markdown(markdown, page=page)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='阅读统计扫描基准测试')
+    parser.add_argument('--baseline', help='对比用的另一版本 reading_time.py')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help='文章长度（字符）')
+    parser.add_argument('--profiles', nargs='+', default=['cjk', 'code', 'mixed'], help='文章类型')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    current = load_module(CURRENT, 'reading_time_current')
+    baseline = load_module(args.baseline, 'reading_time_baseline') if args.baseline else None
+
+    for profile in args.profiles:
+        for size in args.sizes:
+            markdown = generate_markdown(size, profile)
+            elapsed = time_page(current, markdown, args.repeat)
+            line = f"{profile:>5} {size / 1000:>7.0f} KB: {elapsed * 1000:8.2f} ms ({size / elapsed / 1e6:6.1f} MB/s)"
+            if baseline is not None:
+                baseline_elapsed = time_page(baseline, markdown, args.repeat)
+                line += f" | 基线 {baseline_elapsed * 1000:8.2f} ms，加速 {baseline_elapsed / elapsed:.2f}x"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+阅读时间 hook（reading_time.py）的微基准测试
+
+在 1 KB ~ 1 MB、中文为主 / 代码为主 / 混排的合成文章上分别运行
+calculate_reading_stats、count_code_lines 和 on_page_markdown（每次调用前清空缓存，测量完整计算），报告：
+- 每次调用耗时（多次运行取最短值和中位数）
+- 吞吐量（MB/s，按 UTF-8 字节数计算）
+- 单次调用的内存分配峰值（tracemalloc）
+
+--check 把结果与阈值文件（默认 benchmarks/reading_time_thresholds.json）比较，超出阈值时以非零状态退出，
+可在修改 reading_time.py 后本地检查性能是否退化；--update-thresholds 按当前结果（乘以余量系数）重新生成阈值文件。
+阈值与机器性能有关，换机器后请先更新阈值。
+
+用法: python benchmarks/reading_time_suite.py [--sizes 1000 10000 100000 1000000] [--profiles cjk code mixed]
+                                           [--repeat 5] [--output results.json] [--check | --update-thresholds]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+from synthetic_corpus import generate_markdown
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent / 'docs' / 'overrides' / 'hooks'
+sys.path.insert(0, str(HOOKS_DIR))
+
+import reading_time  # noqa: E402
+
+DEFAULT_THRESHOLDS = Path(__file__).resolve().parent / 'reading_time_thresholds.json'
+# 生成阈值时的余量：耗时 ×3（至少多 0.05 ms，避免极短的调用因计时抖动误报）、内存峰值 ×1.5 + 16 KB
+TIME_SLACK = 3.0
+TIME_FLOOR_MS = 0.05
+MEMORY_SLACK = 1.5
+MEMORY_FLOOR_KB = 16
+
+PAGE = SimpleNamespace(meta={}, file=SimpleNamespace(src_path='blog/benchmark.md'))
+
+
+def clear_caches():
+    """清空阅读统计和代码块缓存，保证每次调用都完整计算"""
+    reading_time.reading_stats_cache = {}
+    reading_time.used_digests.clear()
+    reading_time.block_lines_cache.clear()
+
+
+def run_page(markdown):
+    # 每次传入新的 meta，避免上一次写入的 readtime 被当作作者指定的值
+    PAGE.meta = {}
+    return reading_time.on_page_markdown(markdown, page=PAGE)
+
+
+TARGETS = {
+    'calculate_reading_stats': reading_time.calculate_reading_stats,
+    'count_code_lines': reading_time.count_code_lines,
+    'on_page_markdown': run_page,
+}
+
+
+def measure(function, markdown, repeat):
+    """返回 (最短耗时, 耗时中位数, 内存分配峰值字节数)"""
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        function(markdown)
+        timings.append(time.perf_counter() - start)
+
+    clear_caches()
+    tracemalloc.start()
+    function(markdown)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak
+
+
+def run_suite(sizes, profiles, repeat):
+    """运行所有组合，返回 {"函数/类型/长度": 结果}"""
+    reading_time.READING_CACHE_CONFIG['persist'] = False
+    results = {}
+    for profile in profiles:
+        for size in sizes:
+            markdown = generate_markdown(size, profile)
+            size_bytes = len(markdown.encode('utf-8'))
+            for name, function in TARGETS.items():
+                best, median, peak = measure(function, markdown, repeat)
+                key = f'{name}/{profile}/{size}'
+                results[key] = {
+                    'bytes': size_bytes,
+                    'best_ms': round(best * 1000, 4),
+                    'median_ms': round(median * 1000, 4),
+                    'mb_per_s': round(size_bytes / best / 1e6, 2),
+                    'peak_kb': round(peak / 1024, 1),
+                }
+                print(f"{key:<42} {best * 1000:9.3f} ms  {size_bytes / best / 1e6:7.1f} MB/s  "
+                      f"峰值 {peak / 1024:9.1f} KB", file=sys.stderr)
+    return results
+
+
+def check_thresholds(results, thresholds):
+    """返回超出阈值的项目说明列表"""
+    failures = []
+    for key, limit in thresholds.items():
+        result = results.get(key)
+        if result is None:
+            continue
+        if result['best_ms'] > limit['max_ms']:
+            failures.append(f"{key}: 耗时 {result['best_ms']} ms > {limit['max_ms']} ms")
+        if result['peak_kb'] > limit['max_peak_kb']:
+            failures.append(f"{key}: 内存峰值 {result['peak_kb']} KB > {limit['max_peak_kb']} KB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='阅读时间 hook 微基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000], help='文章长度（字符）')
+    parser.add_argument('--profiles', nargs='+', default=['cjk', 'code', 'mixed'], help='文章类型')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    parser.add_argument('--output', help='结果 JSON 文件')
+    parser.add_argument('--thresholds', default=str(DEFAULT_THRESHOLDS), help='阈值文件')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--check', action='store_true', help='与阈值比较，有退化时以状态 1 退出')
+    group.add_argument('--update-thresholds', action='store_true', help='按当前结果重新生成阈值文件')
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.profiles, args.repeat)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+        print(f"✅ 结果已写入 {args.output}", file=sys.stderr)
+
+    if args.update_thresholds:
+        thresholds = {
+            key: {
+                'max_ms': round(max(result['best_ms'] * TIME_SLACK, result['best_ms'] + TIME_FLOOR_MS), 3),
+                'max_peak_kb': round(result['peak_kb'] * MEMORY_SLACK + MEMORY_FLOOR_KB, 1),
+            }
+            for key, result in results.items()
+        }
+        Path(args.thresholds).write_text(json.dumps(thresholds, indent=2) + '\n', encoding='utf-8')
+        print(f"📝 阈值已写入 {args.thresholds}", file=sys.stderr)
+    elif args.check:
+        thresholds = json.loads(Path(args.thresholds).read_text(encoding='utf-8'))
+        failures = check_thresholds(results, thresholds)
+        for failure in failures:
+            print(f"❌ {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+        print(f"✅ {len(results)} 项均在阈值以内", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
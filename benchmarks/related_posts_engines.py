@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关文章推荐打分引擎的一致性检查
+
+生成合成博客语料，分别用纯 Python 引擎和稀疏矩阵引擎（matrix_scoring 为 'exact'）计算每篇文章的推荐列表，
+逐项比较推荐的文章、先后顺序和相似度（要求完全相等，不允许浮点误差）。
+分别比较多样性选择后的最终结果和纯按相似度排序的结果；同分文章按文件顺序排列，
+报告中的"同分"是推荐列表中相邻两篇相似度相同的次数，确认语料覆盖了同分的情况。
+两个引擎只在 max_postings 为 None 时一致，检查时关闭该限制。
+
+发现不一致时列出前几篇文章的两份结果，并以退出码 1 结束（可用于 CI）。
+
+用法: python benchmarks/related_posts_engines.py [--posts 2000 ...] [--seed 1]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent / 'docs' / 'overrides' / 'hooks'
+sys.path.insert(0, str(HOOKS_DIR))
+
+import related_matrix  # noqa: E402
+import related_posts  # noqa: E402
+from synthetic_corpus import generate_blog_corpus  # noqa: E402
+
+
+def select_by_score(similarities, max_count, candidate_count=None):
+    """不做多样性选择，直接按相似度取前 max_count 篇（稳定排序，同分按文件顺序）"""
+    return sorted(similarities, key=related_posts.similarity_key, reverse=True)[:max_count]
+
+
+def compute_all(engine, diversity=True):
+    """用指定引擎重新计算所有文章的推荐，返回 ({路径: [(相似度, 推荐路径), ...]}, 耗时)"""
+    related_posts.SIMILARITY_CONFIG.update(engine=engine, matrix_scoring='exact', max_postings=None,
+                                           candidate_source='index')
+    select = related_posts.select_related_articles
+    if not diversity:
+        related_posts.select_related_articles = select_by_score
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            related_posts.related_articles_cache.clear()
+            start = time.perf_counter()
+            related_posts.precompute_related_articles()
+            elapsed = time.perf_counter() - start
+    finally:
+        related_posts.select_related_articles = select
+    results = {
+        path: [(score, article.path) for score, article in related]
+        for path, related in related_posts.related_articles_cache.items()
+    }
+    return results, elapsed
+
+
+def count_ties(results):
+    """推荐列表中相邻两篇相似度相同的次数"""
+    return sum(1 for related in results.values()
+               for (score, _), (next_score, _) in zip(related, related[1:]) if score == next_score)
+
+
+def compare(expected, actual, label, limit=3):
+    """逐篇比较两份结果，返回不一致的文章数"""
+    mismatched = [path for path in expected if expected[path] != actual.get(path)]
+    mismatched += [path for path in actual if path not in expected]
+    for path in mismatched[:limit]:
+        print(f"   ❌ {label} {path}\n      python: {expected.get(path)}\n      matrix: {actual.get(path)}")
+    return len(mismatched)
+
+
+def check(post_count, seed):
+    """检查一个规模，返回是否一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = generate_blog_corpus(tmp, post_count, seed=seed)
+        # 索引缓存写到临时目录，不影响项目
+        related_posts.INDEX_CACHE_FILE = Path(tmp) / '.related_cache' / 'index.json'
+        related_posts.SIMILARITY_CONFIG.update(engine='python', max_postings=None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            related_posts.on_files(files, {})
+
+        ok = True
+        for diversity, label in ((True, '多样性选择'), (False, '按相似度排序')):
+            expected, python_time = compute_all('python', diversity)
+            actual, matrix_time = compute_all('matrix', diversity)
+            mismatched = compare(expected, actual, label)
+            status = '✅' if not mismatched else '❌'
+            print(f"{status} {post_count} 篇文章，{label}: {len(expected) - mismatched}/{len(expected)} 篇一致，"
+                  f"同分 {count_ties(expected)} 处，python {python_time:.2f}s，matrix {matrix_time:.2f}s")
+            ok = ok and not mismatched
+        return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='相关文章推荐打分引擎一致性检查')
+    parser.add_argument('--posts', type=int, nargs='+', default=[500, 2000], help='合成文章数量（可指定多个规模）')
+    parser.add_argument('--seed', type=int, default=1, help='语料随机种子')
+    args = parser.parse_args()
+
+    if not related_matrix.is_available():
+        print("⚠️ 未安装 numpy/scipy，无法检查稀疏矩阵引擎")
+        sys.exit(1)
+    results = [check(post_count, args.seed) for post_count in args.posts]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关文章推荐 LSH 候选生成的召回率基准测试
+
+生成一个合成博客语料（按主题聚类的关键词、标签、分类），分别用倒排索引（精确）
+和不同 bands × rows 组合的 MinHash/LSH 计算每篇文章的前 5 篇相关推荐，报告：
+- recall@5：LSH 最终推荐中命中精确推荐的比例
+- ranked recall@5：不做多样性选择时（纯按相似度取前 5 篇）的命中比例。
+  多样性选择会为每个分类补一篇得分最高的文章，这些文章往往与当前文章只有很少的共同点，
+  LSH 本身就不会把它们选为候选，因此两个指标分开报告
+- 平均候选数和计算耗时
+
+精确结果不限制倒排列表长度；LSH 按 --max-postings 跳过超大的桶（默认与 SIMILARITY_CONFIG 一致）。
+
+用法: python benchmarks/related_posts_lsh.py [--posts 5000] [--lsh 32x2 16x4 ...] [--max-postings 1000]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent / 'docs' / 'overrides' / 'hooks'
+sys.path.insert(0, str(HOOKS_DIR))
+
+import related_posts  # noqa: E402
+from synthetic_corpus import generate_corpus  # noqa: E402
+
+
+def select_by_score(similarities, max_count, candidate_count=None):
+    """不做多样性选择，直接按相似度取前 max_count 篇"""
+    return sorted(similarities, key=related_posts.similarity_key, reverse=True)[:max_count]
+
+
+def compute_all(files, diversity=True, **config):
+    """按给定配置重新计算所有文章的相关推荐，返回 ({路径: [推荐路径, ...]}, 耗时, 平均候选数)"""
+    related_posts.SIMILARITY_CONFIG.update(config)
+    select = related_posts.select_related_articles
+    if not diversity:
+        related_posts.select_related_articles = select_by_score
+    with contextlib.redirect_stdout(io.StringIO()):
+        related_posts.on_files(files, {})
+        related_posts.related_articles_cache.clear()
+        start = time.perf_counter()
+        related_posts.precompute_related_articles()
+        elapsed = time.perf_counter() - start
+    related_posts.select_related_articles = select
+    candidate_total = sum(len(related_posts.get_candidates(article)) for article in related_posts.article_index.values())
+    results = {
+        path: [article.path for _, article in related]
+        for path, related in related_posts.related_articles_cache.items()
+    }
+    return results, elapsed, candidate_total / max(len(results), 1)
+
+
+def recall_at_k(exact, approximate):
+    """精确结果中被近似结果找回的比例（只统计有推荐的文章）"""
+    hits = total = 0
+    for path, expected in exact.items():
+        if expected:
+            hits += len(set(expected) & set(approximate.get(path, [])))
+            total += len(expected)
+    return hits / total if total else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='相关文章推荐 LSH 召回率基准测试')
+    parser.add_argument('--posts', type=int, default=5000, help='合成文章数量')
+    parser.add_argument('--lsh', nargs='+', default=['64x1', '32x2', '16x2', '16x4', '8x4'], help='bands x rows 组合')
+    parser.add_argument('--max-postings', type=int, default=related_posts.SIMILARITY_CONFIG['max_postings'],
+                        help='LSH 桶的最大文章数（超过时跳过该桶，0 表示不限制）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"📝 生成 {args.posts} 篇合成文章...")
+        files = generate_corpus(tmp, args.posts)
+        # 索引缓存写到临时目录，不影响项目
+        related_posts.INDEX_CACHE_FILE = Path(tmp) / '.related_cache' / 'index.json'
+
+        exact, exact_time, exact_candidates = compute_all(files, candidate_source='index', max_postings=None)
+        exact_ranked = compute_all(files, diversity=False)[0]
+        print(f"🎯 倒排索引（精确）: {exact_time:.2f}s, 平均候选 {exact_candidates:.0f} 篇")
+
+        for setting in args.lsh:
+            bands, rows = (int(value) for value in setting.split('x'))
+            approximate, lsh_time, lsh_candidates = compute_all(files, candidate_source='lsh', lsh_bands=bands, lsh_rows=rows,
+                                                               max_postings=args.max_postings or None)
+            approximate_ranked = compute_all(files, diversity=False)[0]
+            print(f"🔍 LSH {bands:>3} x {rows}: recall@5 = {recall_at_k(exact, approximate):.3f}, "
+                  f"ranked recall@5 = {recall_at_k(exact_ranked, approximate_ranked):.3f}, "
+                  f"{lsh_time:.2f}s, 平均候选 {lsh_candidates:.0f} 篇")
+
+
+if __name__ == '__main__':
+    main()
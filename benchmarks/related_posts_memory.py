@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关文章推荐索引的内存基准测试
+
+在合成语料上运行 related_posts.on_files（不计算推荐列表），清空共享文档存储后，
+用 tracemalloc 统计索引本身（文章条目、倒排索引、词表等）占用的内存。
+
+用 --hooks-dir 指向另一份代码（例如 git worktree 中的旧版本）即可对比修改前后的内存占用。
+
+用法: python benchmarks/related_posts_memory.py [--posts 20000] [--hooks-dir docs/overrides/hooks]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from synthetic_corpus import generate_corpus
+
+DEFAULT_HOOKS_DIR = Path(__file__).resolve().parent.parent / 'docs' / 'overrides' / 'hooks'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='相关文章推荐索引内存基准测试')
+    parser.add_argument('--posts', type=int, default=20000, help='合成文章数量')
+    parser.add_argument('--hooks-dir', default=str(DEFAULT_HOOKS_DIR), help='related_posts.py 所在目录')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(args.hooks_dir).resolve()))
+    import document_store
+    import related_posts
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"📝 生成 {args.posts} 篇合成文章...")
+        files = generate_corpus(tmp, args.posts)
+        related_posts.INDEX_CACHE_FILE = Path(tmp) / '.related_cache' / 'index.json'
+        # 只测量索引，不计算推荐列表
+        related_posts.precompute_related_articles = lambda: None
+
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            related_posts.on_files(files, {})
+        elapsed = time.perf_counter() - start
+        document_store.clear()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"📊 索引 {len(related_posts.article_index)} 篇文章，耗时 {elapsed:.2f}s")
+        print(f"💾 索引内存: {current / 1024 / 1024:.1f} MB（建立过程峰值 {peak / 1024 / 1024:.1f} MB）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关文章推荐逐页渲染（on_page_markdown）的基准测试
+
+在合成博客语料上运行 related_posts.on_files 后，对每个页面调用 on_page_markdown
+（页面对象只模拟 file 和 page.meta），报告每页平均耗时，以及渲染阶段的
+文件系统调用（stat / open）和 YAML 解析次数。
+
+用 --hooks-dir 指向另一份代码（例如 git worktree 中的旧版本）即可对比修改前后每页的开销。
+
+用法: python benchmarks/related_posts_render.py [--posts 5000] [--repeat 5] [--hooks-dir docs/overrides/hooks]
+"""
+
+import argparse
+import builtins
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import yaml
+
+from synthetic_corpus import generate_blog_corpus
+
+DEFAULT_HOOKS_DIR = Path(__file__).resolve().parent.parent / 'docs' / 'overrides' / 'hooks'
+
+
+@contextlib.contextmanager
+def count_calls(counters):
+    """统计期间 os.stat、open 和 yaml.safe_load 的调用次数"""
+    originals = (os.stat, builtins.open, yaml.safe_load)
+
+    def counted(name, function):
+        def wrapper(*args, **kwargs):
+            counters[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    os.stat = counted('stat', originals[0])
+    builtins.open = counted('open', originals[1])
+    yaml.safe_load = counted('yaml', originals[2])
+    try:
+        yield counters
+    finally:
+        os.stat, builtins.open, yaml.safe_load = originals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='相关文章推荐逐页渲染基准测试')
+    parser.add_argument('--posts', type=int, default=5000, help='合成文章数量')
+    parser.add_argument('--repeat', type=int, default=5, help='重复渲染所有页面的次数')
+    parser.add_argument('--hooks-dir', default=str(DEFAULT_HOOKS_DIR), help='related_posts.py 所在目录')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(args.hooks_dir).resolve()))
+    import related_posts
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"📝 生成 {args.posts} 篇合成文章...")
+        files = generate_blog_corpus(tmp, args.posts)
+        related_posts.INDEX_CACHE_FILE = Path(tmp) / '.related_cache' / 'index.json'
+        with contextlib.redirect_stdout(io.StringIO()):
+            related_posts.on_files(files, {})
+
+        # MkDocs 在调用 on_page_markdown 之前已经解析好 page.meta 和去掉 front matter 的正文
+        pages = []
+        for file in files:
+            text = Path(file.abs_src_path).read_text(encoding='utf-8')
+            _, front_matter, markdown = text.split('---\n', 2)
+            pages.append((markdown, SimpleNamespace(file=file, meta=yaml.safe_load(front_matter) or {})))
+        config = {'site_url': 'https://example.com/'}
+
+        counters = {'stat': 0, 'open': 0, 'yaml': 0}
+        start = time.perf_counter()
+        with count_calls(counters):
+            for _ in range(args.repeat):
+                for markdown, page in pages:
+                    related_posts.on_page_markdown(markdown, page=page, config=config, files=files)
+        elapsed = time.perf_counter() - start
+
+        renders = len(pages) * args.repeat
+        print(f"⏱️ on_page_markdown 每页平均 {elapsed / renders * 1e6:.1f} µs（共 {renders} 次）")
+        print(f"📂 渲染阶段每页 stat {counters['stat'] / renders:.2f} 次，open {counters['open'] / renders:.2f} 次，"
+              f"YAML 解析 {counters['yaml'] / renders:.2f} 次")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关文章推荐的规模基准测试
+
+用 synthetic_corpus.generate_blog_corpus 生成不同规模的合成博客（中英文混排、长尾标签分布、代码块），
+不运行完整的 MkDocs 构建，直接通过 hook 接口运行 related_posts.on_files，
+再逐页调用 get_related_articles（与 on_page_markdown 相同的调用方式），报告：
+- 建立索引耗时（on_files 中除预先计算推荐列表以外的部分）和预先计算推荐列表的耗时
+- 逐页查询延迟的分位数（查表），以及抽样文章不使用预计算结果时的计算延迟分位数
+- 进程峰值内存（RSS）
+
+每个规模、每组配置在单独的子进程中运行，峰值内存互不影响。--config 可以给出多组配置，在同一语料上依次运行，
+例如比较纯 Python 引擎和稀疏矩阵引擎（exact 打分）在 10000 篇文章上的耗时：
+
+    python benchmarks/related_posts_scaling.py --posts 10000 --config '{}' '{"engine": "matrix", "matrix_scoring": "exact"}'
+
+结果以 JSON 输出，便于在不同提交之间对比：
+
+    python benchmarks/related_posts_scaling.py --posts 1000 10000 --output before.json
+    git checkout <其他提交>
+    python benchmarks/related_posts_scaling.py --posts 1000 10000 --output after.json
+
+用法: python benchmarks/related_posts_scaling.py [--posts 1000 10000 50000] [--config '{}' '{"engine": "matrix"}' ...]
+                                              [--samples 200] [--output results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic_corpus import generate_blog_corpus
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_HOOKS_DIR = ROOT_DIR / 'docs' / 'overrides' / 'hooks'
+
+
+def percentiles(samples):
+    """延迟分位数（毫秒）"""
+    if not samples:
+        return {}
+    samples = sorted(samples)
+
+    def pick(fraction):
+        return round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 4)
+
+    return {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99), 'max': round(samples[-1] * 1000, 4),
+            'mean': round(sum(samples) / len(samples) * 1000, 4)}
+
+
+def peak_rss_mb():
+    """进程峰值 RSS（Linux 上单位为 KB，macOS 上为字节）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_size(post_count, hooks_dir, config, samples, seed):
+    """在当前进程中对一个规模运行基准，返回结果字典"""
+    sys.path.insert(0, str(Path(hooks_dir).resolve()))
+    import related_posts
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = generate_blog_corpus(tmp, post_count, seed=seed)
+        related_posts.INDEX_CACHE_FILE = Path(tmp) / '.related_cache' / 'index.json'
+        related_posts.SIMILARITY_CONFIG.update(config)
+
+        # 单独统计预先计算推荐列表的耗时（on_files 通过模块全局名调用它）
+        precompute = related_posts.precompute_related_articles
+        precompute_time = []
+
+        def timed_precompute():
+            start = time.perf_counter()
+            precompute()
+            precompute_time.append(time.perf_counter() - start)
+
+        related_posts.precompute_related_articles = timed_precompute
+        rss_before = peak_rss_mb()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            related_posts.on_files(files, {})
+            on_files_time = time.perf_counter() - start
+        related_posts.precompute_related_articles = precompute
+
+        # 逐页查询（与 on_page_markdown 一样按 max_related 查询，命中预计算结果）
+        max_related = related_posts.SIMILARITY_CONFIG['max_related']
+        query_latencies = []
+        for file in files:
+            start = time.perf_counter()
+            related_posts.get_related_articles(file.src_path, max_count=max_related)
+            query_latencies.append(time.perf_counter() - start)
+
+        # 抽样文章不使用预计算结果，直接计算（mkdocs serve 中缓存失效或 max_count 不同时的路径）
+        paths = list(related_posts.article_index)
+        sampled = random.Random(seed).sample(paths, min(samples, len(paths)))
+        compute_latencies = []
+        for path in sampled:
+            start = time.perf_counter()
+            related_posts.compute_related_articles(path, max_related)
+            compute_latencies.append(time.perf_counter() - start)
+
+        precompute_seconds = sum(precompute_time)
+        return {
+            'posts': post_count,
+            'indexed_articles': len(related_posts.article_index),
+            'keywords': len(related_posts.keyword_index),
+            'index_seconds': round(on_files_time - precompute_seconds, 4),
+            'precompute_seconds': round(precompute_seconds, 4),
+            'on_files_seconds': round(on_files_time, 4),
+            'query_ms': percentiles(query_latencies),
+            'compute_ms': percentiles(compute_latencies),
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_rss_before_index_mb': rss_before,
+        }
+
+
+def git_commit():
+    """当前代码的提交（不是 git 仓库时为None）"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='相关文章推荐规模基准测试')
+    parser.add_argument('--posts', type=int, nargs='+', default=[1000, 10000], help='合成文章数量（可指定多个规模）')
+    parser.add_argument('--hooks-dir', default=str(DEFAULT_HOOKS_DIR), help='related_posts.py 所在目录')
+    parser.add_argument('--config', nargs='+', default=['{}'],
+                        help='覆盖 SIMILARITY_CONFIG 的 JSON（可指定多组），例如 \'{"engine": "matrix"}\'')
+    parser.add_argument('--samples', type=int, default=200, help='测量直接计算延迟的抽样文章数')
+    parser.add_argument('--seed', type=int, default=1, help='语料随机种子')
+    parser.add_argument('--output', help='结果 JSON 文件（默认输出到标准输出）')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)  # 子进程：只运行一个规模
+    args = parser.parse_args()
+    configs = [json.loads(config) for config in args.config]
+
+    if args.single:
+        json.dump(run_size(args.posts[0], args.hooks_dir, configs[0], args.samples, args.seed), sys.stdout)
+        return
+
+    results = []
+    for post_count in args.posts:
+        for config_text, config in zip(args.config, configs):
+            print(f"📝 {post_count} 篇文章，配置 {config_text}...", file=sys.stderr)
+            command = [sys.executable, __file__, '--single', '--posts', str(post_count), '--hooks-dir', args.hooks_dir,
+                       '--config', config_text, '--samples', str(args.samples), '--seed', str(args.seed)]
+            result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+            print(f"   索引 {result['index_seconds']:.2f}s，预计算 {result['precompute_seconds']:.2f}s，"
+                  f"查询 p99 {result['query_ms']['p99']:.4f}ms，计算 p50 {result['compute_ms'].get('p50', 0):.2f}ms，"
+                  f"峰值内存 {result['peak_rss_mb']:.0f} MB", file=sys.stderr)
+            result['config'] = config
+            results.append(result)
+
+    report = {
+        'benchmark': 'related_posts_scaling',
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'configs': configs,
+        'seed': args.seed,
+        'results': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+        print(f"✅ 结果已写入 {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
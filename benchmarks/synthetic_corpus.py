@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+基准测试用的合成博客语料
+
+按主题聚类生成文章：同一主题的文章共享关键词、中文短语、标签和分类，
+写入临时目录后返回模拟 MkDocs File 对象的列表，可直接传给 hooks 的 on_files。
+
+- generate_corpus：只有关键词和中文短语的简单语料（LSH 召回率、内存基准使用）
+- generate_blog_corpus：更接近真实博客的语料：中英文混排的标题和段落、长尾分布的标签和分类、
+  代码块、描述、少量禁用推荐的文章（规模基准使用）
+"""
+
+import random
+from pathlib import Path
+
+LATIN_WORDS = [f'term{i}' for i in range(3000)]
+TECH_WORDS = ('python mkdocs material theme plugin blog markdown deploy github pages search config install '
+              'build server docker linux macos shell git code test cache index yaml json html css javascript '
+              'api data model vue react hugo hexo nginx database query performance memory thread process').split()
+CODE_SNIPPETS = {
+    'python': 'def {0}({1}):\n    return {1}.get("{2}")\n',
+    'bash': 'pip install {0}\n{1} --config {2}.yml\n',
+    'yaml': '{0}:\n  {1}: true\n  name: {2}\n',
+    'javascript': 'const {0} = document.querySelector(".{1}");\n{0}.dataset.{2} = "1";\n',
+}
+HAN_CHARS = '的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处理府研'
+
+
+class SyntheticFile:
+    """模拟 mkdocs.structure.files.File 中 related_posts 用到的属性"""
+
+    def __init__(self, src_path, abs_src_path):
+        self.src_path = src_path
+        self.abs_src_path = abs_src_path
+        self.url = src_path[:-3] + '/'
+
+
+def generate_corpus(root, post_count, seed=1):
+    """生成按主题聚类的合成文章，返回 SyntheticFile 列表"""
+    rng = random.Random(seed)
+    topic_count = max(4, post_count // 25)
+    topics = []
+    for _ in range(topic_count):
+        topics.append({
+            'words': rng.sample(LATIN_WORDS, 30),
+            'phrases': [''.join(rng.sample(HAN_CHARS, 4)) for _ in range(10)],
+            'tags': [f'tag{rng.randrange(topic_count * 3)}' for _ in range(4)],
+            'category': f'Category{rng.randrange(max(2, topic_count // 4))}',
+            'directory': rng.choice(['blog', 'develop']) + '/' + rng.choice('abcdefgh'),
+        })
+
+    files = []
+    for i in range(post_count):
+        topic = rng.choice(topics)
+        other = rng.choice(topics)
+        words = [rng.choice(topic['words'] if rng.random() < 0.7 else other['words'] + LATIN_WORDS[:200])
+                 for _ in range(rng.randint(80, 400))]
+        phrases = [rng.choice(topic['phrases']) for _ in range(rng.randint(5, 30))]
+        title = ' '.join(rng.sample(topic['words'], 3))
+        tags = rng.sample(topic['tags'], rng.randint(1, 3))
+        body = '\n\n'.join(' '.join(words[j:j + 40]) for j in range(0, len(words), 40))
+        text = (f'---\ntitle: {title}\ntags: [{", ".join(tags)}]\ncategories: [{topic["category"]}]\n---\n\n'
+                f'# {title}\n\n{body}\n\n{"，".join(phrases)}。\n')
+        src_path = f'{topic["directory"]}/post-{i}.md'
+        path = Path(root) / src_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        files.append(SyntheticFile(src_path, str(path)))
+    return files
+
+
+def zipf_choice(rng, items, exponent=1.1):
+    """按长尾（Zipf）分布选取：排在前面的项出现得多，大部分项只出现少数几次"""
+    weights = [1 / (rank + 1) ** exponent for rank in range(len(items))]
+    return rng.choices(items, weights=weights)[0]
+
+
+def han_sentence(rng, phrases):
+    """由主题短语和随机汉字组成的中文句子"""
+    parts = [rng.choice(phrases) if rng.random() < 0.5 else ''.join(rng.sample(HAN_CHARS, rng.randint(2, 6)))
+             for _ in range(rng.randint(3, 8))]
+    return ''.join(parts) + rng.choice('，。；！？')
+
+
+def latin_sentence(rng, words):
+    """由主题词和常见技术词组成的英文句子"""
+    return ' '.join(rng.choice(words) if rng.random() < 0.7 else rng.choice(TECH_WORDS)
+                    for _ in range(rng.randint(6, 18))) + '.'
+
+
+def code_block(rng, words):
+    """随机语言的围栏代码块"""
+    language = rng.choice(list(CODE_SNIPPETS))
+    code = ''.join(CODE_SNIPPETS[language].format(*rng.sample(words, 3)) for _ in range(rng.randint(1, 6)))
+    return f'```{language}\n{code}```'
+
+
+def generate_blog_corpus(root, post_count, seed=1, zh_ratio=0.6, code_ratio=0.4, disabled_ratio=0.02):
+    """
+    生成接近真实博客的合成文章，返回 SyntheticFile 列表
+
+    zh_ratio: 以中文为主的文章比例（其余以英文为主，两种文章都会夹杂另一种语言）
+    code_ratio: 含代码块的文章比例
+    disabled_ratio: front matter 中设置 disable_related 的文章比例
+    """
+    rng = random.Random(seed)
+    topic_count = max(4, post_count // 25)
+    tag_pool = [f'tag{i}' for i in range(topic_count * 2)] + [''.join(rng.sample(HAN_CHARS, 2)) for _ in range(topic_count)]
+    rng.shuffle(tag_pool)
+    category_pool = [f'Category{i}' for i in range(max(2, topic_count // 6))] + ['随笔', '教程', '工具', '部署']
+    topics = []
+    for _ in range(topic_count):
+        topics.append({
+            'words': rng.sample(LATIN_WORDS, 20) + rng.sample(TECH_WORDS, 5),
+            'phrases': [''.join(rng.sample(HAN_CHARS, rng.randint(2, 4))) for _ in range(12)],
+            'tags': [zipf_choice(rng, tag_pool) for _ in range(5)],
+            'categories': [zipf_choice(rng, category_pool) for _ in range(2)],
+            'directory': rng.choice(['blog', 'develop']) + '/' + rng.choice('abcdefgh'),
+        })
+
+    files = []
+    for i in range(post_count):
+        topic = zipf_choice(rng, topics, exponent=0.5)
+        chinese = rng.random() < zh_ratio
+        if chinese:
+            title = ''.join(rng.sample(topic['phrases'], 2)) + rng.choice(['', ' ' + rng.choice(topic['words'])])
+        else:
+            title = ' '.join(rng.sample(topic['words'], rng.randint(2, 5))).title()
+
+        paragraphs = []
+        for _ in range(rng.randint(4, 30)):
+            sentences = []
+            for _ in range(rng.randint(1, 6)):
+                # 85% 的句子使用文章的主要语言
+                if (rng.random() < 0.85) == chinese:
+                    sentences.append(han_sentence(rng, topic['phrases']))
+                else:
+                    sentences.append(latin_sentence(rng, topic['words']))
+            paragraphs.append(('' if chinese else ' ').join(sentences))
+            if rng.random() < 0.15:
+                paragraphs.append(f'## {rng.choice(topic["phrases"]) if chinese else rng.choice(topic["words"]).title()}')
+        if rng.random() < code_ratio:
+            for _ in range(rng.randint(1, 4)):
+                paragraphs.insert(rng.randrange(len(paragraphs) + 1), code_block(rng, topic['words']))
+
+        tags = sorted(set(rng.sample(topic['tags'], rng.randint(0, 3))))
+        categories = sorted(set(rng.sample(topic['categories'], rng.randint(1, 2))))
+        front_matter = [f'title: {title}', f'tags: [{", ".join(tags)}]', f'categories: [{", ".join(categories)}]']
+        if rng.random() < 0.5:
+            front_matter.append(f'description: {han_sentence(rng, topic["phrases"]) if chinese else latin_sentence(rng, topic["words"])}')
+        if rng.random() < disabled_ratio:
+            front_matter.append('disable_related: true')
+        text = '---\n' + '\n'.join(front_matter) + f'\n---\n\n# {title}\n\n' + '\n\n'.join(paragraphs) + '\n'
+
+        src_path = f'{topic["directory"]}/post-{i}.md'
+        path = Path(root) / src_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        files.append(SyntheticFile(src_path, str(path)))
+    return files
+
+
+def generate_markdown(size, profile='mixed', seed=1):
+    """
+    生成约 size 个字符的单篇 Markdown 正文（不写文件，用于单页 hook 的基准测试）
+
+    profile: 'cjk' 以中文段落为主；'code' 以代码块为主；'mixed' 中英文段落、代码块、链接、图片和 HTML 混排
+    """
+    rng = random.Random(seed)
+    words = rng.sample(LATIN_WORDS, 40) + TECH_WORDS
+    phrases = [''.join(rng.sample(HAN_CHARS, rng.randint(2, 4))) for _ in range(40)]
+    parts = [f'# {"".join(rng.sample(phrases, 2))}']
+    length = len(parts[0])
+    while length < size:
+        roll = rng.random()
+        if profile == 'code':
+            block = code_block(rng, words) if roll < 0.7 else han_sentence(rng, phrases)
+        elif profile == 'cjk':
+            block = ''.join(han_sentence(rng, phrases) for _ in range(rng.randint(2, 8)))
+            if roll < 0.1:
+                block = f'## {rng.choice(phrases)}'
+        elif roll < 0.15:
+            block = code_block(rng, words)
+        elif roll < 0.25:
+            block = (f'参见 [{rng.choice(phrases)}](https://example.com/{rng.choice(words)}/) 和 '
+                     f'![{rng.choice(phrases)}](images/{rng.choice(words)}.png)，运行 `{rng.choice(words)} --help`。')
+        elif roll < 0.3:
+            block = f'<div class="{rng.choice(words)}">{han_sentence(rng, phrases)}</div>'
+        elif roll < 0.35:
+            block = f'## {rng.choice(phrases)} {rng.choice(words)}'
+        elif roll < 0.7:
+            block = ''.join(han_sentence(rng, phrases) for _ in range(rng.randint(1, 5)))
+        else:
+            block = ' '.join(latin_sentence(rng, words) for _ in range(rng.randint(1, 4)))
+        parts.append(block)
+        length += len(block) + 2
+    return '\n\n'.join(parts) + '\n'
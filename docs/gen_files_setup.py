@@ -0,0 +1,9 @@
+# gen-files 脚本的公共准备，在 mkdocs.yml 的 gen-files scripts 中排在第一位：
+# 共享文档存储位于 hooks 目录（与 related_posts 等 hook 共用同一份已解析的文章），
+# 这里把 hooks 目录加入 sys.path，之后运行的脚本直接 `import document_store`
+from pathlib import Path
+import sys
+
+HOOKS_DIR = str(Path(__file__).resolve().parent / 'overrides' / 'hooks')
+if HOOKS_DIR not in sys.path:
+    sys.path.insert(0, HOOKS_DIR)
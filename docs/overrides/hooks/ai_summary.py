@@ -8,7 +8,102 @@ import requests
 from pathlib import Path
 from datetime import datetime
 import os
+import mmap
 import shutil
+import struct
+
+import page_rules
+
+
+class SummaryCachePack:
+    """
+    只读的摘要缓存包（单文件、按hash排序、内存映射）
+
+    文件布局：
+        头部   <4sHHI  魔数 b'AISP'、版本、保留位、条目数
+        索引   <16sQI  按摘要hash（md5的16字节）升序排列：hash、数据偏移、数据长度
+        数据   每个条目的 UTF-8 JSON
+
+    查找时对索引做二分查找，复杂度 O(log n)，且不需要逐页打开缓存文件。
+    """
+
+    MAGIC = b'AISP'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHI')
+    ENTRY = struct.Struct('<16sQI')
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, version, _, self.count = self.HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f"不支持的缓存包格式: {self.path}")
+
+        self._index_start = self.HEADER.size
+        self._data_start = self._index_start + self.count * self.ENTRY.size
+
+    def get(self, content_hash):
+        """按内容hash查找缓存条目，未命中返回None"""
+        try:
+            key = bytes.fromhex(content_hash)
+        except ValueError:
+            return None
+
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            digest, offset, length = self.ENTRY.unpack_from(self._mm, self._index_start + mid * self.ENTRY.size)
+            if digest < key:
+                lo = mid + 1
+            elif digest > key:
+                hi = mid
+            else:
+                start = self._data_start + offset
+                return json.loads(self._mm[start:start + length].decode('utf-8'))
+        return None
+
+    def items(self):
+        """按hash顺序遍历所有条目"""
+        for i in range(self.count):
+            digest, offset, length = self.ENTRY.unpack_from(self._mm, self._index_start + i * self.ENTRY.size)
+            start = self._data_start + offset
+            yield digest.hex(), json.loads(self._mm[start:start + length].decode('utf-8'))
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    @classmethod
+    def build(cls, entries, path):
+        """
+        将 {content_hash: cache_data} 写成缓存包（先写临时文件再原子替换）
+
+        Returns:
+            写入的条目数
+        """
+        records = sorted((bytes.fromhex(content_hash), json.dumps(data, ensure_ascii=False).encode('utf-8'))
+                         for content_hash, data in entries.items())
+
+        path = Path(path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, 0, len(records)))
+            offset = 0
+            for digest, blob in records:
+                f.write(cls.ENTRY.pack(digest, offset, len(blob)))
+                offset += len(blob)
+            for _, blob in records:
+                f.write(blob)
+        os.replace(tmp_path, path)
+        return len(records)
+
 
 class AISummaryGenerator:
     def __init__(self):
@@ -41,7 +136,12 @@ class AISummaryGenerator:
         
         # 添加服务配置文件，用于跟踪当前使用的服务
         self.service_config_file = self.cache_dir / "service_config.json"
-        
+
+        # 📦 预构建的缓存包（可选，由 `python ai_summary.py pack` 生成，CI 中只需恢复这一个文件）
+        self.cache_pack_file = self.cache_dir / "summaries.pack"
+        self._cache_pack = None
+        self._cache_pack_checked = False
+
         # 🤖 多AI服务配置
         self.ai_services = {
             'glm': {
@@ -104,6 +204,9 @@ class AISummaryGenerator:
             'develop/index.md',
         ]
         
+        # 上面三项编译为单个正则（page_rules），判断结果按路径缓存
+        self._build_page_rules()
+        
         # 🌍 语言配置/Language Configuration
         self.summary_language = 'zh'  # 默认中文，可选 'zh'、'en'、'both'
         
@@ -152,21 +255,20 @@ class AISummaryGenerator:
                 with open(self.service_config_file, 'r', encoding='utf-8') as f:
                     previous_config = json.load(f)
                 
-                # 检查默认服务或语言是否变更
-                if (previous_config.get('default_service') != current_config['default_service'] or
-                    previous_config.get('summary_language') != current_config['summary_language']):
+                # 语言变更无需清理：缓存按语言分别存储（见 get_content_hash）
+                old_lang = previous_config.get('summary_language', 'zh')
+                new_lang = current_config['summary_language']
+                if old_lang != new_lang:
+                    print(f"🌍 检测到语言变更: {old_lang} → {new_lang}（复用已有的分语言缓存）")
+
+                # 检查默认服务是否变更
+                if previous_config.get('default_service') != current_config['default_service']:
                     old_service = previous_config.get('default_service', 'unknown')
                     new_service = current_config['default_service']
-                    old_lang = previous_config.get('summary_language', 'zh')
-                    new_lang = current_config['summary_language']
-                    
-                    if old_service != new_service:
-                        print(f"🔄 检测到AI服务变更: {old_service} → {new_service}")
-                    if old_lang != new_lang:
-                        print(f"🌍 检测到语言变更: {old_lang} → {new_lang}")
-                    
+                    print(f"🔄 检测到AI服务变更: {old_service} → {new_service}")
                     print("🧹 自动清理AI摘要缓存...")
-                    
+                    self._close_cache_pack()
+
                     try:
                         # 删除整个缓存目录
                         if self.cache_dir.exists():
@@ -203,6 +305,10 @@ class AISummaryGenerator:
                 if cache_file.name != "service_config.json":
                     cache_file.unlink()
                     cleared_count += 1
+            if self.cache_pack_file.exists():
+                self._close_cache_pack()
+                self.cache_pack_file.unlink()
+                cleared_count += 1
             print(f"✅ 已清理 {cleared_count} 个缓存文件")
         except Exception as e:
             print(f"❌ 单文件清理失败: {e}")
@@ -225,7 +331,8 @@ class AISummaryGenerator:
         if old_service != service_name:
             print(f"🔄 AI服务已切换: {old_service} → {service_name}")
             print("🧹 自动清理所有AI摘要缓存...")
-            
+            self._close_cache_pack()
+
             try:
                 if self.cache_dir.exists():
                     shutil.rmtree(self.cache_dir)
@@ -256,22 +363,10 @@ class AISummaryGenerator:
         old_language = self.summary_language
         self.summary_language = language
         
+        # 缓存按语言分别存储（'both' 模式拆分为 zh/en 两条），切换语言无需清理缓存
         if old_language != language:
             print(f"🌍 摘要语言已切换: {old_language} → {language}")
-            print("🧹 自动清理摘要缓存以应用新语言设置...")
-            
-            try:
-                if self.cache_dir.exists():
-                    shutil.rmtree(self.cache_dir)
-                    print(f"✅ 已删除缓存文件夹: {self.cache_dir}")
-                
-                # 重新创建缓存目录
-                self.cache_dir.mkdir(exist_ok=True)
-                print("📁 已重新创建缓存目录")
-                
-            except Exception as e:
-                print(f"❌ 清理缓存失败: {e}")
-        
+
         # 更新服务配置记录
         self._check_service_change()
     
@@ -283,10 +378,27 @@ class AISummaryGenerator:
             self.exclude_patterns = exclude_patterns
         if exclude_files is not None:
             self.exclude_files = exclude_files
+        self._build_page_rules()
     
-    def get_content_hash(self, content):
-        """生成内容hash用于缓存（包含语言设置）"""
-        content_with_lang = f"{content}_{self.summary_language}"
+    def _build_page_rules(self):
+        """
+        把启用的文件夹和排除规则注册为 page_rules 规则（可在 mkdocs.yml 的 extra.page_rules.ai_summary 中覆盖）：
+        文件夹匹配路径开头或路径中的 /文件夹/，排除模式匹配路径中的子串，排除文件精确匹配
+        """
+        self.page_rules = page_rules.register(
+            'ai_summary',
+            include_regexes=[f'(?:.*/)?{re.escape(folder)}' for folder in self.enabled_folders],
+            exclude_substrings=self.exclude_patterns,
+            exclude_files=self.exclude_files,
+        )
+    
+    def get_summary_languages(self):
+        """当前设置需要的摘要语言（'both' 模式拆分为中文和英文分别缓存）"""
+        return ['zh', 'en'] if self.summary_language == 'both' else [self.summary_language]
+
+    def get_content_hash(self, content, language=None):
+        """生成内容hash用于缓存（包含语言设置，默认为当前语言）"""
+        content_with_lang = f"{content}_{language or self.summary_language}"
         return hashlib.md5(content_with_lang.encode('utf-8')).hexdigest()
     
     def get_cached_summary(self, content_hash):
@@ -294,21 +406,96 @@ class AISummaryGenerator:
         # 如果禁用了缓存功能，直接返回None
         if not self.ci_config['cache_enabled']:
             return None
-            
+
+        # 优先查找预构建的缓存包（无需逐页打开文件）。
+        # 缓存包按内容hash查找，内容不变摘要就不会过期，因此不做7天过期检查（CI 中恢复的旧缓存包照常命中）
+        cache_pack = self._get_cache_pack()
+        if cache_pack:
+            try:
+                cache_data = cache_pack.get(content_hash)
+                if cache_data and cache_data.get('summary'):
+                    return cache_data
+            except Exception:
+                pass
+
         cache_file = self.cache_dir / f"{content_hash}.json"
         if cache_file.exists():
             try:
                 with open(cache_file, 'r', encoding='utf-8') as f:
                     cache_data = json.load(f)
-                    # 检查缓存是否过期（7天）
-                    cache_time = datetime.fromisoformat(cache_data.get('timestamp', '1970-01-01'))
-                    if (datetime.now() - cache_time).days < 7:
+                    if self._is_cache_valid(cache_data):
                         return cache_data
             except:
                 pass
         return None
-    
-    def save_summary_cache(self, content_hash, summary_data):
+
+    def _is_cache_valid(self, cache_data):
+        """检查缓存是否过期（7天）"""
+        try:
+            cache_time = datetime.fromisoformat(cache_data.get('timestamp', '1970-01-01'))
+        except (TypeError, ValueError):
+            return False
+        return (datetime.now() - cache_time).days < 7
+
+    def _get_cache_pack(self):
+        """懒加载缓存包（不存在或损坏时返回None，只检查一次）"""
+        if not self._cache_pack_checked:
+            self._cache_pack_checked = True
+            if self.cache_pack_file.exists():
+                try:
+                    self._cache_pack = SummaryCachePack(self.cache_pack_file)
+                    print(f"📦 已加载摘要缓存包，共 {self._cache_pack.count} 条: {self.cache_pack_file}")
+                except Exception as e:
+                    print(f"⚠️ 摘要缓存包读取失败，回退到单文件缓存: {e}")
+                    self._cache_pack = None
+        return self._cache_pack
+
+    def _close_cache_pack(self):
+        """关闭缓存包的内存映射（清理缓存目录前调用）"""
+        if self._cache_pack:
+            self._cache_pack.close()
+        self._cache_pack = None
+        self._cache_pack_checked = False
+
+    def pack_cache(self):
+        """
+        将所有有效的单文件缓存（以及已有缓存包中的条目）打包成一个缓存包
+
+        Returns:
+            打包的条目数
+        """
+        entries = {}
+
+        # 先收集旧缓存包中的条目（与查找时一样不做过期检查），单文件缓存更新时覆盖它们
+        cache_pack = self._get_cache_pack()
+        if cache_pack:
+            for content_hash, cache_data in cache_pack.items():
+                if cache_data.get('summary'):
+                    entries[content_hash] = cache_data
+
+        skipped_count = 0
+        for cache_file in self.cache_dir.glob("*.json"):
+            if not re.fullmatch(r'[0-9a-f]{32}', cache_file.stem):
+                continue
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    cache_data = json.load(f)
+            except Exception:
+                skipped_count += 1
+                continue
+            if cache_data.get('summary') and self._is_cache_valid(cache_data):
+                entries[cache_file.stem] = cache_data
+            else:
+                skipped_count += 1
+
+        self._close_cache_pack()
+        count = SummaryCachePack.build(entries, self.cache_pack_file)
+        print(f"✅ 已打包 {count} 条摘要缓存: {self.cache_pack_file}")
+        if skipped_count > 0:
+            print(f"📝 跳过 {skipped_count} 个无效或过期的缓存文件")
+        return count
+
+    def save_summary_cache(self, content_hash, summary_data, language=None):
         """保存摘要到缓存"""
         # 如果禁用了缓存功能，不保存缓存
         if not self.ci_config['cache_enabled']:
@@ -317,7 +504,7 @@ class AISummaryGenerator:
         cache_file = self.cache_dir / f"{content_hash}.json"
         try:
             summary_data['timestamp'] = datetime.now().isoformat()
-            summary_data['language'] = self.summary_language
+            summary_data['language'] = language or self.summary_language
             with open(cache_file, 'w', encoding='utf-8') as f:
                 json.dump(summary_data, f, ensure_ascii=False, indent=2)
         except Exception as e:
@@ -427,17 +614,16 @@ Please generate summary:"""
    - Use professional but understandable language
    - Avoid repeating the article title content
 3. **Format Requirements**:
-   - First provide Chinese summary
-   - Then provide English summary
-   - Separate with a blank line
-   - No prefixes or additional formatting
+   - Return a single JSON object and nothing else (no code fences, no explanations)
+   - The object must have exactly two string fields: "zh" (Chinese summary) and "en" (English summary)
+   - Example: {{"zh": "中文摘要……", "en": "English summary..."}}
 
 Article Title: {page_title}
 
 Article Content:
 {content[:2500]}
 
-Please generate bilingual summary:"""
+Please generate bilingual summary JSON:"""
 
         else:  # 默认中文
             prompt = f"""请为以下技术文章生成一个高质量的摘要，要求：
@@ -569,6 +755,10 @@ Please generate bilingual summary:"""
                     summary = re.sub(r'^\s*总结[：:]\s*', '', summary)
                     summary = re.sub(r'^\s*Summary[：:]\s*', '', summary)
                     summary = re.sub(r'^\s*Abstract[：:]\s*', '', summary)
+
+                    # 双语模式返回 {'zh': ..., 'en': ...}，便于分语言缓存
+                    if self.summary_language == 'both':
+                        return self.parse_bilingual_summary(summary)
                     return summary
                 
             else:
@@ -582,6 +772,32 @@ Please generate bilingual summary:"""
             print(f"{service_name} 摘要生成异常: {e}")
             return None
     
+    def parse_bilingual_summary(self, text):
+        """
+        解析双语摘要响应
+
+        优先解析 JSON 对象 {"zh": ..., "en": ...}；兼容旧格式（中文段落 + 空行 + 英文段落）。
+        解析失败返回None。
+        """
+        start, end = text.find('{'), text.rfind('}')
+        if start != -1 and end > start:
+            try:
+                data = json.loads(text[start:end + 1])
+                if isinstance(data, dict):
+                    zh_summary = str(data.get('zh', '')).strip()
+                    en_summary = str(data.get('en', '')).strip()
+                    if zh_summary and en_summary:
+                        return {'zh': zh_summary, 'en': en_summary}
+            except ValueError:
+                pass
+
+        parts = [part.strip() for part in re.split(r'\n\s*\n', text.strip()) if part.strip()]
+        if len(parts) == 2:
+            return {'zh': parts[0], 'en': parts[1]}
+
+        print("解析双语摘要失败：响应不是预期的 JSON 格式")
+        return None
+
     def generate_ai_summary(self, content, page_title=""):
         """生成AI摘要（支持CI环境策略）"""
         is_ci = self.is_ci_environment()
@@ -669,9 +885,7 @@ Please generate bilingual summary:"""
             if self.summary_language == 'en':
                 return self._generate_english_fallback(page_title)
             elif self.summary_language == 'both':
-                zh_summary = summary
-                en_summary = self._generate_english_fallback(page_title)
-                return f"{zh_summary}\n\n{en_summary}"
+                return {'zh': summary, 'en': self._generate_english_fallback(page_title)}
             else:
                 return summary
         else:
@@ -679,9 +893,8 @@ Please generate bilingual summary:"""
             if self.summary_language == 'en':
                 return self._generate_english_fallback(page_title)
             elif self.summary_language == 'both':
-                zh_summary = self._generate_chinese_fallback(page_title)
-                en_summary = self._generate_english_fallback(page_title)
-                return f"{zh_summary}\n\n{en_summary}"
+                return {'zh': self._generate_chinese_fallback(page_title),
+                        'en': self._generate_english_fallback(page_title)}
             else:
                 return self._generate_chinese_fallback(page_title)
     
@@ -831,15 +1044,17 @@ Please generate bilingual summary:"""
             print(f"📄 内容太短，跳过摘要生成: {page.file.src_path}")
             return markdown
         
-        content_hash = self.get_content_hash(clean_content)
+        # 每种语言单独缓存（'both' 模式拆分为 zh/en），切换语言后可直接复用
+        languages = self.get_summary_languages()
+        content_hashes = {lang: self.get_content_hash(clean_content, lang) for lang in languages}
         page_title = getattr(page, 'title', '')
         is_ci = self.is_ci_environment()
         
         # 检查缓存
-        cached_summary = self.get_cached_summary(content_hash)
-        if cached_summary:
-            summary = cached_summary.get('summary', '')
-            ai_service = cached_summary.get('service', 'cached')
+        cached_summaries = {lang: self.get_cached_summary(content_hashes[lang]) for lang in languages}
+        if all(cached_summaries.values()):
+            summaries = {lang: cached.get('summary', '') for lang, cached in cached_summaries.items()}
+            ai_service = cached_summaries[languages[0]].get('service', 'cached')
             env_desc = '(CI)' if is_ci else '(本地)'
             print(f"✅ 使用缓存摘要 {env_desc}: {page.file.src_path}")
         else:
@@ -848,7 +1063,7 @@ Please generate bilingual summary:"""
                 print(f"📦 CI 环境仅使用缓存模式，无缓存可用，跳过摘要生成: {page.file.src_path}")
                 return markdown
             
-            # 生成新摘要
+            # 生成新摘要（双语模式一次请求同时返回中英文）
             lang_desc = {'zh': '中文', 'en': '英文', 'both': '双语'}
             env_desc = '(CI)' if is_ci else '(本地)'
             print(f"🤖 正在生成{lang_desc.get(self.summary_language, '中文')}AI摘要 {env_desc}: {page.file.src_path}")
@@ -866,15 +1081,19 @@ Please generate bilingual summary:"""
             else:
                 print(f"✅ AI摘要生成成功 ({ai_service}) {env_desc}: {page.file.src_path}")
             
-            # 保存到缓存
-            if summary:
-                self.save_summary_cache(content_hash, {
-                    'summary': summary,
-                    'service': ai_service,
-                    'page_title': page_title
-                })
+            summaries = summary if isinstance(summary, dict) else {languages[0]: summary}
+
+            # 保存到缓存（每种语言一条）
+            for lang in languages:
+                if summaries.get(lang):
+                    self.save_summary_cache(content_hashes[lang], {
+                        'summary': summaries[lang],
+                        'service': ai_service,
+                        'page_title': page_title
+                    }, language=lang)
         
         # 添加摘要到页面最上面
+        summary = '\n\n'.join(summaries[lang] for lang in languages if summaries.get(lang))
         if summary:
             summary_html = self.format_summary(summary, ai_service)
             return summary_html + '\n\n' + markdown
@@ -893,24 +1112,14 @@ Please generate bilingual summary:"""
             if page.meta.get('ai_summary') == True:
                 return True
         
-        # 获取文件路径
+        # 检查排除规则和启用的文件夹（判断结果按路径缓存）
         src_path = page.file.src_path.replace('\\', '/')  # 统一路径分隔符
-        
-        # 检查排除模式
-        if any(pattern in src_path for pattern in self.exclude_patterns):
-            return False
-        
-        # 检查排除的特定文件
-        if src_path in self.exclude_files:
-            return False
-        
-        # 检查是否在启用的文件夹中
-        for folder in self.enabled_folders:
-            if src_path.startswith(folder) or f'/{folder}' in src_path:
-                folder_name = folder.rstrip('/')
-                lang_desc = {'zh': '中文', 'en': '英文', 'both': '双语'}
-                print(f"🎯 {folder_name}文件夹文章检测到，启用{lang_desc.get(self.summary_language, '中文')}AI摘要: {src_path}")
-                return True
+        if self.page_rules.allows(src_path):
+            folder_name = next((folder for folder in self.enabled_folders
+                                if src_path.startswith(folder) or f'/{folder}' in src_path), '').rstrip('/')
+            lang_desc = {'zh': '中文', 'en': '英文', 'both': '双语'}
+            print(f"🎯 {folder_name}文件夹文章检测到，启用{lang_desc.get(self.summary_language, '中文')}AI摘要: {src_path}")
+            return True
         
         # 默认不生成摘要
         return False
@@ -958,6 +1167,9 @@ Please generate bilingual summary:"""
         icon = '💾' if ai_service not in ['fallback', 'ci_cache_only'] else '📝'
         color = 'info' if ai_service not in ['fallback', 'ci_cache_only'] else 'tip'
         
+        # 多段摘要（如双语）每行都需要缩进，才能留在提示框内
+        summary = summary.replace('\n', '\n    ')
+
         return f'''!!! {color} "{icon} {service_name}"
     {summary}
 
@@ -1063,6 +1275,20 @@ def configure_ci_behavior(enabled_in_ci=None, enabled_in_local=None, ci_only_cac
         ai_summary_generator.ci_config['cache_enabled'] = cache_enabled
         print(f"✅ 缓存功能: {'启用' if cache_enabled else '禁用'}")
 
+def on_config(config):
+    """读取 mkdocs.yml 中覆盖的页面规则"""
+    ai_summary_generator.page_rules.configure(config)
+
 def on_page_markdown(markdown, page, config, files):
     """MkDocs hook入口点"""
-    return ai_summary_generator.process_page(markdown, page, config)
\ No newline at end of file
+    return ai_summary_generator.process_page(markdown, page, config)
+
+if __name__ == '__main__':
+    # 打包摘要缓存：python docs/overrides/hooks/ai_summary.py pack
+    # 生成的 .ai_cache/summaries.pack 可作为单个构件在 CI 中恢复
+    import sys
+
+    if sys.argv[1:2] == ['pack']:
+        ai_summary_generator.pack_cache()
+    else:
+        print("用法: python docs/overrides/hooks/ai_summary.py pack")
@@ -1,23 +1,18 @@
 import os
-import fnmatch
 import re
 from mkdocs.structure.pages import Page
 from mkdocs.config.defaults import MkDocsConfig
 
+import page_rules
+
 # 新增debug参数控制打印输出
 debug = False  # 设置为True开启调试打印，False关闭
 
 # 数据结构调整为: {分类名: {"url": 分类URL, "pages": {页面URL: 页面信息}}}
 categories = {}
-exclude_config = {
-    "dirs": [],
-    "files": [],
-    "patterns": []
-}
-# 新增包含目录配置
-include_config = {
-    "dirs": []
-}
+# 页面过滤规则（在 on_config 中读取 extra.exclude_categories / include_categories，
+# 以及 extra.page_rules.categories，由 page_rules 编译为单个正则）
+PAGE_RULES = page_rules.register("categories")
 
 def normalize_path(path: str) -> str:
     """将路径中的反斜杠转换为正斜杠，统一路径格式"""
@@ -54,103 +49,58 @@ def to_kebab_case(text: str) -> str:
         return "uncategorized"
     return res
 
+def read_path_list(raw_config, key):
+    """读取配置中的路径列表（不是列表时忽略）并标准化路径"""
+    value = raw_config.get(key, [])
+    return [normalize_path(path) for path in value] if isinstance(value, list) else []
+
 def on_config(config: MkDocsConfig):
     """读取过滤配置并标准化路径"""
-    global exclude_config, include_config, debug  # 引用全局debug变量
+    global debug  # 引用全局debug变量
     
     # 从配置中读取debug模式（如果有），否则使用默认值
     debug = config.extra.get("categories_debug", debug)
     
-    # 处理排除配置
+    # 处理排除配置和包含配置（extra.page_rules.categories 中的同名规则优先）
     raw_exclude_config = config.extra.get("exclude_categories", {})
-    exclude_config["dirs"] = [
-        normalize_path(dir_path) 
-        for dir_path in (raw_exclude_config.get("dirs", []) if isinstance(raw_exclude_config.get("dirs", []), list) else [])
-    ]
-    exclude_config["files"] = [
-        normalize_path(file_path) 
-        for file_path in (raw_exclude_config.get("files", []) if isinstance(raw_exclude_config.get("files", []), list) else [])
-    ]
-    exclude_config["patterns"] = [
-        normalize_path(pattern) 
-        for pattern in (raw_exclude_config.get("patterns", []) if isinstance(raw_exclude_config.get("patterns", []), list) else [])
-    ]
-    
-    # 新增：处理包含配置
     raw_include_config = config.extra.get("include_categories", {})
-    include_config["dirs"] = [
-        normalize_path(dir_path) 
-        for dir_path in (raw_include_config.get("dirs", []) if isinstance(raw_include_config.get("dirs", []), list) else [])
-    ]
+    PAGE_RULES.defaults = dict(
+        PAGE_RULES.defaults,
+        exclude_dirs=read_path_list(raw_exclude_config, "dirs"),
+        exclude_files=read_path_list(raw_exclude_config, "files"),
+        exclude_globs=[pattern for pattern in read_path_list(raw_exclude_config, "patterns") if pattern],
+        include_dirs=read_path_list(raw_include_config, "dirs"),
+    )
+    PAGE_RULES.configure(config)
     
     # 仅在debug模式下打印
     if debug:
         print("\n===== 分类过滤规则（标准化后） =====")
-        print(f"包含目录: {include_config['dirs']}")
-        print(f"排除目录: {exclude_config['dirs']}")
-        print(f"排除文件: {exclude_config['files']}")
-        print(f"排除模式: {exclude_config['patterns']}")
+        print(f"包含目录: {PAGE_RULES.rules['include_dirs']}")
+        print(f"排除目录: {PAGE_RULES.rules['exclude_dirs']}")
+        print(f"排除文件: {PAGE_RULES.rules['exclude_files']}")
+        print(f"排除模式: {PAGE_RULES.rules['exclude_globs']}")
         print("====================================\n")
     return config
 
 def is_excluded(page: Page) -> bool:
-    """判断页面是否需要被排除（处理路径分隔符）"""
+    """判断页面是否需要被排除（处理路径分隔符，判断结果按路径缓存）"""
     try:
         src_path = page.file.src_path
     except AttributeError:
         src_path = getattr(page, 'src_path', '')
     
-    src_path = normalize_path(src_path)
-    
     if not src_path:
         return False
     
-    # 新增：包含目录过滤（白名单机制）
-    if include_config["dirs"]:
-        included = False
-        for dir_pattern in include_config["dirs"]:
-            normalized_dir = normalize_path(dir_pattern).rstrip("/") + "/"
-            if src_path.startswith(normalized_dir):
-                included = True
-                break
-        if not included:
-            # 仅在debug模式下打印
-            if debug:
-                print(f"❌ 不在包含目录中的文档: {src_path}")
-                print(f"   包含目录: {include_config['dirs']}")
-            return True
-    
-    # 1. 目录过滤
-    if exclude_config["dirs"]:
-        for dir_pattern in exclude_config["dirs"]:
-            normalized_dir = normalize_path(dir_pattern).rstrip("/") + "/"
-            if src_path.startswith(normalized_dir):
-                # 仅在debug模式下打印
-                if debug:
-                    print(f"❌ 排除目录中的文档: {src_path}")
-                    print(f"   匹配规则: 目录 '{normalized_dir}'")
-                return True
-    
-    # 2. 文件过滤
-    if exclude_config["files"] and src_path in exclude_config["files"]:
-        # 仅在debug模式下打印
-        if debug:
-            print(f"❌ 排除特定文件: {src_path}")
-            print(f"   匹配规则: 文件列表")
-        return True
-    
-    # 3. 模式过滤
-    if exclude_config["patterns"]:
-        for pattern in exclude_config["patterns"]:
-            normalized_pattern = normalize_path(pattern)
-            if normalized_pattern and fnmatch.fnmatch(src_path, normalized_pattern):
-                # 仅在debug模式下打印
-                if debug:
-                    print(f"❌ 排除模式匹配的文档: {src_path}")
-                    print(f"   匹配规则: 模式 '{normalized_pattern}'")
-                return True
+    if PAGE_RULES.allows(src_path):
+        return False
     
-    return False
+    # 仅在debug模式下打印
+    if debug:
+        print(f"❌ 排除的文档: {normalize_path(src_path)}")
+        print(f"   匹配规则: {PAGE_RULES.explain(src_path)}")
+    return True
 
 # 以下on_page_markdown和on_env函数保持不变
 def on_page_markdown(markdown: str, page: Page, config: MkDocsConfig, **kwargs):
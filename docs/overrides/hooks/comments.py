@@ -4,52 +4,39 @@
 # ---
 
 from textwrap import dedent
-import re
 
-# 配置：需要添加评论的目录
-COMMENT_DIRECTORIES = ['blog/', 'develop/']
+import page_rules
 
-# 配置：排除评论的页面列表
-EXCLUDED_PAGES = {
-    'blog/index.md',
-    'develop/index.md',
-}
+# 配置：需要添加评论的页面（规则由 page_rules 编译为单个正则，可在 mkdocs.yml 的 extra.page_rules.comments 中覆盖）
+PAGE_RULES = page_rules.register(
+    'comments',
+    suffixes=['.md'],
+    # 需要添加评论的目录
+    include_dirs=['blog/', 'develop/'],
+    # 排除评论的页面列表
+    exclude_files=[
+        'blog/index.md',
+        'develop/index.md',
+    ],
+    # 排除评论的页面模式（正则，从路径开头匹配）
+    exclude_regexes=[
+        r'.*\/index\.md$',  # 排除所有 index.md 文件
+        r'.*\/archive\.md$',  # 排除所有 archive.md 文件
+        r'blog/category/.*\.md$',  # 排除所有 blog/category/ 下的 Markdown 文件
+    ],
+)
 
-# 配置：排除评论的页面模式
-EXCLUDED_PATTERNS = [
-    r'.*\/index\.md$',  # 排除所有 index.md 文件
-    r'.*\/archive\.md$',  # 排除所有 archive.md 文件
-    r'blog/category/.*\.md$',  # 排除所有 blog/category/ 下的 Markdown 文件
-]
+def should_add_comments(file_path):
+    """检查文件是否应该添加评论（判断结果按路径缓存）"""
+    return PAGE_RULES.allows(file_path)
 
-def is_page_excluded(file_path):
-    """检查页面是否应该排除评论"""
-    # 精确匹配检查
-    if file_path in EXCLUDED_PAGES:
-        return True
-    
-    # 模式匹配检查
-    for pattern in EXCLUDED_PATTERNS:
-        if re.match(pattern, file_path):
-            return True
-    
-    return False
+def on_config(config):
+    """读取 mkdocs.yml 中覆盖的页面规则"""
+    PAGE_RULES.configure(config)
 
-def should_add_comments(file_path):
-    """检查文件是否应该添加评论"""
-    if not file_path.endswith('.md'):
-        return False
-    
-    # 先检查是否被排除
-    if is_page_excluded(file_path):
-        return False
-    
-    # 检查是否在指定目录下
-    for directory in COMMENT_DIRECTORIES:
-        if file_path.startswith(directory):
-            return True
-    
-    return False
+def markdown_cache_key(page, config):
+    """markdown_cache 的缓存键中本 hook 代码之外的输入：页面规则（可能被 mkdocs.yml 覆盖）"""
+    return PAGE_RULES.fingerprint()
 
 def on_page_markdown(markdown, **kwargs):
     """为符合条件的页面添加 Twikoo 评论系统"""
@@ -0,0 +1,92 @@
+"""
+共享的 Markdown 文档存储
+
+hooks（related_posts 等）和 gen-files 脚本（archives.py、categories.py、tags.py、tag-post.py）
+都通过这里读取文章，保证每个源文件在一次构建中只读取、只解析一次：
+原文、front matter、内容哈希和正文偏移都缓存在内存中。
+
+文件修改时间或大小变化时自动重新读取（兼容 mkdocs serve 的多次重建）。
+
+hooks 中直接 `import document_store`（MkDocs 加载 hook 时会把 hooks 目录加入 sys.path），
+gen-files 脚本需要先把 docs/overrides/hooks 加入 sys.path。
+"""
+
+import hashlib
+import os
+import re
+
+import yaml
+
+# front matter 匹配规则（与 related_posts.extract_metadata 一致；结尾的 --- 也可以是文件最后一行，没有换行，与原 gen-files 脚本的解析一致）
+FRONT_MATTER_PATTERN = re.compile(r'^---\s*\n(.*?)\n---\s*(?:\n|\Z)', re.DOTALL)
+
+# {绝对路径: Document}
+_documents = {}
+
+
+class Document:
+    """一个 Markdown 源文件的解析结果（front matter 在首次访问时才解析）"""
+
+    __slots__ = ('path', 'text', 'content_hash', 'body_offset', 'front_matter',
+                 'stat_key', '_meta', '_meta_error')
+
+    def __init__(self, path, text, stat_key=None):
+        self.path = path
+        self.text = text
+        self.content_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
+        self.stat_key = stat_key
+
+        match = FRONT_MATTER_PATTERN.match(text)
+        self.front_matter = match.group(1) if match else None
+        self.body_offset = match.end() if match else 0
+
+        self._meta = None
+        self._meta_error = None
+
+    @property
+    def body(self):
+        """去掉 front matter 后的正文"""
+        return self.text[self.body_offset:]
+
+    @property
+    def meta(self):
+        """解析后的 front matter 字典（没有或解析失败时为空字典）"""
+        if self._meta is None:
+            self._meta = {}
+            if self.front_matter:
+                try:
+                    data = yaml.safe_load(self.front_matter)
+                    if isinstance(data, dict):
+                        self._meta = data
+                except yaml.YAMLError as e:
+                    self._meta_error = e
+        return self._meta
+
+    @property
+    def meta_error(self):
+        """front matter 的 YAML 解析错误（没有错误时为None）"""
+        self.meta  # 触发解析
+        return self._meta_error
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_document(path):
+    """获取文档（首次访问或文件变化时读取，之后直接返回缓存）"""
+    abs_path = os.path.abspath(path)
+    stat_key = _stat_key(abs_path)
+
+    document = _documents.get(abs_path)
+    if document is None or document.stat_key != stat_key:
+        with open(abs_path, 'r', encoding='utf-8-sig') as f:
+            document = Document(abs_path, f.read(), stat_key)
+        _documents[abs_path] = document
+    return document
+
+
+def clear():
+    """清空存储"""
+    _documents.clear()
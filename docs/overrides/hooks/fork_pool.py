@@ -0,0 +1,51 @@
+"""
+hooks 共用的 fork 进程池
+
+MkDocs 以文件路径作为模块名加载 hook（docs/overrides/hooks/related_posts.py），pickle 无法按这个名称导入模块，
+hook 中定义的函数不能直接交给进程池。hook 以 `import fork_pool` 导入本模块（普通模块名，pickle 可以按名称找到），
+创建进程池之前把任务函数登记在这里；子进程由 fork 创建并继承登记表，进程间只传递任务名称和数据。
+
+只在 mkdocs build / gh-deploy 中使用进程池：mkdocs serve 运行着文件监视和自动刷新线程，fork 出的子进程状态不可靠。
+hook 需要在 on_startup 中调用 set_command(command)；没有调用过（例如在基准测试中直接调用）或平台不支持 fork（Windows）时保持串行。
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# 允许使用进程池的 MkDocs 命令
+POOL_COMMANDS = ('build', 'gh-deploy')
+
+# {任务名称: 函数}，fork 时子进程继承
+_tasks = {}
+# 当前的 MkDocs 命令
+_command = None
+
+
+def set_command(command):
+    """记录当前的 MkDocs 命令（在 hook 的 on_startup 中调用）"""
+    global _command
+    _command = command
+
+
+def worker_count(workers=None):
+    """可以使用的进程数（None 表示 CPU 核数）；当前命令或平台不能使用进程池时返回 1"""
+    if _command not in POOL_COMMANDS or 'fork' not in multiprocessing.get_all_start_methods():
+        return 1
+    return workers or os.cpu_count() or 1
+
+
+def _run_task(name, chunk):
+    return _tasks[name](chunk)
+
+
+def map_chunks(name, func, chunks, workers):
+    """在 fork 创建的进程池中对每块数据执行 func，按 chunks 的顺序返回结果列表"""
+    _tasks[name] = func
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                 mp_context=multiprocessing.get_context('fork')) as executor:
+            return list(executor.map(partial(_run_task, name), chunks))
+    finally:
+        _tasks.pop(name, None)
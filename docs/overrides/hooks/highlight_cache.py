@@ -0,0 +1,225 @@
+"""
+代码块高亮缓存：相同的代码块只用 Pygments 高亮一次，结果跨页面、跨构建复用
+
+在 mkdocs.yml 的 hooks 中加入本文件即可启用。pymdownx.highlight（superfences 的代码块也由它高亮）
+每次构建都要对每个代码块重新做 Pygments 词法分析，教程中相同的代码片段出现在多个页面时也会重复处理。
+本 hook 在 on_config 中包装 pymdownx.highlight.Highlight.highlight：
+
+缓存键由以下内容的 MD5 组成：
+- 代码、语言和这个代码块的选项（hl_lines、linenums 起始行、title、class、id、data- 属性等）
+- Highlight 的全部配置（linenums、anchor_linenums、pygments_style、extend_pygments_lang 等）
+- Pygments 和 pymdownx 的版本（升级后自动失效）
+
+开启 anchor_linenums 时行号锚点包含代码块在页面中的序号（__codelineno-3-1），
+因此缓存中保存的 HTML 用占位符代替序号，取出时再换成当前的序号，同一段代码在不同页面、不同位置都能命中。
+行内代码（inlinehilite）、不使用 Pygments 时以及 HTML 模式的标题（放入 htmlStash，与页面有关）不缓存。
+
+Highlight.highlight 的参数按 inspect.signature 绑定（不同版本的 pymdownx 参数不同，全部参数都计入缓存键）；
+签名不是预期的形式（缺少 src/language/inline，或有 *args、**kwargs、仅限位置的参数）时不包装，缓存停用并输出警告。
+
+缓存保存在 .highlight_cache/blocks.json，构建结束时输出命中率和节省的高亮时间
+（按每个代码块首次高亮时记录的耗时计算，已扣除缓存查找的耗时）。
+启用 prerender.py 并行渲染时，子进程中新增的缓存条目、用到的缓存键和统计随预渲染结果传回主进程
+（prerender_collect / prerender_merge）。
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import time
+from pathlib import Path
+
+import pygments
+import pymdownx
+from pymdownx.highlight import Highlight
+
+HIGHLIGHT_CACHE_CONFIG = {
+    'persist': True,  # 是否把缓存保存到磁盘（False 时只在同一次构建和 mkdocs serve 的多次重建之间复用）
+    'cache_file': Path(".highlight_cache") / "blocks.json",  # 与 .ai_cache、.markdown_cache 一样放在项目根目录
+}
+# 缓存格式版本，修改缓存键或缓存值的结构后需要增加
+CACHE_VERSION = 1
+# 代码块序号的占位符（代码或选项中包含它时不缓存）
+BLOCK_COUNT_PLACEHOLDER = '@@highlight-cache-block@@'
+# Highlight.highlight 必须有的参数（缓存键和 is_cacheable 依赖它们）
+REQUIRED_PARAMETERS = ('src', 'language', 'inline')
+
+# {缓存键: {'html': 高亮结果（序号为占位符）, 'seconds': 首次高亮的耗时}}，在 on_config 中从磁盘加载
+block_cache = None
+# 本次构建用到的缓存键（构建结束时只保留这些条目）
+used_keys = set()
+# 本进程新增的缓存键（prerender.py 的子进程把这些条目传回主进程）
+new_keys = set()
+block_cache_dirty = False
+# 命中数、未命中数、命中的代码块首次高亮的总耗时、命中时查找缓存的总耗时
+cache_stats = {'hits': 0, 'misses': 0, 'saved': 0.0, 'lookup': 0.0}
+
+
+def load_block_cache():
+    """读取磁盘上的缓存，版本不一致或读取失败时返回空字典"""
+    if not HIGHLIGHT_CACHE_CONFIG['persist']:
+        return {}
+    try:
+        with open(HIGHLIGHT_CACHE_CONFIG['cache_file'], 'r', encoding='utf-8') as f:
+            cache_data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache_data.get('version') != CACHE_VERSION:
+        return {}
+    return cache_data.get('blocks', {})
+
+
+def save_block_cache():
+    """把缓存写入磁盘（先写临时文件再替换，避免中断时留下损坏的缓存）"""
+    cache_file = HIGHLIGHT_CACHE_CONFIG['cache_file']
+    blocks = {key: block_cache[key] for key in sorted(block_cache)}
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'blocks': blocks}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"⚠️ 保存代码高亮缓存失败: {e}")
+
+
+def highlighter_options(highlighter):
+    """Highlight 实例的全部配置（md 是 Markdown 实例，与输出无关）"""
+    return {name: value for name, value in vars(highlighter).items() if name != 'md'}
+
+
+def is_cacheable(highlighter, block):
+    """只缓存用 Pygments 高亮的代码块；HTML 模式的标题会放入页面的 htmlStash，不能复用"""
+    if block['inline'] or not highlighter.use_pygments:
+        return False
+    if highlighter.title_mode == 'html' or any(isinstance(value, dict)
+                                                for value in highlighter.auto_title_map.values()):
+        return False
+    return not any(BLOCK_COUNT_PLACEHOLDER in str(value) for value in block.values())
+
+
+def highlight_signature(highlight):
+    """Highlight.highlight 的参数签名；不是预期的形式时返回 None（不包装）"""
+    try:
+        signature = inspect.signature(highlight)
+    except (TypeError, ValueError):
+        return None
+    if any(parameter.kind not in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY)
+           for parameter in signature.parameters.values()):
+        return None
+    if not set(REQUIRED_PARAMETERS) <= signature.parameters.keys():
+        return None
+    return signature
+
+
+def cached_highlight(highlight, signature):
+    """包装 Highlight.highlight：按 (语言, 代码摘要, 高亮选项) 缓存代码块的 HTML，参数按 signature 绑定"""
+    self_name = next(iter(signature.parameters))
+
+    def wrapper(self, *args, **kwargs):
+        global block_cache_dirty
+        if block_cache is None:
+            return highlight(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        block = dict(bound.arguments)
+        del block[self_name]
+        # 没有 code_block_count 参数的版本不输出代码块序号，不需要占位符
+        code_block_count = block.pop('code_block_count', None)
+        if not is_cacheable(self, block):
+            return highlight(self, *args, **kwargs)
+        src = block['src']
+
+        start = time.perf_counter()
+        key_parts = {
+            'version': CACHE_VERSION,
+            'pygments': pygments.__version__,
+            'pymdownx': pymdownx.__version__,
+            'options': highlighter_options(self),
+            'block': dict(block, src=hashlib.md5(src.encode('utf-8')).hexdigest()),
+        }
+        key = hashlib.md5(json.dumps(key_parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        used_keys.add(key)
+        entry = block_cache.get(key)
+        if entry is not None:
+            cache_stats['hits'] += 1
+            cache_stats['saved'] += entry['seconds']
+            html = entry['html'].replace(BLOCK_COUNT_PLACEHOLDER, str(code_block_count))
+            cache_stats['lookup'] += time.perf_counter() - start
+            return html
+
+        cache_stats['misses'] += 1
+        start = time.perf_counter()
+        if code_block_count is not None:
+            block['code_block_count'] = BLOCK_COUNT_PLACEHOLDER
+        html = highlight(self, **block)
+        block_cache[key] = {'html': html, 'seconds': round(time.perf_counter() - start, 6)}
+        new_keys.add(key)
+        block_cache_dirty = True
+        return html.replace(BLOCK_COUNT_PLACEHOLDER, str(code_block_count))
+
+    wrapper.cached_method = highlight
+    return wrapper
+
+
+def on_config(config):
+    """加载缓存并包装 Highlight.highlight（mkdocs serve 重建时不重复包装）"""
+    global block_cache
+    if not hasattr(Highlight.highlight, 'cached_method'):
+        signature = highlight_signature(Highlight.highlight)
+        if signature is None:
+            print("⚠️ 当前 pymdownx 版本的 Highlight.highlight 参数与预期不同，代码高亮缓存已停用")
+            return config
+        Highlight.highlight = cached_highlight(Highlight.highlight, signature)
+    if block_cache is None:
+        block_cache = load_block_cache()
+    return config
+
+
+def prerender_collect():
+    """prerender.py 的子进程中调用：取出本进程新增的缓存条目、用到的缓存键和统计，并清空"""
+    data = {
+        'used': list(used_keys),
+        'blocks': {key: block_cache[key] for key in new_keys} if block_cache is not None else {},
+        'stats': dict(cache_stats),
+    }
+    used_keys.clear()
+    new_keys.clear()
+    cache_stats.update(hits=0, misses=0, saved=0.0, lookup=0.0)
+    return data
+
+
+def prerender_merge(data):
+    """prerender.py 在主进程中调用：合并子进程传回的缓存条目、缓存键和统计"""
+    global block_cache_dirty
+    if block_cache is None:
+        return
+    used_keys.update(data['used'])
+    if data['blocks']:
+        block_cache.update(data['blocks'])
+        block_cache_dirty = True
+    for name, value in data['stats'].items():
+        cache_stats[name] += value
+
+
+def on_post_build(config):
+    """构建结束时输出命中率和节省的时间，只保留本次用到的条目，有变化时保存到磁盘"""
+    global block_cache, block_cache_dirty
+    total = cache_stats['hits'] + cache_stats['misses']
+    if total:
+        saved = max(cache_stats['saved'] - cache_stats['lookup'], 0.0)
+        print(f"🎨 代码高亮缓存命中 {cache_stats['hits']}/{total}（{cache_stats['hits'] / total:.1%}），"
+              f"节省约 {saved:.2f}s")
+    cache_stats.update(hits=0, misses=0, saved=0.0, lookup=0.0)
+
+    if block_cache is None or not used_keys:
+        return
+    stale = len(used_keys) != len(block_cache)
+    if stale:
+        block_cache = {key: block_cache[key] for key in used_keys if key in block_cache}
+    if HIGHLIGHT_CACHE_CONFIG['persist'] and (block_cache_dirty or stale):
+        save_block_cache()
+    block_cache_dirty = False
+    used_keys.clear()
+    new_keys.clear()
@@ -0,0 +1,169 @@
+# ---
+# 构建性能分析：统计每个 hook 的每个事件、每个页面的耗时和内存分配
+# 在 mkdocs.yml 的 hooks 中加入本文件即可启用（不需要时注释掉，不影响构建）：
+#   hooks:
+#     - docs/overrides/hooks/hook_profiler.py
+#     - docs/overrides/hooks/socialmedia.py
+#     ...
+# 构建结束时在控制台输出汇总表，并把完整报告写入 .hook_profile/report.json
+# ---
+
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+from mkdocs.plugins import event_priority
+
+PROFILER_CONFIG = {
+    'memory': True,       # 是否统计内存分配（tracemalloc，会让构建变慢约一倍，只需要耗时时可关闭）
+    'top_pages': 20,      # 报告中列出最慢的页面数量
+    'report_file': Path(".hook_profile") / "report.json",  # 与 .ai_cache、.related_cache 一样放在项目根目录
+}
+
+# {(hook 名称, 事件名): [耗时秒数, 调用次数, 分配字节数]}
+event_stats = defaultdict(lambda: [0.0, 0, 0])
+# {页面路径: {hook 名称: [耗时秒数, 分配字节数]}}
+page_stats = defaultdict(lambda: defaultdict(lambda: [0.0, 0]))
+build_started = None
+
+
+def hook_name(plugin_name):
+    """hooks 在插件列表中以文件路径注册，报告中只显示文件名"""
+    return Path(plugin_name).stem
+
+
+def profile_event(method, hook, event):
+    """包装 hook 的事件函数：记录耗时、内存分配峰值和所处理的页面"""
+    def wrapper(*args, **kwargs):
+        page = kwargs.get('page')
+        if PROFILER_CONFIG['memory'] and tracemalloc.is_tracing():
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            before = None
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated = tracemalloc.get_traced_memory()[1] - before if before is not None else 0
+            stats = event_stats[(hook, event)]
+            stats[0] += elapsed
+            stats[1] += 1
+            stats[2] += allocated
+            if page is not None and getattr(page, 'file', None) is not None:
+                page_stat = page_stats[page.file.src_path][hook]
+                page_stat[0] += elapsed
+                page_stat[1] += allocated
+
+    wrapper.profiled_method = method
+    return wrapper
+
+
+@event_priority(100)
+def on_config(config):
+    """最先运行：把其他 hook 已注册的事件函数替换为计时的包装函数"""
+    global build_started
+    event_stats.clear()
+    page_stats.clear()
+    build_started = None
+
+    # 依赖 MkDocs 的内部结构（PluginCollection 的 events 和 _event_origins），MkDocs 升级后不存在时跳过，不影响构建
+    plugins = config['plugins']
+    origins = getattr(plugins, '_event_origins', None)
+    if not isinstance(origins, dict) or not isinstance(getattr(plugins, 'events', None), dict):
+        print("⚠️ 当前 MkDocs 版本不支持按事件包装 hook，构建性能分析已停用")
+        return config
+
+    build_started = time.perf_counter()
+    if PROFILER_CONFIG['memory'] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    hooks = set(config['hooks']) - {__name__}
+    for event, methods in plugins.events.items():
+        # 原地替换：本次 on_config 事件中排在后面的 hook 也会被计时
+        for i, method in enumerate(methods):
+            plugin_name = origins.get(method)
+            if plugin_name not in hooks or hasattr(method, 'profiled_method'):
+                continue
+            wrapper = profile_event(method, hook_name(plugin_name), event)
+            methods[i] = wrapper
+            origins[wrapper] = plugin_name
+    return config
+
+
+def build_report():
+    """汇总统计结果：每个 hook 的总耗时和占构建时间的比例、每个事件的耗时、最慢的页面"""
+    build_seconds = time.perf_counter() - build_started
+    hooks = defaultdict(lambda: {'seconds': 0.0, 'calls': 0, 'allocated_kb': 0.0, 'events': {}})
+    for (hook, event), (seconds, calls, allocated) in event_stats.items():
+        entry = hooks[hook]
+        entry['seconds'] += seconds
+        entry['calls'] += calls
+        entry['allocated_kb'] += allocated / 1024
+        entry['events'][event] = {'seconds': round(seconds, 4), 'calls': calls,
+                                  'allocated_kb': round(allocated / 1024, 1)}
+
+    hook_seconds = sum(entry['seconds'] for entry in hooks.values())
+    hook_report = []
+    for hook, entry in sorted(hooks.items(), key=lambda item: -item[1]['seconds']):
+        hook_report.append({
+            'hook': hook,
+            'seconds': round(entry['seconds'], 4),
+            'share_of_build': round(entry['seconds'] / build_seconds, 4) if build_seconds else 0,
+            'calls': entry['calls'],
+            'allocated_kb': round(entry['allocated_kb'], 1),
+            'events': dict(sorted(entry['events'].items(), key=lambda item: -item[1]['seconds'])),
+        })
+
+    pages = sorted(page_stats.items(), key=lambda item: -sum(stat[0] for stat in item[1].values()))
+    page_report = [{
+        'page': src_path,
+        'seconds': round(sum(stat[0] for stat in stats.values()), 4),
+        'allocated_kb': round(sum(stat[1] for stat in stats.values()) / 1024, 1),
+        'hooks': {hook: round(stat[0], 4) for hook, stat in sorted(stats.items(), key=lambda item: -item[1][0])},
+    } for src_path, stats in pages[:PROFILER_CONFIG['top_pages']]]
+
+    return {
+        'build_seconds': round(build_seconds, 4),
+        'hook_seconds': round(hook_seconds, 4),
+        'share_of_build': round(hook_seconds / build_seconds, 4) if build_seconds else 0,
+        'pages': len(page_stats),
+        'memory': PROFILER_CONFIG['memory'],
+        'hooks': hook_report,
+        'slowest_pages': page_report,
+    }
+
+
+def print_report(report):
+    """控制台汇总表"""
+    print(f"\n⏱️ hooks 共耗时 {report['hook_seconds']:.2f}s，占构建时间 {report['build_seconds']:.2f}s 的 "
+          f"{report['share_of_build']:.1%}（{report['pages']} 个页面）")
+    print(f"{'hook':<20}{'耗时(s)':>10}{'占比':>9}{'调用':>8}{'分配(KB)':>12}  最慢的事件")
+    for entry in report['hooks']:
+        slowest_event = next(iter(entry['events']), '')
+        print(f"{entry['hook']:<20}{entry['seconds']:>10.3f}{entry['share_of_build']:>9.1%}{entry['calls']:>8}"
+              f"{entry['allocated_kb']:>12.0f}  {slowest_event}")
+    if report['slowest_pages']:
+        print(f"\n🐢 最慢的 {len(report['slowest_pages'])} 个页面：")
+        for entry in report['slowest_pages']:
+            hooks = '，'.join(f"{hook} {seconds * 1000:.1f}ms" for hook, seconds in entry['hooks'].items())
+            print(f"  {entry['seconds'] * 1000:8.1f}ms  {entry['page']}（{hooks}）")
+
+
+@event_priority(-100)
+def on_post_build(config):
+    """最后运行（其他 hook 的 on_post_build 已计时）：输出汇总表并写入 JSON 报告"""
+    if build_started is None:
+        return
+    report = build_report()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+    print_report(report)
+    report_file = Path(PROFILER_CONFIG['report_file'])
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    report_file.write_text(json.dumps(report, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    print(f"📝 性能报告已写入 {report_file}")
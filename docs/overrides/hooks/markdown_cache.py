@@ -0,0 +1,211 @@
+"""
+on_page_markdown 结果缓存：内容没有变化的页面跳过整条 hook 处理链
+
+在 mkdocs.yml 的 hooks 中加入本文件即可启用（放在第一位）。
+把可缓存 hook（MARKDOWN_CACHE_CONFIG['hooks']）在 page_markdown 事件中相邻的一段处理函数合并为一个带缓存的函数。
+
+缓存键由以下内容的 MD5 组成：
+- 这一段的输入 Markdown、页面路径、URL、标题、page.meta 和 site_url
+- 每个 hook 源文件的摘要（修改 hook 代码后自动失效）以及共享模块（page_rules.py）的摘要
+- hook 的 markdown_cache_key(page, config) 返回值：代码之外影响输出的输入，
+  例如 related_posts 返回本页推荐列表的摘要（其他文章变化只影响推荐列表变化的页面）
+
+缓存值是处理后的 Markdown 和 hook 对 page.meta 的修改（例如 reading_time 写入的 readtime），
+命中时直接返回 Markdown 并重放 page.meta 的修改，不再运行任何 hook。
+缓存保存在 .markdown_cache/pages.json，CI 中恢复该目录后，内容未变的页面不再花费 hook 时间。
+
+在 page_markdown 中收集全局状态的 hook（categories）和依赖外部服务的 hook（ai_summary，自带摘要缓存）不缓存，
+每次照常运行；它们会把前后的可缓存 hook 分成两段，分别缓存。
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from mkdocs.plugins import event_priority
+
+MARKDOWN_CACHE_CONFIG = {
+    'persist': True,  # 是否把缓存保存到磁盘（False 时只在 mkdocs serve 的多次重建之间复用）
+    'cache_file': Path(".markdown_cache") / "pages.json",  # 与 .ai_cache、.related_cache 一样放在项目根目录
+    # 可以缓存的 hook：page_markdown 的输出只取决于页面内容、page.meta、hook 代码和 markdown_cache_key 的返回值
+    'hooks': ['socialmedia', 'reading_time', 'related_posts', 'comments'],
+    # 可缓存 hook 共同依赖的模块（与 hook 在同一目录），其代码变化时所有缓存失效
+    'shared_modules': ['page_rules.py'],
+}
+# 缓存格式版本，修改缓存键或缓存值的结构后需要增加
+CACHE_VERSION = 1
+
+# {缓存键: {'markdown': 处理后的 Markdown, 'meta': page.meta 中新增或修改的项, 'removed': 删除的键}}，首次使用时从磁盘加载
+page_cache = None
+# 本次构建用到的缓存键（构建结束时只保留这些条目）
+used_keys = set()
+page_cache_dirty = False
+cache_stats = {'hits': 0, 'misses': 0}
+
+
+def file_digest(path):
+    """文件内容的 MD5"""
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def load_page_cache():
+    """读取磁盘上的缓存，版本不一致或读取失败时返回空字典"""
+    if not MARKDOWN_CACHE_CONFIG['persist']:
+        return {}
+    try:
+        with open(MARKDOWN_CACHE_CONFIG['cache_file'], 'r', encoding='utf-8') as f:
+            cache_data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache_data.get('version') != CACHE_VERSION:
+        return {}
+    return cache_data.get('pages', {})
+
+
+def save_page_cache():
+    """把缓存写入磁盘（先写临时文件再替换，避免中断时留下损坏的缓存）"""
+    cache_file = MARKDOWN_CACHE_CONFIG['cache_file']
+    pages = {key: page_cache[key] for key in sorted(page_cache)}
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'pages': pages}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"⚠️ 保存页面 Markdown 缓存失败: {e}")
+
+
+def snapshot_meta(meta):
+    """page.meta 每一项的 JSON 表示（用于比较 hook 前后的修改；日期等值按字符串表示）"""
+    return {key: json.dumps(value, sort_keys=True, ensure_ascii=False, default=str) for key, value in meta.items()}
+
+
+def meta_changes(page, meta_before):
+    """
+    hook 对 page.meta 的修改：(新增或修改的项, 删除的键)；
+    修改的值无法保存为 JSON 时返回 None（这样的页面不缓存）
+    """
+    meta_after = snapshot_meta(page.meta)
+    changed = {key: page.meta[key] for key, value in meta_after.items() if meta_before.get(key) != value}
+    try:
+        json.dumps(changed)
+    except (TypeError, ValueError):
+        return None
+    return changed, [key for key in meta_before if key not in meta_after]
+
+
+def apply_meta(page, meta, removed):
+    """重放 hook 对 page.meta 的修改；博客文章的同名选项同时写入 page.config（博客插件从这里读取，如 readtime）"""
+    page.meta.update(meta)
+    for key in removed:
+        page.meta.pop(key, None)
+    post_config = getattr(page, 'config', None)
+    if post_config is not None:
+        for key, value in meta.items():
+            if hasattr(post_config, key):
+                setattr(post_config, key, value)
+
+
+def cached_segment(segment, shared_digest):
+    """
+    把一段相邻的可缓存 hook 处理函数合并为一个带缓存的 page_markdown 处理函数
+    segment: [(hook 模块, 处理函数, 源文件摘要)]
+    """
+    def on_page_markdown(markdown, *, page, config, files, **kwargs):
+        global page_cache, page_cache_dirty
+        if page_cache is None:
+            page_cache = load_page_cache()
+
+        meta_before = snapshot_meta(page.meta)
+        key_parts = {
+            'version': CACHE_VERSION,
+            'markdown': hashlib.md5(markdown.encode('utf-8')).hexdigest(),
+            'page': [page.file.src_path, page.url, str(page.title)],
+            'meta': meta_before,
+            'site_url': config.get('site_url'),
+            'shared': shared_digest,
+            'hooks': [[module.__name__, digest,
+                       module.markdown_cache_key(page=page, config=config)
+                       if hasattr(module, 'markdown_cache_key') else None]
+                      for module, _, digest in segment],
+        }
+        key = hashlib.md5(json.dumps(key_parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        used_keys.add(key)
+        entry = page_cache.get(key)
+        if entry is not None:
+            cache_stats['hits'] += 1
+            apply_meta(page, entry['meta'], entry['removed'])
+            return entry['markdown']
+
+        cache_stats['misses'] += 1
+        for _, method, _ in segment:
+            result = method(markdown, page=page, config=config, files=files, **kwargs)
+            if result is not None:
+                markdown = result
+
+        changes = meta_changes(page, meta_before)
+        if changes is not None:
+            page_cache[key] = {'markdown': markdown, 'meta': changes[0], 'removed': changes[1]}
+            page_cache_dirty = True
+        return markdown
+
+    return on_page_markdown
+
+
+@event_priority(90)
+def on_config(config):
+    """把可缓存 hook 的 page_markdown 处理函数按相邻的段替换为带缓存的处理函数"""
+    # 依赖 MkDocs 的内部结构（PluginCollection 的 events 和 _event_origins），MkDocs 升级后不存在时停用缓存，不影响构建
+    plugins = config['plugins']
+    origins = getattr(plugins, '_event_origins', None)
+    events = getattr(plugins, 'events', None)
+    if not isinstance(origins, dict) or not isinstance(events, dict) or 'page_markdown' not in events:
+        print("⚠️ 当前 MkDocs 版本不支持替换 hook 的处理函数，页面 Markdown 缓存已停用")
+        return config
+
+    hooks = config['hooks']
+    cacheable = set(MARKDOWN_CACHE_CONFIG['hooks'])
+    hooks_dir = Path(__file__).resolve().parent
+    shared_digest = [file_digest(hooks_dir / name) for name in MARKDOWN_CACHE_CONFIG['shared_modules']]
+
+    methods = events['page_markdown']
+    replaced = []
+    segment = []
+    for method in methods + [None]:
+        plugin_name = origins.get(method)
+        module = hooks.get(plugin_name) if plugin_name else None
+        if module is not None and Path(plugin_name).stem in cacheable:
+            segment.append((module, method, file_digest(module.__file__)))
+            continue
+        if segment:
+            wrapper = cached_segment(segment, shared_digest)
+            origins[wrapper] = __name__
+            replaced.append(wrapper)
+            segment = []
+        if method is not None:
+            replaced.append(method)
+    methods[:] = replaced
+    return config
+
+
+@event_priority(-90)
+def on_post_build(config):
+    """构建结束时只保留本次用到的条目，有变化时保存到磁盘，并输出命中率"""
+    global page_cache, page_cache_dirty
+    total = cache_stats['hits'] + cache_stats['misses']
+    if total:
+        print(f"📦 页面 Markdown 缓存命中 {cache_stats['hits']}/{total}")
+    cache_stats['hits'] = cache_stats['misses'] = 0
+
+    if page_cache is None or not used_keys:
+        return
+    stale = len(used_keys) != len(page_cache)
+    if stale:
+        page_cache = {key: page_cache[key] for key in used_keys if key in page_cache}
+    if MARKDOWN_CACHE_CONFIG['persist'] and (page_cache_dirty or stale):
+        save_page_cache()
+    page_cache_dirty = False
+    used_keys.clear()
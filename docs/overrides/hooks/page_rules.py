@@ -0,0 +1,210 @@
+"""
+hooks 共享的页面包含/排除规则
+
+每个 hook（reading_time、related_posts、comments、categories、ai_summary）用 register() 注册自己的默认规则，
+得到一个 PageRules：包含目录、排除目录、排除文件、通配符、正则、子串等所有规则在创建时编译成同一个正则
+（排除规则放在开头的否定前瞻里，包含规则紧随其后），判断页面时只做一次 match，结果按路径缓存。
+
+规则也可以在 mkdocs.yml 的 extra.page_rules 中按 hook 名称集中覆盖（未写出的键保持 hook 中的默认值），
+各 hook 在 on_config 中调用 configure(config)：
+
+    extra:
+      page_rules:
+        related_posts:
+          include_dirs: [blog/, develop/]
+          exclude_files: [blog/index.md]
+          exclude_regexes: ['.*/index\\.md$']
+        categories:
+          exclude_globs: ['blog/posts/*.md']
+
+include_regexes / exclude_regexes 中的每条正则先单独编译，无效时抛出 ValueError。
+拼进同一个正则后，捕获分组会重新编号（反向引用 \\1、(?P=name) 指向别的分组，同名分组冲突），
+全局内联标志（(?i) 等）也只能出现在整个正则开头，因此含捕获分组或全局内联标志的正则不参与合并，
+而是单独编译、逐条匹配（结果同样按路径缓存）；需要分组时写成 (?:...) 即可留在合并的正则中。
+
+hooks 中直接 `import page_rules`（MkDocs 加载 hook 时会把 hooks 目录加入 sys.path）。
+"""
+
+import fnmatch
+import hashlib
+import json
+import re
+
+# 支持的规则（都是字符串列表）及含义
+RULE_KEYS = (
+    'include_dirs',        # 只处理这些目录下的页面（为空时不限制）
+    'include_regexes',     # 只处理匹配这些正则的页面（与 include_dirs 满足其一即可，re.match 语义）
+    'exclude_dirs',        # 排除这些目录下的页面
+    'exclude_files',       # 排除这些文件（精确路径）
+    'exclude_globs',       # 排除匹配这些通配符的页面（fnmatch 语义）
+    'exclude_regexes',     # 排除匹配这些正则的页面（re.match 语义，从路径开头匹配）
+    'exclude_substrings',  # 排除路径中包含这些子串的页面
+    'suffixes',            # 只处理这些扩展名的文件，例如 ['.md']（为空时不限制）
+)
+
+# {hook 名称: PageRules}
+_registry = {}
+# 不含任何内联标志的正则的 flags（用于判断正则是否带有全局内联标志）
+_DEFAULT_FLAGS = re.compile('').flags
+
+
+def normalize_path(path):
+    """反斜杠转为正斜杠，合并重复的斜杠"""
+    path = path.replace('\\', '/')
+    while '//' in path:
+        path = path.replace('//', '/')
+    return path
+
+
+def dir_prefix(directory):
+    """目录规则统一为以 / 结尾的前缀（空字符串表示所有页面）"""
+    directory = normalize_path(directory).rstrip('/')
+    return directory + '/' if directory else ''
+
+
+def compile_rule(key, value):
+    """单条规则 → 正则片段（从路径开头匹配）"""
+    if key in ('include_dirs', 'exclude_dirs'):
+        return re.escape(dir_prefix(value))
+    if key == 'exclude_files':
+        return re.escape(normalize_path(value)) + r'\Z'
+    if key == 'exclude_globs':
+        return fnmatch.translate(normalize_path(value))
+    if key == 'exclude_substrings':
+        return '.*?' + re.escape(value)
+    return value
+
+
+def compile_user_regex(name, key, value):
+    """
+    单独编译用户的正则（无效时抛出 ValueError），返回 (编译结果, 能否拼进合并的正则)
+
+    含捕获分组（可能被反向引用）或全局内联标志的正则拼接后含义会改变，需要单独匹配
+    """
+    try:
+        pattern = re.compile(value, re.DOTALL)
+    except re.error as e:
+        raise ValueError(f"页面规则 {name} 的 {key} 无效: {value!r}（{e}）") from None
+    mergeable = not pattern.groups and re.compile(value).flags == _DEFAULT_FLAGS
+    return pattern, mergeable
+
+
+class PageRules:
+    """一个 hook 的页面规则，编译为单个正则，判断结果按路径缓存"""
+
+    def __init__(self, name, **rules):
+        self.name = name
+        self.defaults = {key: list(rules.get(key, ())) for key in RULE_KEYS}
+        self.update(**self.defaults)
+
+    def update(self, **rules):
+        """修改规则（未给出的键保持不变）并重新编译"""
+        unknown = set(rules) - set(RULE_KEYS)
+        if unknown:
+            raise ValueError(f"页面规则 {self.name} 不支持: {', '.join(sorted(unknown))}")
+
+        current = getattr(self, 'rules', self.defaults)
+        self.rules = {key: list(rules[key]) if key in rules else current[key] for key in RULE_KEYS}
+
+        # 每条排除规则放在单独的分组中，匹配后由 lastindex 找到是哪一条（用于调试输出）
+        exclude_parts = []
+        self.exclude_reasons = {}
+        # 不能合并的用户正则：[(规则名, 原始正则, 编译结果)]
+        self.exclude_fallbacks = []
+        group = 1
+        for key in RULE_KEYS:
+            if not key.startswith('exclude_'):
+                continue
+            for value in self.rules[key]:
+                if key == 'exclude_regexes':
+                    pattern, mergeable = compile_user_regex(self.name, key, value)
+                    if not mergeable:
+                        self.exclude_fallbacks.append((key, value, pattern))
+                        continue
+                part = compile_rule(key, value)
+                self.exclude_reasons[group] = (key, value)
+                exclude_parts.append(f'({part})')
+                group += 1 + re.compile(part).groups
+        include_parts = [re.escape(dir_prefix(value)) for value in self.rules['include_dirs']]
+        self.include_fallbacks = []
+        for value in self.rules['include_regexes']:
+            pattern, mergeable = compile_user_regex(self.name, 'include_regexes', value)
+            if mergeable:
+                include_parts.append(value)
+            else:
+                self.include_fallbacks.append(pattern)
+        suffixes = [re.escape(suffix) for suffix in self.rules['suffixes']]
+
+        self.exclude_pattern = re.compile('|'.join(exclude_parts)) if exclude_parts else None
+        verdict = ''
+        if suffixes:
+            verdict += rf'(?=.*(?:{"|".join(suffixes)})\Z)'
+        if exclude_parts:
+            verdict += f'(?!{"|".join(exclude_parts)})'
+        # 有单独匹配的包含正则时，包含规则改在 is_included 中判断（满足其一即可）
+        self.include_pattern = re.compile('|'.join(include_parts), re.DOTALL) if include_parts else None
+        if include_parts and not self.include_fallbacks:
+            verdict += f'(?:{"|".join(include_parts)})'
+        self.pattern = re.compile(verdict, re.DOTALL)
+        self.verdicts = {}
+
+    def is_included(self, path):
+        """合并的正则之外的判断：单独匹配的排除正则和包含正则"""
+        if any(pattern.match(path) for _, _, pattern in self.exclude_fallbacks):
+            return False
+        if not self.include_fallbacks:
+            return True
+        if self.include_pattern is not None and self.include_pattern.match(path):
+            return True
+        return any(pattern.match(path) for pattern in self.include_fallbacks)
+
+    def allows(self, src_path):
+        """页面是否需要处理（未被排除，且满足包含规则和扩展名）"""
+        verdict = self.verdicts.get(src_path)
+        if verdict is None:
+            path = normalize_path(src_path) if '\\' in src_path or '//' in src_path else src_path
+            verdict = self.pattern.match(path) is not None
+            if verdict and (self.exclude_fallbacks or self.include_fallbacks):
+                verdict = self.is_included(path)
+            self.verdicts[src_path] = verdict
+        return verdict
+
+    def explain(self, src_path):
+        """页面不需要处理的原因（调试输出用），需要处理时返回 None"""
+        if self.allows(src_path):
+            return None
+        path = normalize_path(src_path)
+        if self.exclude_pattern is not None:
+            match = self.exclude_pattern.match(path)
+            if match is not None:
+                key, value = self.exclude_reasons[match.lastindex]
+                return f"{key} '{value}'"
+        for key, value, pattern in self.exclude_fallbacks:
+            if pattern.match(path):
+                return f"{key} '{value}'"
+        if self.rules['suffixes'] and not path.endswith(tuple(self.rules['suffixes'])):
+            return f"suffixes {self.rules['suffixes']}"
+        return f"include {self.rules['include_dirs'] + self.rules['include_regexes']}"
+
+    def configure(self, config):
+        """用 mkdocs.yml 中 extra.page_rules.<hook 名称> 覆盖默认规则"""
+        extra = config.get('extra') or {}
+        overrides = (extra.get('page_rules') or {}).get(self.name) or {}
+        self.rules = self.defaults
+        self.update(**overrides)
+        return self
+
+    def fingerprint(self):
+        """规则的指纹（规则变化时依赖它的缓存失效）"""
+        return hashlib.md5(json.dumps(self.rules, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def register(name, **rules):
+    """注册 hook 的默认规则（同名重复注册时覆盖），返回 PageRules"""
+    _registry[name] = PageRules(name, **rules)
+    return _registry[name]
+
+
+def get_rules(name):
+    """已注册的规则，不存在时返回 None"""
+    return _registry.get(name)
@@ -0,0 +1,258 @@
+"""
+多进程预渲染：页面较多时在进程池中并行把 Markdown 转换为 HTML
+
+在 mkdocs.yml 的 hooks 中加入本文件即可启用。MkDocs 逐页串行渲染，页面很多时 pymdownx 扩展、代码高亮和
+hook 处理链的 CPU 时间占构建的大部分。本 hook 在 on_nav（导航已经生成、开始逐页处理之前）中：
+
+1. 用 fork 创建进程池（子进程继承已加载的配置、文件列表、导航和所有插件/hook 的状态），
+   每个子进程对一组页面执行与 MkDocs 相同的步骤：on_pre_page → read_source（on_page_read_source）→ on_page_markdown → render
+2. 子进程返回处理后 Markdown 的摘要、HTML、目录、标题和渲染时的日志
+
+之后 MkDocs 照常逐页串行处理：on_pre_page、read_source 和 on_page_markdown 仍在主进程中按页面顺序运行
+（categories 收集分类、博客插件添加作者、reading_time 写入 readtime 等全局状态保持原有顺序），
+只有 page.render 被替换为取出预渲染结果。主进程处理后的 Markdown 与子进程的摘要不一致时
+（例如博客分页视图依赖其他页面的渲染结果）改为照常渲染，因此输出与串行构建完全相同。
+子进程中的日志（如链接检查的警告）在主进程使用预渲染结果时重新输出，--strict 照常生效。
+
+子进程会运行页面处理事件（pre_page、page_read_source、page_markdown）的全部处理函数，因此只有这些处理函数
+都来自 PRERENDER_CONFIG['worker_handlers'] 中列出的 hook/插件（没有进程外副作用）时才预渲染；
+只要有一个处理函数来自未列出的 hook 或插件（如 ai_summary / ai-summary 会请求 API、写入缓存文件），
+就不预渲染任何页面（处理函数对所有页面生效，无法只排除其中一部分页面），并输出是哪些 hook/插件。
+页面改为照常渲染的原因以 debug 级别输出（mkdocs build -v）。
+
+只在渲染时运行的 hook（如 highlight_cache 的代码高亮缓存）在子进程中积累的状态，可以定义以下函数传回主进程：
+- prerender_collect()：在子进程中取出本进程积累的状态（可序列化）并清空
+- prerender_merge(data)：在主进程中合并子进程传回的状态
+
+依赖 fork，只在 mkdocs build / gh-deploy 中使用进程池（见 fork_pool.py），mkdocs serve 和不支持 fork 的平台（Windows）保持串行。
+"""
+
+import contextlib
+import functools
+import hashlib
+import io
+import logging
+from pathlib import Path
+
+from mkdocs.plugins import event_priority
+from mkdocs.structure.files import InclusionLevel
+from mkdocs.structure.pages import Page
+
+import fork_pool
+
+PRERENDER_CONFIG = {
+    # 页面达到该数量时才使用进程池；页面较少时进程启动开销大于收益，保持串行
+    'min_pages': 200,
+    'workers': None,   # 进程数，None 表示 CPU 核数
+    'chunk_size': 8,   # 每个任务包含的页面数（分块分发，减少进程间通信次数）
+    # 可以在子进程中运行的 hook（文件名，不含 .py）和插件（mkdocs.yml 中 plugins 的名称）：
+    # 页面处理事件中没有进程外副作用（请求网络、写文件），只修改页面和本进程内存中的状态。
+    # 页面处理事件中有未列出的处理函数时不预渲染（git-revision-date-localized 每个页面都运行 git，未默认列出）
+    'worker_handlers': ['hook_profiler', 'markdown_cache', 'highlight_cache', 'socialmedia',
+                        'reading_time', 'related_posts', 'comments', 'categories', 'prerender',
+                        'material/blog', 'material/tags', 'authors'],
+}
+# 子进程中运行的页面处理事件
+WORKER_EVENTS = ('pre_page', 'page_read_source', 'page_markdown')
+
+log = logging.getLogger('mkdocs.hooks.prerender')
+
+# 交给子进程的页面和构建上下文（fork 时继承，不需要序列化）
+pending_pages = []
+build_context = None
+# {页面 src_uri: 预渲染结果}
+prerendered = {}
+# {页面 src_uri: 子进程中出错的原因}
+prerender_errors = {}
+# 本次构建使用预渲染结果 / 改为照常渲染的页面数
+prerender_stats = {'used': 0, 'rendered': 0}
+# --dirty 构建只重新生成修改过的页面
+build_dirty = False
+
+
+class LogCapture(logging.Handler):
+    """收集子进程中 MkDocs 的日志 (logger 名称, 级别, 消息)，由主进程重新输出"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.name, record.levelno, record.getMessage()))
+
+
+def markdown_digest(markdown):
+    return hashlib.md5(markdown.encode('utf-8')).hexdigest()
+
+
+def render_page(page, config, files, logger):
+    """
+    在子进程中按 MkDocs 的步骤处理一个页面，返回预渲染结果。
+    只收集 render 中的日志（on_page_markdown 等事件的日志在主进程再次运行时照常输出）
+    """
+    config._current_page = page
+    capture = LogCapture()
+    try:
+        page = config.plugins.on_pre_page(page, config=config, files=files)
+        page.read_source(config)
+        page.markdown = config.plugins.on_page_markdown(page.markdown, page=page, config=config, files=files)
+        logger.addHandler(capture)
+        Page.render(page, config, files)
+    finally:
+        logger.removeHandler(capture)
+        config._current_page = None
+    links_to_anchors = page.links_to_anchors
+    return {
+        'digest': markdown_digest(page.markdown),
+        'content': page.content,
+        'toc': page.toc,
+        'title_from_render': page._title_from_render,
+        'present_anchor_ids': page.present_anchor_ids,
+        # File 对象不传回主进程，按路径传回后在主进程中换回同一个 File
+        'links_to_anchors': None if links_to_anchors is None else
+            {file.src_uri: links for file, links in links_to_anchors.items()},
+        'logs': capture.records,
+    }
+
+
+def impure_handlers(config):
+    """页面处理事件中不在 worker_handlers 里的 hook/插件名称（hook 按文件名，来源未知的处理函数记为 None）"""
+    plugins = config.plugins
+    allowed = set(PRERENDER_CONFIG['worker_handlers'])
+    impure = set()
+    for event in WORKER_EVENTS:
+        for method in plugins.events.get(event, ()):
+            origin = plugins._event_origins.get(method)
+            name = Path(origin).stem if origin in config['hooks'] else origin
+            if name not in allowed:
+                impure.add(name)
+    return impure
+
+
+def render_chunk(indices):
+    """
+    进程池任务：预渲染一组页面，返回 ([(src_uri, 结果, 出错原因), ...], {hook 名称: prerender_collect() 的返回值})，
+    出错的页面由主进程照常渲染
+    """
+    config, files = build_context
+    collecting = [(name, module) for name, module in config['hooks'].items() if hasattr(module, 'prerender_collect')]
+    # 先清空从主进程继承（或本进程上一个任务留下）的状态，之后只收集本任务中的变化
+    for _, module in collecting:
+        module.prerender_collect()
+    # 子进程中 on_pre_page 不应替换 render（fork 时主进程还没有预渲染结果，这里再确认一次）
+    prerendered.clear()
+    # 子进程的日志和输出不直接显示：render 的日志随结果传回主进程，hook 的提示信息由主进程再次处理页面时输出
+    mkdocs_logger = logging.getLogger('mkdocs')
+    for handler in list(mkdocs_logger.handlers):
+        mkdocs_logger.removeHandler(handler)
+    mkdocs_logger.propagate = False
+
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index in indices:
+            page = pending_pages[index]
+            try:
+                results.append((page.file.src_uri, render_page(page, config, files, mkdocs_logger), None))
+            except Exception as e:
+                results.append((page.file.src_uri, None, f"{type(e).__name__}: {e}"))
+    return results, {name: module.prerender_collect() for name, module in collecting}
+
+
+def use_prerendered(page, config, files):
+    """替换 page.render：主进程处理后的 Markdown 与子进程一致时直接使用预渲染结果"""
+    del page.render  # 恢复为 Page.render（mkdocs serve 重建或其他插件再次渲染时照常渲染）
+    result = prerendered.pop(page.file.src_uri)
+    if result is None or markdown_digest(page.markdown) != result['digest']:
+        if result is None:
+            log.debug(f"{page.file.src_uri} 预渲染出错（{prerender_errors.get(page.file.src_uri)}），照常渲染")
+        else:
+            log.debug(f"{page.file.src_uri} 处理后的 Markdown 与预渲染时不同，照常渲染")
+        prerender_stats['rendered'] += 1
+        page.render(config, files)
+        return
+
+    prerender_stats['used'] += 1
+    page.content = result['content']
+    page.toc = result['toc']
+    page._title_from_render = result['title_from_render']
+    page.present_anchor_ids = result['present_anchor_ids']
+    if result['links_to_anchors'] is not None:
+        page.links_to_anchors = {files.get_file_from_path(src_uri): links
+                                 for src_uri, links in result['links_to_anchors'].items()}
+    for name, level, message in result['logs']:
+        logging.getLogger(name).log(level, message)
+
+
+def on_startup(command, dirty):
+    """记录 --dirty 和 MkDocs 命令（只在 build / gh-deploy 中使用进程池）"""
+    global build_dirty
+    build_dirty = dirty
+    fork_pool.set_command(command)
+
+
+@event_priority(-100)
+def on_nav(nav, config, files):
+    """
+    最后运行（博客插件等已在 on_nav 中完成导航和文章页面）：开始逐页处理之前，在进程池中预渲染需要生成的页面。
+    页面范围与 MkDocs 构建时相同（exclude_docs / draft_docs 排除的页面不预渲染）；
+    不在导航中的页面此时还没有 Page 对象（MkDocs 逐页处理时才创建），照常串行渲染
+    """
+    global pending_pages, build_context
+    prerendered.clear()
+    prerender_errors.clear()
+    pages = [file.page for file in files.documentation_pages(inclusion=InclusionLevel.is_included)
+             if file.page is not None and not (build_dirty and not file.is_modified())]
+    workers = fork_pool.worker_count(PRERENDER_CONFIG['workers'])
+    if len(pages) < PRERENDER_CONFIG['min_pages'] or workers < 2:
+        return nav
+    # 按来源检查处理函数依赖 MkDocs 的内部结构（PluginCollection 的 _event_origins），不存在时保持串行
+    if not isinstance(getattr(config.plugins, '_event_origins', None), dict):
+        print("⚠️ 当前 MkDocs 版本无法区分 hook 的处理函数，不使用并行预渲染")
+        return nav
+    impure = impure_handlers(config)
+    if impure:
+        print(f"⚠️ 页面处理事件中有未列入 PRERENDER_CONFIG['worker_handlers'] 的 hook/插件 "
+              f"({', '.join(sorted(map(str, impure)))})，不使用并行预渲染")
+        return nav
+
+    pending_pages = pages
+    build_context = (config, files)
+    chunk_size = PRERENDER_CONFIG['chunk_size']
+    chunks = [range(i, min(i + chunk_size, len(pages))) for i in range(0, len(pages), chunk_size)]
+    try:
+        for chunk_results, collected in fork_pool.map_chunks('prerender', render_chunk, chunks, workers):
+            for src_uri, result, error in chunk_results:
+                prerendered[src_uri] = result
+                if error is not None:
+                    prerender_errors[src_uri] = error
+            for name, data in collected.items():
+                config['hooks'][name].prerender_merge(data)
+    except Exception as e:
+        print(f"⚠️ 并行预渲染失败，改为串行渲染: {e}")
+        prerendered.clear()
+        prerender_errors.clear()
+    else:
+        print(f"⚡ 使用 {min(workers, len(chunks))} 个进程预渲染 "
+              f"{len(prerendered) - len(prerender_errors)}/{len(pages)} 个页面")
+    finally:
+        pending_pages = []
+        build_context = None
+    return nav
+
+
+@event_priority(-100)
+def on_pre_page(page, config, files):
+    """最后运行（其他插件可能替换页面对象）：有预渲染结果的页面改用 use_prerendered 渲染"""
+    if page.file.src_uri in prerendered:
+        page.render = functools.partial(use_prerendered, page)
+    return page
+
+
+def on_post_build(config):
+    """输出预渲染结果的使用情况；未使用的结果（草稿、未构建的页面）不保留到下一次构建"""
+    if prerender_stats['used'] or prerender_stats['rendered']:
+        print(f"⚡ 使用预渲染结果 {prerender_stats['used']} 个页面，"
+              f"{prerender_stats['rendered']} 个页面处理后的 Markdown 与预渲染时不同，已重新渲染")
+    prerender_stats['used'] = prerender_stats['rendered'] = 0
+    prerendered.clear()
+    prerender_errors.clear()
@@ -1,33 +1,65 @@
 import re
-import threading
-import time
-from functools import lru_cache
-from collections import OrderedDict
+import os
 import hashlib
+import json
+from pathlib import Path
 
-# 预编译正则表达式（性能优化版本）
-EXCLUDE_PATTERNS = [
-    re.compile(r'^index\.md$'),
-    re.compile(r'^trip/index\.md$'),
-    re.compile(r'^relax/index\.md$'),
-    re.compile(r'^blog/indexblog\.md$'),
-    re.compile(r'^blog/posts\.md$'),
-    re.compile(r'^develop/index\.md$'),
-    re.compile(r'^relax/.*\.md$'),
-    re.compile(r'^about/.*\.md$'),
-    re.compile(r'waline\.md$'),
-    re.compile(r'link\.md$'),
-    re.compile(r'404\.md$'),
-]
+import page_rules
+
+# 不显示阅读信息的页面（规则由 page_rules 编译为单个正则，可在 mkdocs.yml 的 extra.page_rules.reading_time 中覆盖）
+PAGE_RULES = page_rules.register(
+    'reading_time',
+    exclude_files=[
+        'index.md',
+        'trip/index.md',
+        'relax/index.md',
+        'blog/indexblog.md',
+        'blog/posts.md',
+        'develop/index.md',
+        'waline.md',
+        'link.md',
+        '404.md',
+    ],
+    exclude_dirs=['relax/', 'about/'],
+)
 
 # 高度优化的正则表达式（一次性编译）
-CHINESE_CHARS_PATTERN = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf]')
 CODE_BLOCK_PATTERN = re.compile(r'```.*?```', re.DOTALL)
-INLINE_CODE_PATTERN = re.compile(r'`[^`]+`')
-YAML_FRONT_PATTERN = re.compile(r'^---.*?---\s*', re.DOTALL)
-HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
-IMAGE_PATTERN = re.compile(r'!\[.*?\]\([^)]+\)')
-LINK_PATTERN = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+FENCE_LANGUAGE_PATTERN = re.compile(r'^```(\w*)')
+FENCE_OPEN_PATTERN = re.compile(r'^```\w*\n?')
+FENCE_CLOSE_PATTERN = re.compile(r'\n?```$')
+
+# 单遍扫描阅读统计的词法规则：同一位置按顺序尝试，扫描过的内容不再回头。
+# 代码块围栏优先（行内代码、HTML 标签、图片、链接都不会跨越 ```），标签、图片、代码中的中文不计数，
+# 链接只计算链接文字；标题只记录位置（标题文字照常计数）。
+# 开头的前瞻列出了所有规则可能的首字符（标题是否位于行首在扫描时判断），正则引擎可以快速跳过普通文字
+NOT_FENCE = r'`(?!``)'
+READING_SCAN_PATTERN = re.compile(
+    r'(?=[`<!\[#\u4e00-\u9fff\u3400-\u4dbf])'
+    r'(?:(?P<fence>```)'
+    r'|(?P<code>`[^`]+`(?!``))'
+    rf'|(?P<tag><(?:[^>`]|{NOT_FENCE})+>)'
+    rf'|(?P<image>!\[(?:[^`\n]|{NOT_FENCE})*?\]\((?:[^)`]|{NOT_FENCE})+\))'
+    rf'|(?P<link>\[(?!!\[)(?P<text>(?:[^\]`]|{NOT_FENCE})+)\]\((?:[^)`]|{NOT_FENCE})+\))'
+    r'|(?P<heading>#+)(?= .)'
+    r'|(?P<cjk>[\u4e00-\u9fff\u3400-\u4dbf]+))'
+)
+# 链接文字中的行内代码和 HTML 标签不计数
+LINK_TEXT_PATTERN = re.compile(r'`[^`]+`|<[^>]+>|(?P<cjk>[\u4e00-\u9fff\u3400-\u4dbf]+)')
+
+# 阅读统计缓存：只保存结果 (阅读时间, 中文字符数, 代码行数, 阅读信息插入位置)，以内容的 MD5 摘要为键（跨进程、跨构建稳定）
+READING_CACHE_CONFIG = {
+    'persist': True,  # 是否把缓存保存到磁盘，之后的构建中内容未变化的页面不再做任何正则匹配
+    'cache_file': Path(".reading_cache") / "stats.json",  # 与 .ai_cache、.related_cache 一样放在项目根目录
+}
+# 统计规则的版本，修改统计逻辑后需要增加（旧版本的磁盘缓存自动失效）
+STATS_VERSION = 2
+
+# {内容摘要: (阅读时间, 中文字符数, 代码行数, 阅读信息插入位置)}，首次使用时从磁盘加载
+reading_stats_cache = None
+# 本次构建用到的摘要（构建结束时只保留这些条目，删除或修改过的页面的旧条目不会一直累积）
+used_digests = set()
+reading_stats_dirty = False
 
 # 预定义排除类型
 EXCLUDE_TYPES = frozenset({'landing', 'special', 'widget'})
@@ -61,160 +93,326 @@ PROGRAMMING_LANGUAGES = frozenset({
     ''
 })
 
-@lru_cache(maxsize=256)
-def clean_markdown_content_for_chinese(content_hash, markdown):
-    """清理Markdown内容，只保留中文文本用于统计（添加缓存）"""
-    content = markdown
-    
-    # 使用预编译的正则表达式
-    content = YAML_FRONT_PATTERN.sub('', content)
-    content = HTML_TAG_PATTERN.sub('', content)
-    content = IMAGE_PATTERN.sub('', content)
-    content = LINK_PATTERN.sub(r'\1', content)
-    content = CODE_BLOCK_PATTERN.sub('', content)
-    content = INLINE_CODE_PATTERN.sub('', content)
-    
-    return content
+# 无语言标识（或语言不在列表中）的代码块的判断规则
+
+# 1. 命令行特征
+COMMAND_INDICATORS = (
+    'sudo ', 'npm ', 'pip ', 'git ', 'cd ', 'ls ', 'mkdir ', 'rm ', 'cp ', 'mv ',
+    'chmod ', 'chown ', 'grep ', 'find ', 'ps ', 'kill ', 'top ', 'cat ', 'echo ',
+    'wget ', 'curl ', 'tar ', 'zip ', 'unzip ', 'ssh ', 'scp ', 'rsync ',
+    'xattr ', 'codesign ', 'xcode-select ', 'spctl ', 'launchctl ',
+    'brew ', 'defaults ', 'ditto ', 'hdiutil ', 'diskutil ',
+    'dir ', 'copy ', 'xcopy ', 'del ', 'rd ', 'md ', 'type ', 'attrib ',
+    '$ ', '# ', '% ', '> ', 'C:\\>', 'PS>',
+    '--', '-r', '-d', '-f', '-v', '-h', '--help', '--version',
+    '--force', '--deep', '--sign', '--master-disable',
+    '/Applications/', '/usr/', '/etc/', '/var/', '/home/', '~/',
+    'C:\\', 'D:\\', '.app', '.exe', '.pkg', '.dmg', '.zip', '.tar',
+    '#!/',
+)
+
+# 2. 编程语法特征
+PROGRAMMING_INDICATORS = (
+    # Python语法特征
+    'def ', 'class ', 'import ', 'from ', 'return ', 'yield ', 'lambda ',
+    'with ', 'as ', 'try:', 'except:', 'finally:', 'elif ', 'if __name__',
+    'print(', '.append(', '.extend(', '.remove(', '.sort(', '.reverse(',
+    'range(', 'len(', 'str(', 'int(', 'float(', 'list(', 'dict(',
+    # JavaScript/TypeScript语法
+    'function', 'var ', 'let ', 'const ', 'async ', 'await ', '=>',
+    'console.log', 'document.', 'window.', 'require(',
+    # 通用编程语法
+    'public ', 'private ', 'protected ', 'static ', 'void ', 'int ',
+    'string ', 'boolean ', 'float ', 'double ', 'char ',
+    # 操作符和结构
+    '==', '!=', '<=', '>=', '&&', '||', '++', '--', '+=', '-=', '**',
+    # 特殊结构
+    'while ', 'for ', 'if ', 'else:', 'switch ', 'case ',
+    # HTML/XML语法
+    '<!DOCTYPE', '<html', '<head', '<body', '<div', '<span', '<p>',
+    '<style', '<script', '<link', '<meta', '<title', '<img',
+    # CSS语法
+    'display:', 'color:', 'background:', 'margin:', 'padding:',
+    'font-size:', 'width:', 'height:', 'position:', 'border:',
+    # YAML语法
+    'name:', 'version:', 'theme:', 'title:', 'description:',
+    # JSON语法
+    '{"', '"}', '":', '",', '[{', '}]', 'null', 'true', 'false',
+    # 配置文件语法
+    '[', ']', '//', '/*', '*/', '<!--', '-->',
+    # SQL语法
+    'SELECT ', 'FROM ', 'WHERE ', 'INSERT ', 'UPDATE ', 'DELETE ',
+    'CREATE ', 'ALTER ', 'DROP ', 'INDEX ', 'TABLE ',
+    # 数学公式和LaTeX
+    '\\', '$', '$$', '\\begin', '\\end', '\\frac', '\\sum',
+)
+
+# 4. 模式匹配（宽松策略）
+SPECIAL_PATTERNS = (
+    r'\w+\(\)', r'\w+\[\]', r'\w+\{\}', r'\w+=\w+', r'\w+:\w+',
+    r'<\w+>', r'\$\w+', r'#\w+', r'@\w+', r'\w+\.\w+\(\)',
+    r'\d+\.\d+\.\d+', r'http[s]?://', r'ftp://', r'localhost',
+    r'def\s+\w+', r'class\s+\w+', r'import\s+\w+', r'from\s+\w+',
+    r'if\s+\w+', r'while\s+\w+', r'for\s+\w+', r'return\s+\w*',
+    r'\w+\s*=\s*\w+', r'\w+\.\w+', r'#.*输出', r'#.*结果'
+)
+
+def build_literal_pattern(words):
+    """
+    把一组子串编译为按前缀树展开的正则：search 找到匹配 ⇔ 至少包含其中一个子串。
+    同一位置只需沿前缀树走一条分支（效果类似 Aho-Corasick），比逐个 `in` 检查快得多；
+    某个子串是另一个子串的前缀时，较长的子串不影响结果，直接省略
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def to_regex(node):
+        if '' in node:
+            return ''
+        branches = [re.escape(char) + to_regex(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return to_regex(trie)
+
+def minimal_search_pattern(pattern):
+    """
+    只判断"是否存在匹配"时与原模式等价的更短模式：开头的 \\w+ 与结尾的 \\w+ 只需匹配一个字符，
+    结尾的 \\w* 可以省略（避免在长单词的每个位置上回溯）
+    """
+    pattern = re.sub(r'^\\w\+', r'\\w', pattern)
+    pattern = re.sub(r'\\w\+$', r'\\w', pattern)
+    return re.sub(r'\\w\*$', '', pattern)
+
+# 以上规则在导入时编译为两个组合正则，一次 search 完成所有子串/模式的判断（结果与逐个检查相同）
+INDICATOR_PATTERN = re.compile(build_literal_pattern(COMMAND_INDICATORS + PROGRAMMING_INDICATORS))
+SPECIAL_PATTERN = re.compile('|'.join(f'(?:{minimal_search_pattern(pattern)})' for pattern in SPECIAL_PATTERNS))
+
+# 代码块行数缓存：{代码块的 MD5 摘要: 有效代码行数}（同一段代码常出现在多篇教程中）
+block_lines_cache = {}
+BLOCK_LINES_CACHE_SIZE = 4096
 
 def count_code_lines(markdown):
     """统计代码行数（修复版本 - 正确处理所有代码行）"""
-    code_blocks = CODE_BLOCK_PATTERN.findall(markdown)
-    total_code_lines = 0
+    return sum(count_block_lines(block) for block in CODE_BLOCK_PATTERN.findall(markdown))
+
+def count_block_lines(block):
+    """统计一个代码块（含 ``` 围栏）的有效代码行数（按代码块内容摘要缓存）"""
+    digest = hashlib.md5(block.encode('utf-8')).digest()
+    line_count = block_lines_cache.get(digest)
+    if line_count is None:
+        if len(block_lines_cache) >= BLOCK_LINES_CACHE_SIZE:
+            block_lines_cache.clear()
+        line_count = block_lines_cache[digest] = classify_block_lines(block)
+    return line_count
+
+def classify_block_lines(block):
+    """判断代码块是否为代码，返回有效代码行数（不是代码时为0）"""
+    # 提取语言标识
+    lang_match = FENCE_LANGUAGE_PATTERN.match(block)
+    language = lang_match.group(1).lower() if lang_match else ''
     
-    for i, block in enumerate(code_blocks):
-        # 提取语言标识
-        lang_match = re.match(r'^```(\w*)', block)
-        language = lang_match.group(1).lower() if lang_match else ''
-        
-        # 移除开头的语言标识和结尾的```
-        code_content = re.sub(r'^```\w*\n?', '', block)
-        code_content = re.sub(r'\n?```$', '', code_content)
-        
-        # 过滤空代码块
-        if not code_content.strip():
-            continue
-        
-        # 计算有效行数（包含所有非空行，包括注释行）
-        lines = [line for line in code_content.split('\n') if line.strip()]
-        line_count = len(lines)
-        
-        # 如果有明确的编程语言标识，直接统计
-        if language and language in PROGRAMMING_LANGUAGES:
-            total_code_lines += line_count
-            continue
-        
-        # 增强的检测策略 - 更宽松的判断
-        is_code = False
-        
-        # 1. 命令行检测
-        command_indicators = [
-            'sudo ', 'npm ', 'pip ', 'git ', 'cd ', 'ls ', 'mkdir ', 'rm ', 'cp ', 'mv ',
-            'chmod ', 'chown ', 'grep ', 'find ', 'ps ', 'kill ', 'top ', 'cat ', 'echo ',
-            'wget ', 'curl ', 'tar ', 'zip ', 'unzip ', 'ssh ', 'scp ', 'rsync ',
-            'xattr ', 'codesign ', 'xcode-select ', 'spctl ', 'launchctl ',
-            'brew ', 'defaults ', 'ditto ', 'hdiutil ', 'diskutil ',
-            'dir ', 'copy ', 'xcopy ', 'del ', 'rd ', 'md ', 'type ', 'attrib ',
-            '$ ', '# ', '% ', '> ', 'C:\\>', 'PS>',
-            '--', '-r', '-d', '-f', '-v', '-h', '--help', '--version',
-            '--force', '--deep', '--sign', '--master-disable',
-            '/Applications/', '/usr/', '/etc/', '/var/', '/home/', '~/',
-            'C:\\', 'D:\\', '.app', '.exe', '.pkg', '.dmg', '.zip', '.tar',
-            '#!/',
-        ]
-        
-        if any(indicator in code_content for indicator in command_indicators):
+    # 移除开头的语言标识和结尾的```
+    code_content = FENCE_OPEN_PATTERN.sub('', block)
+    code_content = FENCE_CLOSE_PATTERN.sub('', code_content)
+    
+    # 过滤空代码块
+    if not code_content.strip():
+        return 0
+    
+    # 计算有效行数（包含所有非空行，包括注释行）
+    lines = [line for line in code_content.split('\n') if line.strip()]
+    line_count = len(lines)
+    
+    # 如果有明确的编程语言标识，直接统计
+    if language and language in PROGRAMMING_LANGUAGES:
+        return line_count
+    
+    # 增强的检测策略 - 更宽松的判断
+    # 1. 命令行检测 / 2. 编程语法检测（增强版）
+    is_code = INDICATOR_PATTERN.search(code_content) is not None
+    
+    # 3. 结构化检测
+    if not is_code:
+        # 缩进结构检测
+        if len(lines) > 1 and any(line.startswith('  ') or line.startswith('\t') for line in lines):
             is_code = True
         
-        # 2. 编程语法检测（增强版）
-        if not is_code:
-            programming_indicators = [
-                # Python语法特征
-                'def ', 'class ', 'import ', 'from ', 'return ', 'yield ', 'lambda ',
-                'with ', 'as ', 'try:', 'except:', 'finally:', 'elif ', 'if __name__',
-                'print(', '.append(', '.extend(', '.remove(', '.sort(', '.reverse(',
-                'range(', 'len(', 'str(', 'int(', 'float(', 'list(', 'dict(',
-                # JavaScript/TypeScript语法
-                'function', 'var ', 'let ', 'const ', 'async ', 'await ', '=>',
-                'console.log', 'document.', 'window.', 'require(',
-                # 通用编程语法
-                'public ', 'private ', 'protected ', 'static ', 'void ', 'int ',
-                'string ', 'boolean ', 'float ', 'double ', 'char ',
-                # 操作符和结构
-                '==', '!=', '<=', '>=', '&&', '||', '++', '--', '+=', '-=', '**',
-                # 特殊结构
-                'while ', 'for ', 'if ', 'else:', 'switch ', 'case ',
-                # HTML/XML语法
-                '<!DOCTYPE', '<html', '<head', '<body', '<div', '<span', '<p>',
-                '<style', '<script', '<link', '<meta', '<title', '<img',
-                # CSS语法
-                'display:', 'color:', 'background:', 'margin:', 'padding:',
-                'font-size:', 'width:', 'height:', 'position:', 'border:',
-                # YAML语法
-                'name:', 'version:', 'theme:', 'title:', 'description:',
-                # JSON语法
-                '{"', '"}', '":', '",', '[{', '}]', 'null', 'true', 'false',
-                # 配置文件语法
-                '[', ']', '//', '/*', '*/', '<!--', '-->',
-                # SQL语法
-                'SELECT ', 'FROM ', 'WHERE ', 'INSERT ', 'UPDATE ', 'DELETE ',
-                'CREATE ', 'ALTER ', 'DROP ', 'INDEX ', 'TABLE ',
-                # 数学公式和LaTeX
-                '\\', '$', '$$', '\\begin', '\\end', '\\frac', '\\sum',
-            ]
-            
-            if any(indicator in code_content for indicator in programming_indicators):
-                is_code = True
-        
-        # 3. 结构化检测
-        if not is_code:
-            # 缩进结构检测
-            if len(lines) > 1 and any(line.startswith('  ') or line.startswith('\t') for line in lines):
-                is_code = True
-            
-            # HTML标签结构
-            elif '<' in code_content and '>' in code_content:
-                is_code = True
-            
-            # 包含特殊字符组合
-            elif any(char in code_content for char in ['{', '}', '(', ')', '[', ']']) and ('=' in code_content or ':' in code_content):
-                is_code = True
-        
-        # 4. 模式匹配检测（宽松策略）
-        if not is_code and len(lines) >= 1:
-            special_patterns = [
-                r'\w+\(\)', r'\w+\[\]', r'\w+\{\}', r'\w+=\w+', r'\w+:\w+',
-                r'<\w+>', r'\$\w+', r'#\w+', r'@\w+', r'\w+\.\w+\(\)',
-                r'\d+\.\d+\.\d+', r'http[s]?://', r'ftp://', r'localhost',
-                r'def\s+\w+', r'class\s+\w+', r'import\s+\w+', r'from\s+\w+',
-                r'if\s+\w+', r'while\s+\w+', r'for\s+\w+', r'return\s+\w*',
-                r'\w+\s*=\s*\w+', r'\w+\.\w+', r'#.*输出', r'#.*结果'
-            ]
-            
-            if any(re.search(pattern, code_content) for pattern in special_patterns):
-                is_code = True
+        # HTML标签结构
+        elif '<' in code_content and '>' in code_content:
+            is_code = True
         
-        # 如果判断为代码，则统计行数
-        if is_code:
-            total_code_lines += line_count
+        # 包含特殊字符组合
+        elif any(char in code_content for char in ['{', '}', '(', ')', '[', ']']) and ('=' in code_content or ':' in code_content):
+            is_code = True
+    
+    # 4. 模式匹配检测（宽松策略）
+    if not is_code and len(lines) >= 1:
+        if SPECIAL_PATTERN.search(code_content):
+            is_code = True
     
-    return total_code_lines
+    # 如果判断为代码，则统计行数
+    return line_count if is_code else 0
 
-def calculate_reading_stats(markdown):
-    """计算中文字符数和代码行数"""
-    # 生成内容哈希用于缓存
-    content_hash = hash(markdown)
+def get_front_matter_end(markdown):
+    """front matter（以 --- 开头到下一个 --- 为止）结束的位置，没有时为0"""
+    if markdown.startswith('---'):
+        end = markdown.find('---', 3)
+        if end != -1:
+            return end + 3
+    return 0
+
+def count_link_text_chars(markdown, start, end):
+    """链接文字中的中文字符数"""
+    return sum(match.end() - match.start() for match in LINK_TEXT_PATTERN.finditer(markdown, start, end)
+               if match.lastgroup == 'cjk')
+
+def scan_reading_stats(markdown):
+    """
+    单遍扫描 Markdown，同时得到：
+    - 代码块、HTML 标签、图片、行内代码和 front matter 以外的中文字符数
+    - 代码块的有效代码行数（扫描到围栏时直接跳到对应的结束围栏）
+    - 阅读信息的插入位置：front matter 之后第一个一级标题所在行的行尾，
+      没有一级标题时为第一个任意级别标题的行尾，都没有时为None（代码块中的 # 注释不算标题）
+    """
+    front_matter_end = get_front_matter_end(markdown)
+    chinese_chars = 0
+    code_lines = 0
+    h1_end = heading_end = None
+    has_closing_fence = True
     
-    # 使用缓存的清理函数
-    clean_content = clean_markdown_content_for_chinese(content_hash, markdown)
-    chinese_chars = len(CHINESE_CHARS_PATTERN.findall(clean_content))
+    search = READING_SCAN_PATTERN.search
+    pos = 0
+    while True:
+        match = search(markdown, pos)
+        if match is None:
+            break
+        kind = match.lastgroup
+        start, pos = match.span()
+        
+        if kind == 'cjk':
+            if pos > front_matter_end:
+                chinese_chars += pos - max(start, front_matter_end)
+        elif kind == 'fence':
+            close = markdown.find('```', pos) if has_closing_fence else -1
+            if close == -1:
+                # 没有配对的结束围栏：``` 按普通文本处理
+                has_closing_fence = False
+                pos = start + 1
+                continue
+            pos = close + 3
+            code_lines += count_block_lines(markdown[start:pos])
+        elif kind == 'link':
+            if start >= front_matter_end:
+                chinese_chars += count_link_text_chars(markdown, match.start('text'), match.end('text'))
+        elif kind == 'heading':
+            if (h1_end is None and start >= front_matter_end
+                    and (start == 0 or markdown[start - 1] == '\n')):
+                line_end = markdown.find('\n', pos)
+                if line_end == -1:
+                    line_end = len(markdown)
+                if pos - start == 1:
+                    h1_end = line_end
+                elif heading_end is None:
+                    heading_end = line_end
+        # 行内代码、HTML 标签、图片整体跳过
     
-    # 统计代码行数
-    code_lines = count_code_lines(markdown)
+    return chinese_chars, code_lines, h1_end if h1_end is not None else heading_end
+
+def compute_reading_stats(markdown):
+    """计算阅读时间、中文字符数、代码行数和阅读信息插入位置（不使用缓存）"""
+    chinese_chars, code_lines, title_end = scan_reading_stats(markdown)
     
     # 计算阅读时间（中文：400字/分钟）
     reading_time = max(1, round(chinese_chars / 400))
     
-    return reading_time, chinese_chars, code_lines
+    return reading_time, chinese_chars, code_lines, title_end
+
+def load_reading_stats_cache():
+    """读取磁盘上的阅读统计缓存，版本不一致或读取失败时返回空字典"""
+    if not READING_CACHE_CONFIG['persist']:
+        return {}
+    try:
+        with open(READING_CACHE_CONFIG['cache_file'], 'r', encoding='utf-8') as f:
+            cache_data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache_data.get('version') != STATS_VERSION:
+        return {}
+    return {digest: tuple(stats) for digest, stats in cache_data.get('stats', {}).items()}
+
+def save_reading_stats_cache():
+    """把统计结果写入磁盘（先写临时文件再替换，避免中断时留下损坏的缓存）"""
+    cache_file = READING_CACHE_CONFIG['cache_file']
+    stats = {digest: reading_stats_cache[digest] for digest in sorted(reading_stats_cache)}
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': STATS_VERSION, 'stats': stats}, f, separators=(',', ':'))
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"⚠️ 保存阅读统计缓存失败: {e}")
+
+def get_reading_stats(markdown):
+    """(阅读时间, 中文字符数, 代码行数, 阅读信息插入位置)，结果按内容摘要缓存"""
+    global reading_stats_cache, reading_stats_dirty
+    if reading_stats_cache is None:
+        reading_stats_cache = load_reading_stats_cache()
+    
+    digest = hashlib.md5(markdown.encode('utf-8')).hexdigest()
+    used_digests.add(digest)
+    stats = reading_stats_cache.get(digest)
+    if stats is None:
+        stats = reading_stats_cache[digest] = compute_reading_stats(markdown)
+        reading_stats_dirty = True
+    return stats
+
+def calculate_reading_stats(markdown):
+    """计算中文字符数和代码行数，返回 (阅读时间, 中文字符数, 代码行数)"""
+    return get_reading_stats(markdown)[:3]
+
+def on_config(config):
+    """读取 mkdocs.yml 中覆盖的页面规则"""
+    PAGE_RULES.configure(config)
+
+def on_post_build(config):
+    """构建结束时只保留本次用到的统计结果，有变化时保存到磁盘"""
+    global reading_stats_cache, reading_stats_dirty
+    if not used_digests:
+        return
+    
+    stale = len(used_digests) != len(reading_stats_cache)
+    if stale:
+        # 删除或修改过的页面的旧条目不再保留，缓存大小与站点页面数量一致
+        reading_stats_cache = {digest: reading_stats_cache[digest] for digest in used_digests}
+    if READING_CACHE_CONFIG['persist'] and (reading_stats_dirty or stale):
+        save_reading_stats_cache()
+    reading_stats_dirty = False
+    used_digests.clear()
+
+def publish_readtime(page, reading_time):
+    """
+    把阅读时间写入 page.meta['readtime']；博客文章同时写入博客插件的文章配置（page.config.readtime），
+    博客插件在 on_page_content 中发现已有 readtime 就不再按英文单词数重新计算，
+    文章页和博客首页的摘要卡片显示与阅读信息相同的数字。返回实际使用的阅读时间
+    """
+    explicit_readtime = page.meta.get('readtime')
+    if explicit_readtime:
+        return explicit_readtime
+    
+    page.meta['readtime'] = reading_time
+    post_config = getattr(page, 'config', None)
+    if post_config is not None and hasattr(post_config, 'readtime'):
+        post_config.readtime = reading_time
+    return reading_time
+
+def markdown_cache_key(page, config):
+    """markdown_cache 的缓存键中本 hook 代码之外的输入：页面规则（可能被 mkdocs.yml 覆盖）"""
+    return PAGE_RULES.fingerprint()
 
 def on_page_markdown(markdown, **kwargs):
     page = kwargs['page']
@@ -223,11 +421,9 @@ def on_page_markdown(markdown, **kwargs):
     if page.meta.get('hide_reading_time', False):
         return markdown
     
-    # 保持原有的EXCLUDE_PATTERNS循环检查方式
-    src_path = page.file.src_path
-    for pattern in EXCLUDE_PATTERNS:
-        if pattern.match(src_path):
-            return markdown
+    # 排除规则（判断结果按路径缓存）
+    if not PAGE_RULES.allows(page.file.src_path):
+        return markdown
     
     # 优化类型检查
     page_type = page.meta.get('type', '')
@@ -242,13 +438,16 @@ def on_page_markdown(markdown, **kwargs):
     if "!!! tip \"📖 阅读信息\"" in markdown:
         return markdown
     
-    # 计算统计信息
-    reading_time, chinese_chars, code_lines = calculate_reading_stats(markdown)
+    # 计算统计信息（同一次扫描得到主标题位置）
+    reading_time, chinese_chars, code_lines, title_end = get_reading_stats(markdown)
     
     # 过滤太短的内容
     if chinese_chars < 50:
         return markdown
     
+    # 与博客插件共用阅读时间（作者在 front matter 中指定的 readtime 优先）
+    reading_time = publish_readtime(page, reading_time)
+    
     # 生成阅读信息
     if code_lines > 0:
         reading_info = f"""!!! tip "📖 阅读信息"
@@ -261,44 +460,10 @@ def on_page_markdown(markdown, **kwargs):
 
 """
     
-    # 处理YAML front matter
-    has_frontmatter = markdown.startswith('---')
-    if has_frontmatter:
-        # 找到front matter的结束位置
-        fm_end = markdown.find('---', 3)
-        if fm_end != -1:
-            fm_end += 3  # 包含结束的 ---
-            frontmatter = markdown[:fm_end]
-            content = markdown[fm_end:]
-        else:
-            frontmatter = ''
-            content = markdown
-    else:
-        frontmatter = ''
-        content = markdown
-    
-    # 只查找文档的主标题（第一个标题，通常是一级标题）
-    main_title_match = re.search(r'^# (.+)$', content, re.MULTILINE)
-    
-    # 如果没有找到一级标题，尝试查找第一个出现的任何级别的标题
-    if not main_title_match:
-        main_title_match = re.search(r'^(#+) (.+)$', content, re.MULTILINE)
-    
-    if main_title_match:
-        # 找到主标题的位置
-        title_start = main_title_match.start()
-        title_end = main_title_match.end()
-        title_line_end = content.find('\n', title_end)
-        if title_line_end == -1:  # 如果标题后没有换行符
-            title_line_end = len(content)
-        
+    if title_end is not None:
         # 在主标题后插入阅读信息
-        result = (frontmatter + 
-                 content[:title_line_end] + 
-                 '\n\n' + reading_info + 
-                 content[title_line_end:])
-        
-        return result
-    else:
-        # 如果没有找到标题，则在front matter后插入阅读信息
-        return frontmatter + reading_info + content
+        return markdown[:title_end] + '\n\n' + reading_info + markdown[title_end:]
+    
+    # 如果没有找到标题，则在front matter后插入阅读信息
+    front_matter_end = get_front_matter_end(markdown)
+    return markdown[:front_matter_end] + reading_info + markdown[front_matter_end:]
@@ -0,0 +1,134 @@
+"""
+相关文章推荐索引的紧凑内存表示
+
+文章数量达到数万篇时，每篇文章一个字典、关键词以字符串重复保存在每篇文章和每个倒排列表中，
+索引会占用大量内存。这里的表示方式：
+
+- TokenTable：关键词、标签、分类、标题词统一映射为整数 id，每个词只保存一份
+- ArticleRecord：使用 __slots__ 的文章记录，关键词 id / 词频、标签 id 等保存在 array 中
+- PostingIndex：倒排列表为按文章 id 升序排列的 array('i')，而不是路径字符串列表
+
+用 benchmarks/related_posts_memory.py 测量索引内存。
+"""
+
+import sys
+from array import array
+from bisect import bisect_left, insort
+
+# 空倒排列表（只读）
+EMPTY_POSTINGS = array('i')
+
+
+class TokenTable:
+    """词表：词 ↔ 整数 id"""
+
+    __slots__ = ('ids', 'tokens')
+
+    def __init__(self):
+        self.ids = {}
+        self.tokens = []
+
+    def intern(self, token):
+        """获取词的 id（新词分配新 id）"""
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+    def get(self, token):
+        """获取词的 id（不存在时为None）"""
+        return self.ids.get(token)
+
+    def __getitem__(self, token_id):
+        return self.tokens[token_id]
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def clear(self):
+        self.ids.clear()
+        self.tokens.clear()
+
+
+class ArticleRecord:
+    """一篇文章的索引记录"""
+
+    __slots__ = ('id', 'position', 'path', 'url', 'title', 'description', 'tags', 'categories',
+                 'path_category', 'source_dir', 'content_hash',
+                 'keyword_ids', 'keyword_weights', 'tag_ids', 'category_ids', 'title_ids', 'recommendable')
+
+    def __init__(self, path, url, title, description, tags, categories, path_category, content_hash,
+                 keywords, tokens, title_words):
+        self.id = None        # 文章 id，加入索引时分配（倒排列表中保存的就是这个 id）
+        self.position = None  # 在本次构建文件列表中的顺序
+        self.path = path
+        self.url = url
+        self.title = title
+        self.description = description
+        # 标签和分类字符串在很多文章中重复出现，驻留后只保存一份
+        self.tags = tuple(sys.intern(tag) for tag in tags)
+        self.categories = tuple(sys.intern(category) for category in categories)
+        self.path_category = sys.intern(path_category)
+        self.source_dir = sys.intern(path.split('/')[0])  # blog 或 develop
+        self.content_hash = content_hash
+
+        self.keyword_ids = array('i', [tokens.intern(keyword) for keyword, _ in keywords])
+        self.keyword_weights = array('i', [weight for _, weight in keywords])
+        self.tag_ids = id_array(tokens.intern(tag.lower()) for tag in tags if tag)
+        self.category_ids = id_array(tokens.intern(category.lower()) for category in categories if category)
+        self.title_ids = id_array(tokens.intern(word) for word in title_words)
+        # 标题为"未命名"或为空的文章不参与推荐
+        self.recommendable = title != "未命名" and bool(title.strip())
+
+    def keywords(self, tokens):
+        """[(关键词, 词频), ...]，与 extract_keywords 的返回值一致"""
+        return [(tokens[keyword_id], weight) for keyword_id, weight in zip(self.keyword_ids, self.keyword_weights)]
+
+
+def id_array(ids):
+    """去重并排序后的 id 数组"""
+    return array('i', sorted(set(ids)))
+
+
+class PostingIndex:
+    """倒排索引：{词 id: 按文章 id 升序排列的 array('i')}"""
+
+    __slots__ = ('postings',)
+
+    def __init__(self):
+        self.postings = {}
+
+    def add(self, token_id, article_id):
+        postings = self.postings.get(token_id)
+        if postings is None:
+            self.postings[token_id] = array('i', (article_id,))
+        elif article_id == postings[-1]:
+            return
+        elif article_id > postings[-1]:
+            # 新文章的 id 总是最大的，直接追加即可保持有序
+            postings.append(article_id)
+        else:
+            insort(postings, article_id)
+
+    def remove(self, token_id, article_id):
+        postings = self.postings.get(token_id)
+        if postings is None:
+            return
+        i = bisect_left(postings, article_id)
+        if i < len(postings) and postings[i] == article_id:
+            del postings[i]
+            if not postings:
+                del self.postings[token_id]
+
+    def get(self, token_id):
+        """某个词的倒排列表（不存在时为空数组）"""
+        if token_id is None:
+            return EMPTY_POSTINGS
+        return self.postings.get(token_id, EMPTY_POSTINGS)
+
+    def __len__(self):
+        return len(self.postings)
+
+    def clear(self):
+        self.postings.clear()
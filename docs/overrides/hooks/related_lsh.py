@@ -0,0 +1,96 @@
+"""
+相关文章推荐的 MinHash / LSH 近似候选生成（可选）
+
+文章数量达到数万篇时，热门标签/分类的倒排列表很长，倒排索引得到的候选集几乎是全部文章。
+在 SIMILARITY_CONFIG 中设置 'candidate_source': 'lsh' 后，related_posts.py 改为：
+
+1. 用每篇文章的关键词、标签、分类集合计算 MinHash 签名（lsh_bands × lsh_rows 个哈希函数）
+2. 把签名分成 lsh_bands 段，每段 lsh_rows 个值，同一段完全相同的文章落进同一个桶
+3. 与当前文章至少共享一个桶的文章作为候选，再用原有的打分公式精确打分
+
+两篇文章集合的 Jaccard 相似度为 s 时，成为候选的概率为 1 - (1 - s^rows)^bands：
+bands 越多、rows 越少，召回率越高，候选集也越大。召回率可用 benchmarks/related_posts_lsh.py 测量。
+
+安装了 numpy 时用向量化计算签名，否则使用纯 Python。
+"""
+
+import random
+import zlib
+from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:  # 未安装时使用纯 Python 计算签名
+    np = None
+
+# 哈希取模用的梅森素数（2^31 - 1），保证 a * x + b 在 64 位整数范围内
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def article_elements(article, tokens):
+    """参与 MinHash 的元素：关键词、标签、分类（带前缀区分来源；tokens 为 related_index.TokenTable）"""
+    elements = {f'k:{tokens[keyword_id]}' for keyword_id in article.keyword_ids}
+    elements.update(f't:{tokens[tag_id]}' for tag_id in article.tag_ids)
+    elements.update(f'c:{tokens[category_id]}' for category_id in article.category_ids)
+    elements.add(f'p:{article.path_category}')
+    return elements
+
+
+class LSHIndex:
+    """MinHash 签名 + 分段（banding）哈希桶"""
+
+    def __init__(self, bands, rows, seed=1, max_bucket_size=None):
+        self.bands = bands
+        self.rows = rows
+        self.max_bucket_size = max_bucket_size
+        rng = random.Random(seed)
+        permutation_count = bands * rows
+        self.coefficients = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                             for _ in range(permutation_count)]
+        if np is not None:
+            self._a = np.array([a for a, _ in self.coefficients], dtype=np.uint64)
+            self._b = np.array([b for _, b in self.coefficients], dtype=np.uint64)
+        self.buckets = defaultdict(list)
+        self.band_keys = {}
+
+    def signature(self, elements):
+        """计算 MinHash 签名（元素用 crc32 映射为整数，保证跨进程稳定）"""
+        hashes = [zlib.crc32(element.encode('utf-8')) % MERSENNE_PRIME for element in elements]
+        if np is not None:
+            values = np.array(hashes, dtype=np.uint64)
+            return ((self._a[:, None] * values[None, :] + self._b[:, None]) % MERSENNE_PRIME).min(axis=1).tolist()
+        return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self.coefficients]
+
+    def add(self, article_id, elements):
+        """加入一篇文章（元素为空的文章不参与 LSH）"""
+        if not elements:
+            return
+        signature = self.signature(elements)
+        keys = [(band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+        self.band_keys[article_id] = keys
+        for key in keys:
+            self.buckets[key].append(article_id)
+
+    def candidates(self, article_id):
+        """
+        与该文章至少共享一个桶的文章 id（不含自身）
+
+        超过 max_bucket_size 的桶整体跳过（与倒排索引跳过超长倒排列表一致）：
+        截取前若干篇会只保留 id 较小（较早索引）的文章，使推荐偏向旧文章
+        """
+        result = set()
+        for key in self.band_keys.get(article_id, ()):
+            bucket = self.buckets[key]
+            if self.max_bucket_size and len(bucket) > self.max_bucket_size:
+                continue
+            result.update(bucket)
+        result.discard(article_id)
+        return result
+
+
+def build_index(articles, tokens, config):
+    """为所有已索引文章（related_index.ArticleRecord）建立 LSH 索引"""
+    lsh_index = LSHIndex(config['lsh_bands'], config['lsh_rows'], max_bucket_size=config.get('max_postings'))
+    for article in articles:
+        lsh_index.add(article.id, article_elements(article, tokens))
+    return lsh_index
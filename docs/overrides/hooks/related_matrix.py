@@ -0,0 +1,301 @@
+"""
+相关文章推荐的稀疏矩阵打分引擎（可选，需要 numpy + scipy）
+
+related_posts.py 默认逐篇用纯 Python 打分；文章数量很大时，可以在 SIMILARITY_CONFIG 中设置
+'engine': 'matrix'，把关键词、标签、分类放进稀疏矩阵，用矩阵乘法一次性算出所有文章两两之间的相似度，
+再按行选出前 k 篇。
+
+两种打分方式（SIMILARITY_CONFIG['matrix_scoring']）：
+- 'exact'：与纯 Python 引擎的权重公式完全一致（max_postings 为 None 时结果相同，
+  用 benchmarks/related_posts_engines.py 在合成语料上逐项比较）
+- 'tfidf'：关键词/标签/分类各自做 TF-IDF 并归一化，按 tfidf_weights 拼成一个矩阵，
+  相似度即加权余弦相似度（只需一次稀疏矩阵乘法）
+
+结果按行分块计算，每块是一个稠密矩阵，内存占用与块大小成正比而不是与文章数的平方成正比。
+"""
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # 未安装时 related_posts 回退到纯 Python 引擎
+    np = None
+    sparse = None
+
+# 每个分块的稠密矩阵最多包含的元素个数（行数 × 文章数）
+CHUNK_ELEMENTS = 2_000_000
+
+
+def is_available():
+    """numpy 和 scipy 是否可用"""
+    return np is not None and sparse is not None
+
+
+def _build_matrix(rows, vocabulary=None):
+    """
+    rows: 每篇文章的 [(词, 值), ...]，同一行中的词不重复
+    vocabulary: 预先指定的词表 {词: 列号}，为None时按出现顺序建立
+    """
+    fixed = vocabulary is not None
+    vocabulary = {} if vocabulary is None else vocabulary
+    indptr = [0]
+    indices = []
+    data = []
+    for terms in rows:
+        for term, value in terms:
+            column = vocabulary.get(term) if fixed else vocabulary.setdefault(term, len(vocabulary))
+            if column is None:
+                continue
+            indices.append(column)
+            data.append(value)
+        indptr.append(len(indices))
+    shape = (len(rows), max(len(vocabulary), 1))
+    matrix = sparse.csr_matrix((np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)), shape=shape)
+    return matrix, vocabulary
+
+
+def _binary_matrix(term_sets, vocabulary=None):
+    return _build_matrix([[(term, 1.0) for term in terms] for terms in term_sets], vocabulary)
+
+
+def _labels(values):
+    """每篇文章的值 → 整数编号数组（值相同编号相同）"""
+    numbering = {}
+    return np.array([numbering.setdefault(value, len(numbering)) for value in values], dtype=np.int64)
+
+
+def _dense_product(left, right_t):
+    """left @ right_t 的稠密结果（right_t 为预先转置好的 CSR 矩阵）"""
+    return (left @ right_t).toarray()
+
+
+def _l2_normalize(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def _idf_weighted(matrix):
+    """按列乘以平滑 idf：log((1 + n) / (1 + df)) + 1"""
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + matrix.shape[0]) / (1 + document_frequency)) + 1
+    return matrix @ sparse.diags(idf)
+
+
+class _ExactScorer:
+    """与 related_posts.score_candidate + 标题相似度完全一致的分块打分"""
+
+    def __init__(self, articles, tokens, config):
+        weights = config['weights']
+        self.weights = weights
+        self.title_weight = config['title_similarity']
+
+        # 关键词词频矩阵；按列（关键词）存储一份，用来找出分块内每篇文章的关键词出现在哪些文章中
+        self.keywords = _build_matrix([[(kw, float(count)) for kw, count in zip(a.keyword_ids, a.keyword_weights)] for a in articles])[0]
+        self.keywords_by_column = self.keywords.tocsc()
+        self.keyword_lengths = np.array([max(len(a.keyword_ids), 1) for a in articles], dtype=np.float64)
+
+        self.tags = _binary_matrix([a.tag_ids for a in articles])[0]
+        self.tag_lengths = np.array([max(len(a.tag_ids), 1) for a in articles], dtype=np.float64)
+        self.categories = _binary_matrix([a.category_ids for a in articles])[0]
+        self.category_lengths = np.array([max(len(a.category_ids), 1) for a in articles], dtype=np.float64)
+        # 路径分类、源目录只需判断是否相同：转成整数编号后直接比较
+        self.path_categories = _labels([a.path_category for a in articles])
+        self.source_dirs = _labels([a.source_dir for a in articles])
+        self.title_words = _binary_matrix([a.title_ids for a in articles])[0]
+        self.title_lengths = np.array([len(a.title_ids) for a in articles], dtype=np.float64)
+
+        # 候选文章：与倒排索引 get_candidates 的规则一致
+        # （共享关键词/标签、分类/路径分类或标题词），只有候选文章才能得到同源目录加分
+        self.candidates = _binary_matrix([
+            [('keyword', kw) for kw in set(a.keyword_ids) | set(a.tag_ids)]
+            + [('category', cat) for cat in {tokens.get(a.path_category)} | set(a.category_ids)]
+            + [('title', word) for word in a.title_ids]
+            for a in articles
+        ])[0]
+
+        self.transposed = {
+            name: getattr(self, name).T.tocsr()
+            for name in ('tags', 'categories', 'title_words', 'candidates')
+        }
+
+    def _product(self, name, rows, pairs):
+        """分块内候选文章对上的乘积值"""
+        return _dense_product(getattr(self, name)[rows], self.transposed[name])[pairs]
+
+    def _keyword_overlap(self, rows):
+        """
+        分块内每对文章的 (Σ min(词频a, 词频b), 共享关键词数)，两个稠密矩阵。
+        按共享的关键词把文章对展开后求和，计算量与一次稀疏矩阵乘法相同，与词频的大小无关
+        """
+        chunk = self.keywords[rows].tocoo()
+        by_column = self.keywords_by_column
+        starts = by_column.indptr[chunk.col]
+        lengths = by_column.indptr[chunk.col + 1] - starts
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(starts, lengths) + offsets
+        pair_rows = np.repeat(chunk.row, lengths)
+        pair_columns = by_column.indices[positions]
+        shape = (rows.stop - rows.start, self.keywords.shape[0])
+        # 由 COO 转换时重复的 (行, 列) 求和；词频是整数，求和顺序不影响结果
+        minimum = sparse.csr_matrix((np.minimum(np.repeat(chunk.data, lengths), by_column.data[positions]),
+                                     (pair_rows, pair_columns)), shape=shape)
+        common = sparse.csr_matrix((np.ones(len(positions)), (pair_rows, pair_columns)), shape=shape)
+        return minimum.toarray(), common.toarray()
+
+    def score(self, rows):
+        weights = self.weights
+        score = np.zeros((rows.stop - rows.start, self.tags.shape[0]))
+
+        # 只对候选文章对（共享关键词/标签、分类/路径分类或标题词）计算，其余文章对相似度为 0
+        pairs = np.nonzero(_dense_product(self.candidates[rows], self.transposed['candidates']))
+        row_ids = pairs[0] + rows.start
+        pair_score = np.zeros(len(row_ids))
+
+        # 1. 关键词相似度
+        if self.keywords.nnz:
+            keyword_score, common = self._keyword_overlap(rows)
+            keyword_score = keyword_score[pairs]
+            common = common[pairs]
+            keyword_bonus = common / self.keyword_lengths[row_ids] * 0.5
+            pair_score += np.where(common > 0, (keyword_score + keyword_bonus) * weights['keywords'], 0.0)
+
+        # 2. 标签相似度
+        overlap = self._product('tags', rows, pairs)
+        pair_score += np.where(overlap > 0, overlap * 8 * (1 + overlap / self.tag_lengths[row_ids]) * weights['tags'], 0.0)
+
+        # 3. 分类相似度
+        overlap = self._product('categories', rows, pairs)
+        pair_score += np.where(overlap > 0, overlap * 12 * (1 + overlap / self.category_lengths[row_ids]) * weights['categories'], 0.0)
+
+        # 4. 路径分类相似度
+        pair_score += np.where(self.path_categories[row_ids] == self.path_categories[pairs[1]], 3 * weights['path'], 0.0)
+
+        # 5. 同源目录加分
+        pair_score += np.where(self.source_dirs[row_ids] == self.source_dirs[pairs[1]], 2 * weights['source_dir'], 0.0)
+
+        # 标题相似度加权
+        intersection = self._product('title_words', rows, pairs)
+        union = self.title_lengths[row_ids] + self.title_lengths[pairs[1]] - intersection
+        with np.errstate(divide='ignore', invalid='ignore'):
+            title_similarity = np.where(union > 0, intersection / union, 0.0)
+        pair_score += np.where(title_similarity > 0.3, title_similarity * self.title_weight, 0.0)
+
+        score[pairs] = pair_score
+        return score
+
+
+class _TfidfScorer:
+    """加权 TF-IDF 余弦相似度：一个拼接矩阵，一次稀疏矩阵乘法"""
+
+    def __init__(self, articles, config):
+        weights = config['tfidf_weights']
+        keyword_matrix = _build_matrix([[(kw, 1 + np.log(count)) for kw, count in zip(a.keyword_ids, a.keyword_weights) if count > 0] for a in articles])[0]
+        blocks = [
+            (weights.get('keywords', 0), _idf_weighted(keyword_matrix)),
+            (weights.get('tags', 0), _idf_weighted(_binary_matrix([a.tag_ids for a in articles])[0])),
+            (weights.get('categories', 0), _idf_weighted(_binary_matrix([a.category_ids for a in articles])[0])),
+            (weights.get('path', 0), _binary_matrix([[a.path_category] for a in articles])[0]),
+        ]
+        # 每块归一化后乘以 sqrt(权重)，点积即为各部分余弦相似度的加权和
+        self.matrix = sparse.hstack([np.sqrt(weight) * _l2_normalize(block) for weight, block in blocks if weight > 0]).tocsr()
+        self.matrix_t = self.matrix.T.tocsr()
+
+    def _keyword_overlap(self, rows):
+        """
+        分块内每对文章的 (Σ min(词频a, 词频b), 共享关键词数)，两个稠密矩阵。
+        按共享的关键词把文章对展开后求和，计算量与一次稀疏矩阵乘法相同，与词频的大小无关
+        """
+        chunk = self.keywords[rows].tocoo()
+        by_column = self.keywords_by_column
+        starts = by_column.indptr[chunk.col]
+        lengths = by_column.indptr[chunk.col + 1] - starts
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(starts, lengths) + offsets
+        pair_rows = np.repeat(chunk.row, lengths)
+        pair_columns = by_column.indices[positions]
+        shape = (rows.stop - rows.start, self.keywords.shape[0])
+        # 由 COO 转换时重复的 (行, 列) 求和；词频是整数，求和顺序不影响结果
+        minimum = sparse.csr_matrix((np.minimum(np.repeat(chunk.data, lengths), by_column.data[positions]),
+                                     (pair_rows, pair_columns)), shape=shape)
+        common = sparse.csr_matrix((np.ones(len(positions)), (pair_rows, pair_columns)), shape=shape)
+        return minimum.toarray(), common.toarray()
+
+    def score(self, rows):
+        return _dense_product(self.matrix[rows], self.matrix_t)
+
+
+def _reduce_row(order, columns, category_matrix, max_count):
+    """
+    只保留多样性选择会用到的文章：全局前 2 * max_count 篇，以及每个分类的前 max_count 篇。
+    order: 按相似度从高到低排好序的行内位置
+    """
+    keep = np.zeros(len(order), dtype=bool)
+    keep[:max_count * 2] = True
+
+    # 直接从 CSR 的 indptr/indices 取出每篇文章的分类（比按行切片稀疏矩阵快得多）
+    sorted_columns = columns[order]
+    starts = category_matrix.indptr[sorted_columns]
+    lengths = category_matrix.indptr[sorted_columns + 1] - starts
+    if lengths.any():
+        ranks = np.repeat(np.arange(len(order)), lengths)
+        offsets = np.arange(len(ranks)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        categories = category_matrix.indices[np.repeat(starts, lengths) + offsets]
+        # 按 (分类, 排名) 排序后，每个分类取前 max_count 个
+        by_category = np.lexsort((ranks, categories))
+        categories = categories[by_category]
+        ranks = ranks[by_category]
+        group_start = np.r_[0, np.flatnonzero(np.diff(categories)) + 1]
+        group_sizes = np.diff(np.r_[group_start, len(categories)])
+        rank_in_group = np.arange(len(categories)) - np.repeat(group_start, group_sizes)
+        keep[ranks[rank_in_group < max_count]] = True
+    return order[keep]
+
+
+def compute_related(articles, tokens, config, select):
+    """
+    为所有文章计算相关推荐
+    articles: 按文件顺序排列的 related_index.ArticleRecord 列表；tokens: 对应的词表
+    select: related_posts.select_related_articles（多样性选择，与纯 Python 引擎共用）
+    返回 {文章路径: [(相似度, 文章记录), ...]}
+    """
+    total = len(articles)
+    if not total:
+        return {}
+
+    if config.get('matrix_scoring', 'exact') == 'tfidf':
+        scorer = _TfidfScorer(articles, config)
+        threshold = config['tfidf_threshold']
+    else:
+        scorer = _ExactScorer(articles, tokens, config)
+        threshold = config['min_threshold']
+
+    max_count = config['max_related']
+    recommendable = np.array([a.recommendable for a in articles], dtype=bool)
+    # 分类列号按名称排序，与多样性选择中 sorted(category_groups) 的顺序一致
+    category_names = [{category.lower() for category in a.categories if category} for a in articles]
+    category_vocabulary = {name: i for i, name in enumerate(sorted(set().union(*category_names)))}
+    category_matrix = _binary_matrix(category_names, category_vocabulary)[0]
+
+    results = {}
+    chunk_size = max(1, CHUNK_ELEMENTS // total)
+    for start in range(0, total, chunk_size):
+        rows = slice(start, min(start + chunk_size, total))
+        scores = scorer.score(rows)
+        scores[:, ~recommendable] = 0.0
+        row_count = rows.stop - rows.start
+        scores[np.arange(row_count), np.arange(rows.start, rows.stop)] = 0.0
+
+        # 整块一次性取出超过阈值的元素，再按行切分
+        row_ids, column_ids = np.nonzero(scores > threshold)
+        values = scores[row_ids, column_ids]
+        bounds = np.searchsorted(row_ids, np.arange(row_count + 1))
+        for offset in range(row_count):
+            columns = column_ids[bounds[offset]:bounds[offset + 1]]
+            row_scores = values[bounds[offset]:bounds[offset + 1]]
+            # 相似度从高到低，同分按文章顺序（与稳定排序一致）
+            order = np.lexsort((columns, -row_scores))
+            if len(order) > max_count * 2:
+                order = _reduce_row(order, columns, category_matrix, max_count)
+            similarities = [(float(row_scores[i]), articles[columns[i]]) for i in order]
+            results[articles[start + offset].path] = select(similarities, max_count, candidate_count=len(columns))
+    return results
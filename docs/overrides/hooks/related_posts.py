@@ -1,36 +1,70 @@
+import heapq
 import os
+from operator import attrgetter
 import re
+import zlib
 from collections import Counter, defaultdict
 from textwrap import dedent
 import hashlib
+import json
 import yaml
+from pathlib import Path
 from urllib.parse import urlparse
 
-# 存储所有文章的信息和索引
+from mkdocs.config.config_options import ExtraScriptValue
+
+import document_store
+import fork_pool
+import page_rules
+import related_index
+import related_lsh
+import related_matrix
+
+# 存储所有文章的信息和索引：{文章路径: ArticleRecord}，按本次构建的文件顺序排列
 article_index = {}
-category_index = defaultdict(list)
-keyword_index = defaultdict(set)
-
-# 配置：需要索引的目录
-INDEXED_DIRECTORIES = ['blog/', 'develop/']  
-
-# 配置：排除推荐的页面列表（支持精确匹配和模式匹配）
-EXCLUDED_PAGES = {
-    # 精确路径匹配
-    'blog/index.md',
-    'develop/index.md',
-    # 可以添加更多排除的页面
-    # 'blog/special-page.md',
-}
+# 词表：关键词、标签、分类、标题词 ↔ 整数 id（紧凑表示见 related_index.py）
+tokens = related_index.TokenTable()
+# 文章 id → ArticleRecord（已删除的文章为None）
+articles = []
+# 倒排索引：{词 id: 按文章 id 升序排列的数组}
+category_index = related_index.PostingIndex()
+keyword_index = related_index.PostingIndex()
+title_index = related_index.PostingIndex()
+# 预先计算好的相关文章列表：{文章路径: [(相似度, 文章信息), ...]}
+related_articles_cache = {}
+# MinHash/LSH 近似候选索引（candidate_source 为 'lsh' 时在 on_files 结束时建立）
+lsh_index = None
+# 索引条目：{文章路径: (内容哈希, ArticleRecord（禁用推荐时为None）)}，跨构建持久化
+index_entries = {}
+index_config_version = None
 
-# 配置：排除推荐的页面模式（支持通配符）
-EXCLUDED_PATTERNS = [
-    r'.*\/index\.md$',  # 排除所有 index.md 文件
-    r'.*\/archive\.md$',  # 排除所有 archive.md 文件
-    r'blog\/posts?\/.*',  # 排除 blog/post/ 和 blog/posts/ 目录下的所有文章
-    # 可以添加更多模式
-    # r'blog\/draft\/.*',  # 排除草稿目录
-]
+# 索引缓存文件（与 AI 摘要的 .ai_cache 一样放在项目根目录）
+INDEX_CACHE_FILE = Path(".related_cache") / "index.json"
+# 索引格式/关键词提取逻辑的版本，修改 extract_keywords 等函数后需要增加
+INDEX_VERSION = 2
+
+# 配置：需要索引的页面（规则由 page_rules 编译为单个正则，可在 mkdocs.yml 的 extra.page_rules.related_posts 中覆盖）
+PAGE_RULES = page_rules.register(
+    'related_posts',
+    suffixes=['.md'],
+    # 需要索引的目录
+    include_dirs=['blog/', 'develop/'],
+    # 排除推荐的页面（精确路径匹配）
+    exclude_files=[
+        'blog/index.md',
+        'develop/index.md',
+        # 可以添加更多排除的页面
+        # 'blog/special-page.md',
+    ],
+    # 排除推荐的页面模式（正则，从路径开头匹配）
+    exclude_regexes=[
+        r'.*\/index\.md$',  # 排除所有 index.md 文件
+        r'.*\/archive\.md$',  # 排除所有 archive.md 文件
+        r'blog\/posts?\/.*',  # 排除 blog/post/ 和 blog/posts/ 目录下的所有文章
+        # 可以添加更多模式
+        # r'blog\/draft\/.*',  # 排除草稿目录
+    ],
+)
 
 # 配置：相似度阈值和权重
 SIMILARITY_CONFIG = {
@@ -42,37 +76,79 @@ SIMILARITY_CONFIG = {
         'path': 0.10,        # 路径分类权重
         'source_dir': 0.05   # 源目录权重
     },
-    'title_similarity': 0.25  # 标题相似度权重
+    'title_similarity': 0.25,  # 标题相似度权重
+    # 候选文章只从倒排索引中取（至少共享一个关键词、标签或分类）；
+    # 出现在超过 N 篇文章中的词/标签/分类（包括路径分类）视为停用词，不用来生成候选，避免候选集退化为全部文章。
+    # 只取决于文章数量，与文章 id 无关，mkdocs serve 增量重建与完整构建的结果一致（None 表示不限制）
+    'max_postings': 1000,
+    'max_related': 5,  # 每篇文章推荐的数量（on_files 结束时按此数量为所有文章预先计算）
+    # 打分引擎：'python' 逐篇打分；'matrix' 稀疏矩阵批量打分（需要 numpy + scipy，见 related_matrix.py）
+    'engine': 'python',
+    # matrix 引擎的打分方式：'exact' 与上面的权重公式一致（max_postings 为 None 时结果相同）；'tfidf' 加权 TF-IDF 余弦相似度
+    'matrix_scoring': 'exact',
+    'tfidf_weights': {
+        'keywords': 0.5,
+        'tags': 0.25,
+        'categories': 0.15,
+        'path': 0.10
+    },
+    'tfidf_threshold': 0.1,  # tfidf 打分方式的最低相似度（余弦相似度加权和，范围 0~1）
+    # 候选文章来源（python 引擎）：'index' 倒排索引（精确）；'lsh' MinHash/LSH 近似（文章数量很大时使用，见 related_lsh.py）
+    'candidate_source': 'index',
+    'lsh_bands': 32,  # LSH 分段数（越多召回率越高，候选集越大）
+    'lsh_rows': 2,    # 每段的 MinHash 个数（越多越严格，候选集越小）
+    # 关键词特征哈希：设置为整数（如 2 ** 18）时，关键词映射为固定数量的哈希桶，
+    # 索引内存不再随文章数量和词汇量增长（少量哈希冲突会让不同词被视为同一个关键词）；None 表示不启用
+    'keyword_hash_buckets': None
 }
 
-def is_page_excluded(file_path):
-    """检查页面是否应该排除推荐"""
-    # 精确匹配检查
-    if file_path in EXCLUDED_PAGES:
-        return True
-    
-    # 模式匹配检查
-    for pattern in EXCLUDED_PATTERNS:
-        if re.match(pattern, file_path):
-            return True
-    
-    return False
+# 配置：并行建立索引（读取 front matter、提取关键词）
+INDEXING_CONFIG = {
+    # 需要重新提取的文章达到该数量时使用进程池；数量较少时进程启动开销大于收益，保持串行
+    'parallel_min_files': 200,
+    'workers': None,    # 进程数，None 表示 CPU 核数
+    'chunk_size': 64    # 每个任务包含的文章数（分块分发，减少进程间通信次数）
+}
+
+# 配置：推荐列表的输出方式
+RENDER_CONFIG = {
+    # 'inline'：推荐列表直接写入页面 HTML；
+    # 'client'：推荐列表写入 JSON 文件，页面中只有占位元素，由延迟加载的脚本在浏览器中渲染。
+    # 新增一篇文章时只有 JSON 文件和新页面变化，其他页面的 HTML 不变，部署差异和 CDN 刷新范围更小
+    'mode': 'inline',
+    # client 模式下按栏目（文章所在目录，如 blog/xxx）拆分为多个小 JSON 文件；False 时写入同一个文件
+    'shard_by_section': True
+}
+
+# 分词：中日韩文字（汉字、日文假名、韩文音节）按相邻两字切分（二元组），其余文字按单词切分
+CJK_CHARS = '\u4e00-\u9fff\u3400-\u4dbf\u3040-\u30ff\uac00-\ud7af'
+TOKEN_PATTERN = re.compile(f'([{CJK_CHARS}]+)|([^\\W{CJK_CHARS}]+)')
+# 含有这些虚词的二元组（如"客的"、"的相"）没有意义，不作为关键词
+CJK_STOP_CHARS = frozenset('的了是和与及而就都这那')
 
 def should_index_file(file_path):
-    """检查文件是否应该被索引"""
-    if not file_path.endswith('.md'):
-        return False
-    
-    # 先检查是否被排除
-    if is_page_excluded(file_path):
-        return False
-    
-    # 检查是否在指定目录下
-    for directory in INDEXED_DIRECTORIES:
-        if file_path.startswith(directory):
-            return True
-    
-    return False
+    """检查文件是否应该被索引（.md 文件、在索引目录下且未被排除，判断结果按路径缓存）"""
+    return PAGE_RULES.allows(file_path)
+
+def tokenize(text):
+    """
+    分词：英文等按单词切分；连续的中日韩文字没有空格分隔，按相邻两字切分成二元组
+    （"相关文章推荐" → 相关、关文、文章、章推、推荐），不依赖分词库，同主题文章也能共享关键词
+    """
+    tokens = []
+    for cjk_run, word in TOKEN_PATTERN.findall(text):
+        if word:
+            tokens.append(word)
+        elif len(cjk_run) == 1:
+            tokens.append(cjk_run)
+        else:
+            tokens.extend([cjk_run[i:i + 2] for i in range(len(cjk_run) - 1)
+                           if cjk_run[i] not in CJK_STOP_CHARS and cjk_run[i + 1] not in CJK_STOP_CHARS])
+    return tokens
+
+def hash_keyword(word, buckets):
+    """关键词特征哈希（crc32 在不同进程、不同构建之间结果稳定）"""
+    return zlib.crc32(word.encode('utf-8')) % buckets
 
 def extract_keywords(content, title):
     """提取文章中的关键词，改进算法"""
@@ -89,8 +165,8 @@ def extract_keywords(content, title):
     content = re.sub(r'^#+\s+', '', content, flags=re.MULTILINE)
     
     # 合并标题和内容，标题权重更高
-    title_words = re.findall(r'\b\w+\b', title.lower()) * 4  # 增加标题权重
-    content_words = re.findall(r'\b\w+\b', content.lower())
+    title_words = tokenize(title.lower()) * 4  # 增加标题权重
+    content_words = tokenize(content.lower())
     all_words = title_words + content_words
     
     # 扩展停用词列表（包含中英文）
@@ -115,11 +191,16 @@ def extract_keywords(content, title):
     words = [w for w in all_words 
              if len(w) >= 2 and w not in stopwords and not w.isdigit()]
     
+    # 启用特征哈希时按哈希桶计数，计数器大小不超过桶数
+    buckets = SIMILARITY_CONFIG.get('keyword_hash_buckets')
+    if buckets:
+        return Counter(hash_keyword(w, buckets) for w in words).most_common(15)
+    
     # 返回词频最高的15个词
     return Counter(words).most_common(15)
 
-def extract_metadata(content):
-    """提取文章元数据，支持YAML front matter"""
+def extract_metadata(content, front_matter=None):
+    """提取文章元数据，支持YAML front matter（可传入已解析的 front matter，避免重复解析）"""
     metadata = {
         'title': "未命名",
         'description': "",
@@ -129,11 +210,10 @@ def extract_metadata(content):
     }
     
     # 尝试解析YAML front matter
-    yaml_match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-    if yaml_match:
+    yaml_match = None if front_matter is not None else re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
+    if front_matter is not None or yaml_match:
         try:
-            yaml_content = yaml_match.group(1)
-            yaml_data = yaml.safe_load(yaml_content)
+            yaml_data = front_matter if front_matter is not None else yaml.safe_load(yaml_match.group(1))
             if yaml_data:
                 metadata['title'] = str(yaml_data.get('title', '未命名')).strip('"\'')
                 metadata['description'] = str(yaml_data.get('description', '')).strip('"\'')
@@ -176,132 +256,180 @@ def calculate_content_hash(content):
     """计算内容哈希，用于检测内容变化"""
     return hashlib.md5(content.encode('utf-8')).hexdigest()
 
-def on_files(files, config):
-    """预处理所有文章，建立索引"""
-    global article_index, category_index, keyword_index
-    
-    # 清空索引
-    article_index.clear()
-    category_index.clear()
-    keyword_index.clear()
-    
-    processed_count = 0
-    excluded_count = 0
-    
-    for file in files:
-        if should_index_file(file.src_path):
-            try:
-                with open(file.abs_src_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                    # 提取元数据
-                    metadata = extract_metadata(content)
-                    
-                    # 检查是否禁用相关推荐
-                    if metadata.get('disable_related', False):
-                        excluded_count += 1
-                        continue
-                    
-                    # 再次检查是否在排除列表中（双重检查）
-                    if is_page_excluded(file.src_path):
-                        excluded_count += 1
-                        continue
-                    
-                    # 提取关键词
-                    keywords = extract_keywords(content, metadata['title'])
-                    
-                    # 获取分类
-                    path_category = get_category_from_path(file.src_path)
-                    
-                    # 构建文章信息
-                    article_info = {
-                        'title': metadata['title'],
-                        'description': metadata['description'],
-                        'tags': metadata['tags'],
-                        'categories': metadata['categories'],
-                        'path_category': path_category,
-                        'keywords': keywords,
-                        'url': file.url,
-                        'path': file.src_path,
-                        'content_hash': calculate_content_hash(content),
-                        'source_dir': file.src_path.split('/')[0]  # blog 或 develop
-                    }
-                    
-                    # 添加到主索引
-                    article_index[file.src_path] = article_info
-                    
-                    # 添加到分类索引
-                    category_index[path_category].append(file.src_path)
-                    for category in metadata['categories']:
-                        if category:  # 确保分类不为空
-                            category_index[category].append(file.src_path)
-                    
-                    # 添加到关键词索引
-                    for keyword, _ in keywords:
-                        keyword_index[keyword].add(file.src_path)
-                    for tag in metadata['tags']:
-                        if tag:  # 确保标签不为空
-                            keyword_index[tag.lower()].add(file.src_path)
-                    
-                    processed_count += 1
-                    
-            except Exception as e:
-                print(f"❌ 处理文件 {file.src_path} 时出错: {e}")
-    
-    print(f"✅ 已索引 {processed_count} 篇文章 (blog + develop)")
-    if excluded_count > 0:
-        print(f"📝 排除 {excluded_count} 篇禁用推荐或在排除列表中的文章")
-    print(f"📊 分类数量: {len(category_index)}")
-    print(f"🔤 关键词数量: {len(keyword_index)}")
-    return files
+def get_index_config_version():
+    """影响索引内容的配置的指纹（修改关键词提取逻辑时请同时增加 INDEX_VERSION）"""
+    index_config = {
+        'version': INDEX_VERSION,
+        'page_rules': PAGE_RULES.fingerprint(),
+        'keyword_hash_buckets': SIMILARITY_CONFIG.get('keyword_hash_buckets')
+    }
+    return hashlib.md5(json.dumps(index_config, sort_keys=True).encode('utf-8')).hexdigest()
 
-def on_page_markdown(markdown, **kwargs):
-    """为每篇文章添加相关推荐"""
-    page = kwargs['page']
-    config = kwargs['config']
-    
-    # 检查是否应该处理这个页面
-    if not should_index_file(page.file.src_path):
-        return markdown
-    
-    # 检查是否被排除
-    if is_page_excluded(page.file.src_path):
-        return markdown
-    
-    # 检查文章元数据是否禁用推荐
+def record_to_dict(record):
+    """文章记录 → 可写入 JSON 的字典"""
+    return {
+        'title': record.title,
+        'description': record.description,
+        'tags': list(record.tags),
+        'categories': list(record.categories),
+        'path_category': record.path_category,
+        'keywords': record.keywords(tokens),
+        'url': record.url,
+        'path': record.path,
+        'content_hash': record.content_hash,
+        'source_dir': record.source_dir
+    }
+
+def create_record(article_info):
+    """由文章信息字典创建紧凑的文章记录（词在这里驻留到词表）"""
+    title_words = sorted(set(re.findall(r'\b\w+\b', article_info['title'].lower())))
+    return related_index.ArticleRecord(
+        article_info['path'], article_info['url'], article_info['title'], article_info['description'],
+        article_info['tags'], article_info['categories'], article_info['path_category'],
+        article_info['content_hash'], article_info['keywords'], tokens, title_words
+    )
+
+def load_index_cache(config_version):
+    """读取磁盘上的索引缓存，配置版本不一致或读取失败时返回空字典"""
     try:
-        with open(page.file.abs_src_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            metadata = extract_metadata(content)
-            if metadata.get('disable_related', False):
-                return markdown
-    except Exception:
-        pass  # 如果读取失败，继续处理
-    
-    # 获取相关文章
-    related_articles = get_related_articles(page.file.src_path, max_count=5)
-    
-    if not related_articles:
-        return markdown
-    
-    # 从 config 中获取 site_url 并解析出基本路径
-    site_url = config.get('site_url', '')
-    base_path = urlparse(site_url).path if site_url else '/'
-    if not base_path.endswith('/'):
-        base_path += '/'
+        with open(INDEX_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache_data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if cache_data.get('config_version') != config_version:
+        print("🔄 相关推荐索引配置已变更，重新建立索引")
+        return {}
+    
+    entries = {}
+    for path, entry in cache_data.get('entries', {}).items():
+        article_info = entry.get('article')
+        entries[path] = (entry['hash'], create_record(article_info) if article_info else None)
+    return entries
 
-    # 构建推荐HTML - 针对Safari浏览器优化
-    recommendation_html = "\n"
-    
-    # 添加CSS样式，特别针对Safari浏览器优化
-    recommendation_html += """<style>
-.related-posts {
+def save_index_cache(config_version):
+    """把索引条目写入磁盘（先写临时文件再替换，避免中断时留下损坏的缓存）"""
+    entries = {
+        path: {'hash': content_hash, 'article': record_to_dict(record) if record else None}
+        for path, (content_hash, record) in index_entries.items()
+    }
+    try:
+        INDEX_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = INDEX_CACHE_FILE.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'config_version': config_version, 'entries': entries}, f, ensure_ascii=False)
+        os.replace(tmp_file, INDEX_CACHE_FILE)
+    except OSError as e:
+        print(f"⚠️ 保存相关推荐索引缓存失败: {e}")
+
+def extract_article_info(src_path, url, document):
+    """从一篇文章提取索引信息（普通字典，可在子进程中执行）；禁用推荐的文章返回None"""
+    content = document.text
+
+    # 提取元数据
+    metadata = extract_metadata(content, document.meta)
+    
+    # 检查是否禁用相关推荐
+    if metadata.get('disable_related', False):
+        return None
+    
+    # 提取关键词
+    keywords = extract_keywords(content, metadata['title'])
+    
+    # 获取分类
+    path_category = get_category_from_path(src_path)
+    
+    # 构建文章信息
+    return {
+        'title': metadata['title'],
+        'description': metadata['description'],
+        'tags': metadata['tags'],
+        'categories': metadata['categories'],
+        'path_category': path_category,
+        'keywords': keywords,
+        'url': url,
+        'path': src_path,
+        'content_hash': document.content_hash
+    }
+
+def extract_article_chunk(tasks):
+    """
+    进程池任务：提取一组文章的索引信息，返回 [(文章信息, 错误信息), ...]
+
+    子进程由 fork 创建，继承了父进程 document_store 中已读取的文档，这里按路径取出即可，
+    不需要通过进程间通信传递原文
+    """
+    results = []
+    for src_path, abs_src_path, url in tasks:
+        try:
+            document = document_store.get_document(abs_src_path)
+            results.append((extract_article_info(src_path, url, document), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+def extract_articles(pending):
+    """
+    提取需要重新索引的文章 [(file, document), ...]，按输入顺序返回 [(文章信息, 错误信息), ...]
+
+    数量达到 INDEXING_CONFIG['parallel_min_files'] 时分块交给进程池，否则串行处理。
+    结果顺序与输入一致，词表 id 等在父进程中按文件顺序分配，并行与串行的索引完全相同。
+    """
+    tasks = [(file.src_path, file.abs_src_path, file.url) for file, _ in pending]
+    # 依赖 fork 继承已加载的 hook 模块和文档存储；mkdocs serve 和不支持 fork 的平台（Windows）保持串行（见 fork_pool.py）
+    workers = fork_pool.worker_count(INDEXING_CONFIG['workers'])
+    if len(tasks) < INDEXING_CONFIG['parallel_min_files'] or workers < 2:
+        return extract_article_chunk(tasks)
+    
+    chunk_size = INDEXING_CONFIG['chunk_size']
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    results = []
+    try:
+        # 结果按提交顺序返回，合并顺序与文件顺序一致
+        for chunk_results in fork_pool.map_chunks('related_posts', extract_article_chunk, chunks, workers):
+            results.extend(chunk_results)
+    except Exception as e:
+        print(f"⚠️ 并行建立索引失败，改为串行处理: {e}")
+        return extract_article_chunk(tasks)
+    print(f"⚡ 使用 {min(workers, len(chunks))} 个进程提取 {len(tasks)} 篇文章")
+    return results
+
+def get_article_terms(record):
+    """一篇文章在各倒排索引中的词：[(倒排索引, 词 id), ...]（不重复）"""
+    terms = [(category_index, tokens.intern(record.path_category))]
+    # 分类、标签统一小写（记录中的 id 已经是小写形式的 id），与相似度计算一致
+    terms += [(category_index, category_id) for category_id in record.category_ids]
+    terms += [(keyword_index, keyword_id) for keyword_id in record.keyword_ids]
+    terms += [(keyword_index, tag_id) for tag_id in record.tag_ids]
+    # 标题相似度也可能让文章超过阈值
+    terms += [(title_index, word_id) for word_id in record.title_ids]
+    return list(dict.fromkeys(terms))
+
+def patch_postings(removed_records, added_records):
+    """增量更新倒排索引：移除旧文章、加入新文章（新文章分配新的 id，倒排列表保持有序）"""
+    for record in removed_records:
+        for index, token_id in get_article_terms(record):
+            index.remove(token_id, record.id)
+        articles[record.id] = None
+    
+    for record in added_records:
+        record.id = len(articles)
+        articles.append(record)
+        for index, token_id in get_article_terms(record):
+            index.add(token_id, record.id)
+
+# 相关推荐的样式，特别针对Safari浏览器优化（只写出一次，作为静态资源由所有页面共享）
+RELATED_POSTS_CSS = """.related-posts {
   margin-top: 1.5rem;
   padding-top: 0.75rem;
   border-top: 1px solid rgba(0,0,0,0.1);
   max-height: none !important; /* 防止Safari错误计算高度 */
   overflow: visible !important; /* 防止内容被截断 */
 }
+/* client 模式的占位元素在推荐列表加载完成前隐藏（下面 Safari 修复中的 display: block 会覆盖 hidden 属性的默认样式） */
+.related-posts[hidden] {
+  display: none;
+}
 .related-posts h3 {
   margin-top: 0;
   margin-bottom: 0.5rem;
@@ -333,17 +461,293 @@ def on_page_markdown(markdown, **kwargs):
     position: static;
   }
 }
-</style>
 """
+# 文件名带内容哈希，样式变化后浏览器和 CDN 不会继续使用旧的缓存
+RELATED_POSTS_CSS_PATH = (
+    f"assets/stylesheets/related-posts.{hashlib.md5(RELATED_POSTS_CSS.encode('utf-8')).hexdigest()[:8]}.css"
+)
+
+# client 模式下渲染推荐列表的脚本：按占位元素的 data-related-src 加载 JSON（同一文件只请求一次），
+# 兼容 Material 的即时导航（document$）
+RELATED_POSTS_SCRIPT = """(function () {
+  var shards = {};
+  function load(src) {
+    if (!shards[src]) {
+      shards[src] = fetch(src)
+        .then(function (response) { return response.ok ? response.json() : {}; })
+        .catch(function () { return {}; });
+    }
+    return shards[src];
+  }
+  function render() {
+    document.querySelectorAll('.related-posts[data-related-src]').forEach(function (container) {
+      if (container.dataset.rendered) return;
+      container.dataset.rendered = '1';
+      load(container.dataset.relatedSrc).then(function (data) {
+        var items = data[container.dataset.relatedPage];
+        if (!items || !items.length) return;
+        var heading = document.createElement('h3');
+        heading.textContent = '📚 相关文章推荐';
+        var list = document.createElement('ul');
+        items.forEach(function (item) {
+          var entry = document.createElement('li');
+          var link = document.createElement('a');
+          link.href = item[1];
+          link.textContent = item[0];
+          entry.appendChild(link);
+          list.appendChild(entry);
+        });
+        container.appendChild(heading);
+        container.appendChild(list);
+        container.hidden = false;
+      });
+    });
+  }
+  if (window.document$) {
+    document$.subscribe(render);
+  } else if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', render);
+  } else {
+    render();
+  }
+})();
+"""
+RELATED_POSTS_SCRIPT_PATH = (
+    f"assets/javascripts/related-posts.{hashlib.md5(RELATED_POSTS_SCRIPT.encode('utf-8')).hexdigest()[:8]}.js"
+)
+# client 模式下推荐列表 JSON 文件所在目录
+RELATED_DATA_DIR = "assets/related"
+
+def get_base_path(config):
+    """从 config 的 site_url 解析出站点基本路径（以 / 结尾）"""
+    site_url = config.get('site_url', '')
+    base_path = urlparse(site_url).path if site_url else '/'
+    if not base_path.endswith('/'):
+        base_path += '/'
+    return base_path
+
+def get_related_data_path(article_path):
+    """client 模式下保存某篇文章推荐列表的 JSON 文件（相对站点根目录）"""
+    if not RENDER_CONFIG['shard_by_section']:
+        return f"{RELATED_DATA_DIR}/related.json"
+    section = article_path.rsplit('/', 1)[0]
+    return f"{RELATED_DATA_DIR}/{hashlib.md5(section.encode('utf-8')).hexdigest()[:10]}.json"
+
+def write_related_data(site_dir, base_path):
+    """client 模式：把所有文章的推荐列表按栏目写入 JSON 文件 {页面 URL: [[标题, 链接], ...]}"""
+    shards = defaultdict(dict)
+    for path, article in article_index.items():
+        related_articles = get_related_articles(path, max_count=SIMILARITY_CONFIG['max_related'])
+        if related_articles:
+            shards[get_related_data_path(path)][article.url] = [
+                [related.title, (base_path + related.url).replace('//', '/')]
+                for _, related in related_articles
+            ]
+    
+    for data_path, data in shards.items():
+        data_file = Path(site_dir) / data_path
+        data_file.parent.mkdir(parents=True, exist_ok=True)
+        # 键排序、紧凑格式，内容不变时文件字节也不变
+        data_file.write_text(json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')),
+                             encoding='utf-8')
+    print(f"🗂️ 已写入 {len(shards)} 个相关推荐数据文件")
+
+def write_site_asset(site_dir, asset_path, content):
+    """把静态资源写入站点目录（文件名带内容哈希，已存在时跳过）"""
+    asset_file = Path(site_dir) / asset_path
+    if not asset_file.exists():
+        asset_file.parent.mkdir(parents=True, exist_ok=True)
+        asset_file.write_text(content, encoding='utf-8')
+
+def on_startup(command, dirty):
+    """记录 MkDocs 命令：只在 build / gh-deploy 中并行建立索引，mkdocs serve 保持串行"""
+    fork_pool.set_command(command)
+
+def on_config(config):
+    """读取 mkdocs.yml 中覆盖的页面规则，把相关推荐样式表（client 模式下还有渲染脚本）注册到 extra_css / extra_javascript"""
+    PAGE_RULES.configure(config)
+    if RELATED_POSTS_CSS_PATH not in config['extra_css']:
+        config['extra_css'].append(RELATED_POSTS_CSS_PATH)
+    if RENDER_CONFIG['mode'] == 'client' and RELATED_POSTS_SCRIPT_PATH not in map(str, config['extra_javascript']):
+        script = ExtraScriptValue(RELATED_POSTS_SCRIPT_PATH)
+        script.defer = True
+        config['extra_javascript'].append(script)
+    return config
+
+def on_post_build(config):
+    """把相关推荐样式表、client 模式的脚本和推荐列表数据写入站点目录"""
+    write_site_asset(config['site_dir'], RELATED_POSTS_CSS_PATH, RELATED_POSTS_CSS)
+    if RENDER_CONFIG['mode'] == 'client':
+        write_site_asset(config['site_dir'], RELATED_POSTS_SCRIPT_PATH, RELATED_POSTS_SCRIPT)
+        write_related_data(config['site_dir'], get_base_path(config))
+
+def on_files(files, config):
+    """
+    预处理所有文章，建立索引
+
+    索引条目按 (路径, 内容哈希, 配置版本) 缓存在磁盘上：之后的构建只重新提取新增和内容变化的文章；
+    mkdocs serve 重建时倒排索引还保留在内存中，只对变化的文章做增量更新。
+    """
+    global article_index, category_index, keyword_index, title_index, index_entries, index_config_version
+    
+    config_version = get_index_config_version()
+    if config_version != index_config_version:
+        # 首次构建或配置变化：从磁盘缓存恢复条目，倒排索引重新建立
+        tokens.clear()
+        articles.clear()
+        category_index.clear()
+        keyword_index.clear()
+        title_index.clear()
+        index_entries = load_index_cache(config_version)
+        index_config_version = config_version
+        previous_articles = {}
+    else:
+        previous_articles = dict(article_index)
+    
+    article_index.clear()
+    related_articles_cache.clear()
+    
+    processed_count = 0
+    excluded_count = 0
+    extracted_count = 0
+    current_paths = set()
+    
+    indexed_files = []
+    pending = []
+    for file in files:
+        if should_index_file(file.src_path):
+            try:
+                # 从共享文档存储读取（同一构建中其他 hook / gen-files 脚本已读过的文件不再重复读取和解析）
+                document = document_store.get_document(file.abs_src_path)
+            except Exception as e:
+                print(f"❌ 处理文件 {file.src_path} 时出错: {e}")
+                continue
+            current_paths.add(file.src_path)
+            indexed_files.append(file)
+            
+            # 内容未变化时直接复用缓存的条目，否则重新提取
+            entry = index_entries.get(file.src_path)
+            if entry is None or entry[0] != document.content_hash or (entry[1] and entry[1].url != file.url):
+                pending.append((file, document))
+    
+    # 提取新增和变化的文章（数量较多时并行），在父进程中按文件顺序生成记录
+    for (file, document), (article_info, error) in zip(pending, extract_articles(pending)):
+        if error is not None:
+            print(f"❌ 处理文件 {file.src_path} 时出错: {error}")
+            index_entries.pop(file.src_path, None)
+            continue
+        record = create_record(article_info) if article_info else None
+        index_entries[file.src_path] = (document.content_hash, record)
+        extracted_count += 1
     
-    # 简化且兼容的HTML结构
+    for file in indexed_files:
+        entry = index_entries.get(file.src_path)
+        if entry is None:
+            continue
+        record = entry[1]
+        
+        # 检查是否禁用相关推荐
+        if record is None:
+            excluded_count += 1
+            continue
+        
+        # 添加到主索引
+        record.position = len(article_index)
+        article_index[file.src_path] = record
+        
+        processed_count += 1
+    
+    # 删除已不存在的文章的条目
+    for path in set(index_entries) - current_paths:
+        del index_entries[path]
+    
+    # 更新倒排索引：移除已删除或已变化的文章，加入新增或已变化的文章
+    removed_articles = [record for path, record in previous_articles.items() if article_index.get(path) is not record]
+    added_articles = [record for path, record in article_index.items() if previous_articles.get(path) is not record]
+    patch_postings(removed_articles, added_articles)
+    
+    if extracted_count or removed_articles:
+        save_index_cache(config_version)
+    
+    print(f"✅ 已索引 {processed_count} 篇文章 (blog + develop)，重新提取 {extracted_count} 篇")
+    if excluded_count > 0:
+        print(f"📝 排除 {excluded_count} 篇禁用推荐或在排除列表中的文章")
+    print(f"📊 分类数量: {len(category_index)}")
+    print(f"🔤 关键词数量: {len(keyword_index)}（词表 {len(tokens)} 个词）")
+    
+    # 一次性为所有文章计算相关推荐，页面渲染时直接查表
+    precompute_related_articles()
+    return files
+
+def precompute_related_articles():
+    """为所有已索引文章计算相关推荐并缓存"""
+    global lsh_index
+    max_count = SIMILARITY_CONFIG['max_related']
+    lsh_index = None
+    if SIMILARITY_CONFIG.get('engine') == 'matrix':
+        if related_matrix.is_available():
+            related_articles_cache.update(related_matrix.compute_related(
+                list(article_index.values()), tokens, SIMILARITY_CONFIG, select_related_articles
+            ))
+            print(f"🔗 已用稀疏矩阵引擎计算 {len(related_articles_cache)} 篇文章的相关推荐")
+            return
+        print("⚠️ 未安装 numpy/scipy，回退到逐篇打分")
+    if SIMILARITY_CONFIG.get('candidate_source') == 'lsh':
+        lsh_index = related_lsh.build_index(article_index.values(), tokens, SIMILARITY_CONFIG)
+    for path in article_index:
+        related_articles_cache[path] = compute_related_articles(path, max_count)
+    print(f"🔗 已预先计算 {len(related_articles_cache)} 篇文章的相关推荐")
+
+def markdown_cache_key(page, config):
+    """
+    markdown_cache 的缓存键中本 hook 代码之外的输入：渲染方式和本页的推荐列表（标题、URL）。
+    其他文章变化时只有推荐列表真正变化的页面缓存失效
+    """
+    article = article_index.get(page.file.src_path)
+    if article is None:
+        return None
+    if RENDER_CONFIG['mode'] == 'client':
+        return ['client', get_related_data_path(article.path), article.url]
+    related_articles = get_related_articles(page.file.src_path, max_count=SIMILARITY_CONFIG['max_related'])
+    return ['inline', [[related.title, related.url] for _, related in related_articles]]
+
+def on_page_markdown(markdown, **kwargs):
+    """为每篇文章添加相关推荐"""
+    page = kwargs['page']
+    config = kwargs['config']
+    
+    # 是否参与推荐在 on_files 建立索引时已经确定：不在索引目录、在排除列表中或 front matter 禁用推荐的文章都不在 article_index 中。
+    # 另外检查 MkDocs 已解析好的 page.meta（其他插件可能修改过），渲染页面时不再读取文件或解析 YAML
+    article = article_index.get(page.file.src_path)
+    if article is None or page.meta.get('disable_related', False):
+        return markdown
+    
+    # 从 config 中获取 site_url 并解析出基本路径
+    base_path = get_base_path(config)
+    
+    # client 模式：只输出占位元素，推荐列表由脚本从 JSON 文件渲染（页面 HTML 不随其他文章变化）
+    if RENDER_CONFIG['mode'] == 'client':
+        data_url = base_path + get_related_data_path(article.path)
+        return markdown.rstrip() + (
+            f'\n<div class="related-posts" data-related-src="{data_url}" '
+            f'data-related-page="{article.url}" hidden></div>\n'
+        )
+    
+    # 获取相关文章
+    related_articles = get_related_articles(page.file.src_path, max_count=SIMILARITY_CONFIG['max_related'])
+    
+    if not related_articles:
+        return markdown
+
+    # 简化且兼容的HTML结构（样式在 RELATED_POSTS_CSS_PATH 样式表中）
+    recommendation_html = "\n"
     recommendation_html += '<div class="related-posts">\n'
     recommendation_html += '<h3>📚 相关文章推荐</h3>\n'
     recommendation_html += '<ul>\n'
     
-    for score, article_info in related_articles:
-        title = article_info['title']
-        relative_url = article_info['url']
+    for score, article in related_articles:
+        title = article.title
+        relative_url = article.url
         # 拼接基本路径和文章相对URL，并确保路径分隔符正确
         full_url = (base_path + relative_url).replace('//', '/')
         recommendation_html += f'<li><a href="{full_url}">{title}</a></li>\n'
@@ -354,52 +758,104 @@ def on_page_markdown(markdown, **kwargs):
     # 确保没有多余的空行
     return markdown.rstrip() + recommendation_html
 
+def get_candidates(current_article):
+    """
+    通过倒排索引生成候选文章：只有与当前文章共享至少一个关键词、标签、分类（含路径分类）或标题词的文章才需要打分。
+
+    没有任何共享项的文章只能得到同源目录加分（默认权重下低于最低阈值），因此这样得到的结果与逐篇比较一致。
+    倒排列表超过 max_postings 的项整体跳过（视为停用词）：只通过这些项相关的文章不再成为候选，
+    包括路径分类——文章数超过 max_postings 的目录中，只共享路径分类的文章不会被推荐。
+    candidate_source 为 'lsh' 时改用 MinHash/LSH 桶生成近似候选，超过 max_postings 的桶同样整体跳过。
+    返回按本次构建文件顺序排列的文章记录列表。
+    """
+    if lsh_index is not None:
+        candidate_ids = lsh_index.candidates(current_article.id)
+    else:
+        max_postings = SIMILARITY_CONFIG.get('max_postings')
+        
+        posting_lists = [keyword_index.get(keyword_id) for keyword_id in current_article.keyword_ids]
+        posting_lists += [keyword_index.get(tag_id) for tag_id in current_article.tag_ids]
+        posting_lists.append(category_index.get(tokens.get(current_article.path_category)))
+        posting_lists += [category_index.get(category_id) for category_id in current_article.category_ids]
+        posting_lists += [title_index.get(word_id) for word_id in current_article.title_ids]
+        
+        candidate_ids = set()
+        for postings in posting_lists:
+            if max_postings and len(postings) > max_postings:
+                continue
+            candidate_ids.update(postings)
+    
+    # 按文件顺序返回，保证同分文章的先后顺序与逐篇比较时一致
+    candidates = [articles[article_id] for article_id in candidate_ids]
+    candidates.sort(key=position_key)
+    return candidates
+
 def get_related_articles(current_path, max_count=5):
-    """获取相关文章，使用改进的算法"""
-    if current_path not in article_index:
+    """获取相关文章（优先使用 on_files 中预先计算的结果）"""
+    if max_count == SIMILARITY_CONFIG['max_related'] and current_path in related_articles_cache:
+        return related_articles_cache[current_path]
+    return compute_related_articles(current_path, max_count)
+
+def similarity_key(item):
+    """排序键：相似度"""
+    return item[0]
+
+# 排序键：文章在本次构建文件列表中的顺序
+position_key = attrgetter('position')
+
+def compute_related_articles(current_path, max_count=5):
+    """计算相关文章，使用改进的算法"""
+    current_article = article_index.get(current_path)
+    if current_article is None:
         return []
     
-    current_article = article_index[current_path]
+    query = build_query(current_article)
+    title_weight = SIMILARITY_CONFIG['title_similarity']
+    min_threshold = SIMILARITY_CONFIG['min_threshold']
     similarities = []
     
-    # 获取当前文章的关键信息
-    current_title = current_article['title'].lower()
-    current_tags = set(tag.lower() for tag in current_article['tags'] if tag)
-    current_categories = set(cat.lower() for cat in current_article['categories'] if cat)
-    
-    for path, article_info in article_index.items():
-        if path == current_path:
+    # 索引中的文章在 on_files 中已经过排除列表检查，这里无需再逐篇匹配排除规则
+    for article in get_candidates(current_article):
+        if article is current_article:
             continue
         
         # 过滤掉标题为"未命名"的文章
-        if article_info['title'] == "未命名" or not article_info['title'].strip():
-            continue
-            
-        # 再次检查是否在排除列表中（双重检查）
-        if is_page_excluded(path):
+        if not article.recommendable:
             continue
         
         # 计算相似度
-        score = calculate_similarity(current_article, article_info)
+        score = score_candidate(current_article, query, article)
         
         # 标题相似度加权
-        title_similarity = calculate_title_similarity(current_title, article_info['title'].lower())
+        title_similarity = jaccard_similarity(query['title_words'], article.title_ids)
         if title_similarity > 0.3:  # 标题有一定相似度
-            score += title_similarity * SIMILARITY_CONFIG['title_similarity']
+            score += title_similarity * title_weight
         
         # 应用最低阈值
-        if score > SIMILARITY_CONFIG['min_threshold']:
-            similarities.append((score, article_info))
+        if score > min_threshold:
+            similarities.append((score, article))
     
-    # 按相似度排序
-    similarities.sort(key=lambda x: x[0], reverse=True)
+    return select_related_articles(similarities, max_count)
+
+def select_related_articles(similarities, max_count, candidate_count=None):
+    """
+    从超过阈值的文章中选出推荐列表（兼顾多样性）
+    similarities: [(相似度, 文章信息), ...]，同分文章按索引顺序排列
+    candidate_count: 超过阈值的文章总数（similarities 只是其中的一部分时传入，默认为 len(similarities)）
+    """
+    if candidate_count is None:
+        candidate_count = len(similarities)
     
     # 多样性优化：确保不同分类的文章都有机会被推荐
-    if len(similarities) > max_count * 2:
+    if candidate_count > max_count * 2:
+        # 只需要前 2 * max_count 篇高分文章（最多 max_count 篇已被选中，剩余的足够填满空位）；
+        # heapq.nlargest 与稳定排序后截取的结果一致
+        top_similarities = heapq.nlargest(max_count * 2, similarities, key=similarity_key)
+        
         # 按分类分组
         category_groups = defaultdict(list)
         for score, article in similarities:
-            for category in article['categories']:
+            for category in article.categories:
                 if category:
                     category_groups[category.lower()].append((score, article))
         
@@ -408,96 +864,115 @@ def get_related_articles(current_path, max_count=5):
         used_paths = set()
         
         # 首先添加最相关的文章
-        if similarities:
-            top_score, top_article = similarities[0]
-            diverse_results.append((top_score, top_article))
-            used_paths.add(top_article['path'])
+        top_score, top_article = top_similarities[0]
+        diverse_results.append((top_score, top_article))
+        used_paths.add(top_article.path)
         
-        # 然后从每个分类中添加最相关的文章
+        # 然后从每个分类中添加最相关的文章（已选中的最多 max_count 篇，每个分类只需看前 max_count 篇）
         for category in sorted(category_groups.keys()):
             if len(diverse_results) >= max_count:
                 break
                 
-            for score, article in category_groups[category]:
-                if article['path'] not in used_paths:
+            for score, article in heapq.nlargest(max_count, category_groups[category], key=similarity_key):
+                if article.path not in used_paths:
                     diverse_results.append((score, article))
-                    used_paths.add(article['path'])
+                    used_paths.add(article.path)
                     break
         
         # 如果还有空位，从剩余的高分文章中填充
         if len(diverse_results) < max_count:
-            for score, article in similarities:
-                if article['path'] not in used_paths and len(diverse_results) < max_count:
+            for score, article in top_similarities:
+                if article.path not in used_paths and len(diverse_results) < max_count:
                     diverse_results.append((score, article))
-                    used_paths.add(article['path'])
+                    used_paths.add(article.path)
         
         # 重新按相似度排序
-        diverse_results.sort(key=lambda x: x[0], reverse=True)
+        diverse_results.sort(key=similarity_key, reverse=True)
         return diverse_results[:max_count]
     
-    return similarities[:max_count]
+    return heapq.nlargest(max_count, similarities, key=similarity_key)
 
-def calculate_title_similarity(title1, title2):
-    """计算两个标题的相似度"""
-    # 分词
-    words1 = set(re.findall(r'\b\w+\b', title1))
-    words2 = set(re.findall(r'\b\w+\b', title2))
-    
+def jaccard_similarity(words1, words2):
+    """计算两个词集合的 Jaccard 相似度（words1 为集合，words2 为不含重复项的任意序列）"""
     if not words1 or not words2:
         return 0
     
-    # 计算Jaccard相似度
-    intersection = len(words1.intersection(words2))
-    union = len(words1.union(words2))
+    intersection = sum(1 for word in words2 if word in words1)
+    union = len(words1) + len(words2) - intersection
     
     if union == 0:
         return 0
     
     return intersection / union
 
+def calculate_title_similarity(title1, title2):
+    """计算两个标题的相似度"""
+    # 分词
+    words1 = set(re.findall(r'\b\w+\b', title1))
+    words2 = set(re.findall(r'\b\w+\b', title2))
+    
+    # 计算Jaccard相似度
+    return jaccard_similarity(words1, words2)
+
 def calculate_similarity(article1, article2):
     """计算两篇文章的相似度"""
+    return score_candidate(article1, build_query(article1), article2)
+
+def build_query(article):
+    """把当前文章的关键词词频、标签、分类、标题词转成字典/集合，便于与大量候选文章逐一比较"""
+    return {
+        'keywords': dict(zip(article.keyword_ids, article.keyword_weights)),
+        'tags': set(article.tag_ids),
+        'categories': set(article.category_ids),
+        'title_words': set(article.title_ids)
+    }
+
+def score_candidate(current_article, query, article):
+    """计算当前文章（query 为 build_query 的结果）与候选文章的相似度"""
     score = 0
     weights = SIMILARITY_CONFIG['weights']
     
     # 1. 关键词相似度
-    keywords1 = dict(article1['keywords'])
-    keywords2 = dict(article2['keywords'])
-    common_keywords = set(keywords1.keys()) & set(keywords2.keys())
-    
-    if common_keywords:
-        # 考虑关键词的频率和重要性
-        keyword_score = sum(min(keywords1[kw], keywords2[kw]) for kw in common_keywords)
-        # 关键词匹配数量的奖励
-        keyword_count_bonus = len(common_keywords) / max(len(keywords1), 1) * 0.5
+    keywords1 = query['keywords']
+    keyword_score = 0
+    common_count = 0
+    for keyword_id, weight in zip(article.keyword_ids, article.keyword_weights):
+        current_weight = keywords1.get(keyword_id)
+        if current_weight is not None:
+            keyword_score += min(current_weight, weight)
+            common_count += 1
+    
+    if common_count:
+        # 考虑关键词的频率和重要性；关键词匹配数量的奖励
+        keyword_count_bonus = common_count / max(len(keywords1), 1) * 0.5
         score += (keyword_score + keyword_count_bonus) * weights['keywords']
     
     # 2. 标签相似度
-    tags1 = set(tag.lower() for tag in article1['tags'] if tag)
-    tags2 = set(tag.lower() for tag in article2['tags'] if tag)
+    tags1 = query['tags']
+    tags2 = article.tag_ids
     
     if tags1 and tags2:  # 确保两篇文章都有标签
-        tag_overlap = len(tags1 & tags2)
+        tag_overlap = sum(1 for tag_id in tags2 if tag_id in tags1)
         tag_ratio = tag_overlap / max(len(tags1), 1)  # 相对重叠比例
         tag_score = tag_overlap * 8 * (1 + tag_ratio)  # 增加重叠比例奖励
         score += tag_score * weights['tags']
     
     # 3. 分类相似度
-    categories1 = set(cat.lower() for cat in article1['categories'] if cat)
-    categories2 = set(cat.lower() for cat in article2['categories'] if cat)
+    categories1 = query['categories']
+    categories2 = article.category_ids
     
     if categories1 and categories2:  # 确保两篇文章都有分类
-        category_overlap = len(categories1 & categories2)
+        category_overlap = sum(1 for category_id in categories2 if category_id in categories1)
         category_ratio = category_overlap / max(len(categories1), 1)
         category_score = category_overlap * 12 * (1 + category_ratio)
         score += category_score * weights['categories']
     
     # 4. 路径分类相似度
-    if article1['path_category'] == article2['path_category']:
+    if current_article.path_category == article.path_category:
         score += 3 * weights['path']
     
     # 5. 同源目录加分
-    if article1.get('source_dir') == article2.get('source_dir'):
+    if current_article.source_dir == article.source_dir:
         score += 2 * weights['source_dir']
     
     return score
@@ -4,35 +4,18 @@ import mkdocs_gen_files
 from collections import defaultdict
 # 引入拼音库用于中文首字母提取（需安装：pip install pypinyin）
 from pypinyin import lazy_pinyin, Style
-import yaml
 from datetime import datetime, date
+# hooks 目录由 gen_files_setup.py 加入 sys.path
+import document_store
+
 
 def extract_metadata(file_path):
-    """使用PyYAML解析Markdown文件中的YAML元数据"""
+    """从共享文档存储获取Markdown文件的YAML元数据（同一构建中每个文件只读取、解析一次）"""
     try:
-        # 读取文件内容
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 匹配YAML元数据块（---开头和结尾）
-        if not content.startswith('---\n'):
-            return {}
-        
-        # 分割元数据块和正文
-        metadata_end = content.find('\n---', 4)  # 从第4个字符开始找（跳过开头的---\n）
-        if metadata_end == -1:
-            return {}
-        
-        # 提取YAML元数据部分
-        yaml_content = content[4:metadata_end].strip()  # 去掉开头的---\n和结尾的\n
-        if not yaml_content:
-            return {}
-        
-        # 使用PyYAML解析YAML内容
-        metadata = yaml.safe_load(yaml_content)
-        
-        # 确保返回字典类型（处理空元数据的情况）
-        return metadata if isinstance(metadata, dict) else {}
+        document = document_store.get_document(file_path)
+        if document.meta_error:
+            print(f"解析元数据出错（{file_path}）：{str(document.meta_error)}")
+        return document.meta
     
     except Exception as e:
         print(f"解析元数据出错（{file_path}）：{str(e)}")